@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+#
+#  assets.py
+"""
+Extraction of the meshes, textures and sounds referenced by ESP files.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+# stdlib
+import os
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+# 3rd party
+import attrs
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from typing_extensions import Self
+
+# this package
+from esp_parser.formids import iter_load_order, remap_form_id
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+
+__all__ = ["AssetManifest", "AssetReference", "iter_assets"]
+
+# Subrecords containing asset paths, mapping the record types they do so in (None for all)
+# to the directory within ``Data`` the paths are relative to.
+_ASSET_SUBRECORDS: Dict[bytes, Dict[Optional[bytes], str]] = {
+		b"MODL": {None: "meshes"},
+		b"MOD2": {None: "meshes"},
+		b"MOD3": {None: "meshes"},
+		b"MOD4": {None: "meshes"},
+		b"ICON": {None: "textures"},
+		b"MICO": {None: "textures"},
+		b"ICO2": {None: "textures"},
+		b"MIC2": {None: "textures"},
+		b"NAM1": {b"PROJ": "meshes"},
+		b"NAM7": {b"EFSH": "textures"},
+		b"FNAM": {b"SOUN": "sound", b"MUSC": "music", b"CLMT": "textures"},
+		b"GNAM": {b"CLMT": "textures"},
+		b"NNAM": {b"WATR": "textures", b"WRLD": "textures"},
+		b"XNAM": {b"CELL": "textures", b"NOTE": "textures", b"WRLD": "textures"},
+		**{f"MWD{n}".encode(): {b"WEAP": "meshes"} for n in range(1, 8)},
+		**{f"TX0{n}".encode(): {b"TXST": "textures"} for n in range(6)},
+		}
+
+
+def _normalize(path: str) -> str:
+	path = path.strip().replace("/", "\\").lower().lstrip("\\")
+	if path.startswith("data\\"):
+		path = path[5:]
+	return path
+
+
+def _asset_path(path: str, directory: str) -> str:
+	path = _normalize(path)
+	if not path.startswith(f"{directory}\\"):
+		path = f"{directory}\\{path}"
+	return path
+
+
+class AssetReference(NamedTuple):
+	"""
+	A reference to an asset from a record.
+	"""
+
+	#: The lowercase path to the asset relative to the ``Data`` directory, e.g. ``meshes\\armor\\helmet.nif``.
+	path: str
+
+	#: The form ID of the record referencing the asset.
+	id: bytes
+
+	#: The type of the record referencing the asset, e.g. ``b"ARMO"``.
+	type: bytes
+
+	#: The type of the subrecord containing the path, e.g. ``b"MODL"``.
+	signature: bytes
+
+
+def iter_assets(buffer: Buffer) -> Iterator[AssetReference]:
+	"""
+	Iterate over the meshes, textures, sounds and music referenced by the records in an ESP file.
+
+	Only the subrecords containing paths are decoded; every other subrecord is skipped over by its size.
+	Alternate textures (``MODS``) refer to :class:`~.TXST` records, whose textures are returned with the
+	:class:`~.TXST` record.
+
+	Paths are returned in the order they appear, and a path referenced by several records is returned for each.
+
+	:param buffer: The raw bytes of the ESP file.
+	"""
+
+	for header in iter_records(buffer):
+		payload = record_payload(buffer, header)
+		for subrecord in iter_subrecords(payload):
+			if subrecord.type not in _ASSET_SUBRECORDS:
+				continue
+
+			directories = _ASSET_SUBRECORDS[subrecord.type]
+			directory = directories.get(header.type, directories.get(None))
+			if directory is None:
+				continue
+
+			path = payload[subrecord.offset:subrecord.end].rstrip(b"\x00").decode("cp1252", errors="replace")
+			if path.strip():
+				yield AssetReference(_asset_path(path, directory), header.id, header.type, subrecord.type)
+
+
+@attrs.define
+class AssetManifest:
+	"""
+	The unique assets referenced by a load order, e.g. to list the files to pack into a BSA archive,
+	or to find the meshes and textures missing from an installation.
+
+	Only one entry is kept per path, however many records reference it.
+	Sound paths ending in a backslash refer to a directory, from which a sound is chosen at random.
+	"""
+
+	#: Mapping of asset paths to the name of the plugin and the form ID of the first record referencing them.
+	assets: Dict[str, Tuple[str, bytes]] = attrs.field(factory=dict)
+
+	def add_plugin(self, buffer: Buffer, plugin: str = "", table: Optional[bytes] = None) -> List[AssetReference]:
+		"""
+		Add the assets referenced by an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		:param plugin: The name of the ESP file.
+		:param table: A table returned by :func:`~.master_table` to rewrite the plugin's form IDs
+			in terms of the full load order.
+
+		:returns: The references to assets not already in the manifest, in the order they appear.
+		"""
+
+		new = []
+
+		for reference in iter_assets(buffer):
+			if reference.path in self.assets:
+				continue
+
+			if table is not None:
+				reference = reference._replace(id=remap_form_id(reference.id, table))
+
+			self.assets[reference.path] = (plugin, reference.id)
+			new.append(reference)
+
+		return new
+
+	@classmethod
+	def from_load_order(cls: Type[Self], plugins: Sequence[PathLike]) -> Self:
+		"""
+		Construct from the assets referenced by the given ESP files.
+
+		Form IDs are rewritten in terms of the full load order, so the last byte of each as stored
+		(the most significant) is the index of the plugin in ``plugins`` which created the record.
+
+		:param plugins: The paths to the ESP files, in load order.
+		"""
+
+		manifest = cls()
+
+		for name, buffer, table in iter_load_order(plugins):
+			manifest.add_plugin(buffer, name, table)
+
+		return manifest
+
+	def paths(self, directory: Optional[str] = None) -> List[str]:
+		"""
+		Returns the sorted asset paths.
+
+		:param directory: If given, only paths within this directory are returned, e.g. ``'meshes'``.
+		"""
+
+		if directory is None:
+			return sorted(self.assets)
+
+		prefix = _normalize(directory).rstrip("\\") + "\\"
+		return sorted(path for path in self.assets if path.startswith(prefix))
+
+	def missing(self, data_dir: PathLike, archived: Iterable[str] = ()) -> List[str]:
+		"""
+		Returns the sorted paths of the assets which are neither in the ``Data`` directory nor in an archive.
+
+		Paths are compared case-insensitively.
+
+		:param data_dir: The game's ``Data`` directory.
+		:param archived: The paths of the files within the BSA archives, relative to the ``Data`` directory.
+		"""
+
+		data_dir = PathPlus(data_dir)
+		directories = {path.split("\\", 1)[0] for path in self.assets}
+		available = {_normalize(path) for path in archived}
+
+		if data_dir.is_dir():
+			for child in data_dir.iterdir():
+				if not (child.is_dir() and child.name.lower() in directories):
+					continue
+
+				for root, _, filenames in os.walk(child):
+					relative = PathPlus(root).relative_to(data_dir).as_posix()
+					available.update(_normalize(f"{relative}/{filename}") for filename in filenames)
+
+		ordered = sorted(available)
+		missing = []
+
+		for path in sorted(self.assets):
+			if path.endswith("\\"):
+				position = bisect_left(ordered, path)
+				if position < len(ordered) and ordered[position].startswith(path):
+					continue
+			elif path in available:
+				continue
+
+			missing.append(path)
+
+		return missing
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+#
+#  conflicts.py
+"""
+Detection of conflicting overrides across a load order.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+# stdlib
+import json
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+
+# this package
+from esp_parser.formids import iter_form_ids, master_table, remap_form_id
+from esp_parser.indexes import RecordIndex
+from esp_parser.scan import Buffer, header_at, iter_subrecords, map_plugin, record_payload
+
+__all__ = ["Conflict", "iter_conflicts", "write_conflict_report"]
+
+# A record to compare: its form ID, type, and the plugins containing it with the offset of the record in each.
+_Candidate = Tuple[bytes, bytes, Tuple[Tuple[int, int], ...]]
+
+
+class Conflict(NamedTuple):
+	"""
+	A record overridden by more than one plugin, where the overrides differ.
+	"""
+
+	#: The form ID of the record, in terms of the full load order.
+	form_id: bytes
+
+	#: The record type, e.g. ``b"WEAP"``.
+	type: bytes
+
+	#: The names of the plugins containing the record, in load order. The last plugin wins.
+	plugins: Tuple[str, ...]
+
+	#: Mapping of the types of the subrecords which differ to the plugins grouped by their value of the subrecord,
+	#: in load order.
+	differences: Dict[bytes, List[Tuple[str, ...]]]
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the conflict.
+		"""
+
+		return {
+				"form_id": self.form_id.hex(),
+				"type": self.type.decode("latin-1"),
+				"plugins": list(self.plugins),
+				"winner": self.plugins[-1],
+				"differences": {
+						signature.decode("latin-1"): [list(group) for group in groups]
+						for signature, groups in self.differences.items()
+						},
+				}
+
+
+def _scan_plugin(plugin: str, save: bool) -> RecordIndex:
+	return RecordIndex.for_plugin(plugin, save=save)
+
+
+def _canonical_subrecords(buffer: Buffer, offset: int, table: bytes) -> List[Tuple[bytes, bytes]]:
+	# The record's subrecords, with form IDs rewritten in terms of the full load order so plugins can be compared.
+	header = header_at(buffer, offset)
+	payload = record_payload(buffer, header)
+
+	remapped = bytearray(payload)
+	for _, position, form_id in iter_form_ids(header.type, payload):
+		remapped[position:position + 4] = remap_form_id(form_id, table)
+
+	return [(subrecord.type, bytes(remapped[subrecord.offset:subrecord.end])) for subrecord in iter_subrecords(payload)]
+
+
+def _compare_records(plugins: Sequence[str], tables: Sequence[bytes], candidates: Sequence[_Candidate]) -> List[Conflict]:
+	names = [PathPlus(plugin).name for plugin in plugins]
+	buffers: Dict[int, Buffer] = {}
+	conflicts = []
+
+	try:
+		for form_id, record_type, sources in candidates:
+			versions: Dict[int, List[Tuple[bytes, bytes]]] = {}
+			for plugin, offset in sources:
+				if plugin not in buffers:
+					buffers[plugin] = map_plugin(plugins[plugin])
+				versions[plugin] = _canonical_subrecords(buffers[plugin], offset, tables[plugin])
+
+			overrides = [versions[plugin] for plugin, _ in sources if plugin != form_id[3]]
+			if all(version == overrides[0] for version in overrides[1:]):
+				continue
+
+			signatures = dict.fromkeys(signature for version in versions.values() for signature, _ in version)
+			differences = {}
+			for signature in signatures:
+				groups: Dict[Tuple[bytes, ...], List[str]] = {}
+				for plugin, version in versions.items():
+					value = tuple(data for s, data in version if s == signature)
+					groups.setdefault(value, []).append(names[plugin])
+				if len(groups) > 1:
+					differences[signature] = [tuple(group) for group in groups.values()]
+
+			conflicts.append(Conflict(form_id, record_type, tuple(names[plugin] for plugin, _ in sources), differences))
+
+	finally:
+		for buffer in buffers.values():
+			if isinstance(buffer, mmap.mmap):
+				buffer.close()
+
+	return conflicts
+
+
+def iter_conflicts(
+		plugins: Sequence[PathLike],
+		processes: Optional[int] = None,
+		chunk_size: int = 256,
+		save: bool = True,
+		) -> Iterator[Conflict]:
+	"""
+	Iterate over the records overridden by more than one plugin, where the overrides differ.
+
+	The record headers of each plugin are scanned in a process pool, and cached in a
+	:class:`~.RecordIndex` sidecar file next to the plugin. Only the records overridden by more than one plugin
+	are then read, and compared subrecord by subrecord, also in the process pool.
+	Form IDs within the records are rewritten in terms of the full load order before comparing.
+
+	:param plugins: The paths to the ESP files, in load order.
+	:param processes: The number of worker processes. Defaults to the number of processors.
+	:param chunk_size: The number of records compared by each task.
+	:param save: Whether to save the sidecar files for plugins which had to be scanned.
+
+	:returns: An iterator of conflicts, in the order the records first appear in the load order.
+	"""
+
+	plugins = [str(plugin) for plugin in plugins]
+	names = [PathPlus(plugin).name for plugin in plugins]
+
+	with ProcessPoolExecutor(processes) as executor:
+		tables = []
+		sources: Dict[bytes, List[Tuple[int, int]]] = {}
+		record_types: Dict[bytes, bytes] = {}
+
+		scans = executor.map(_scan_plugin, plugins, [save] * len(plugins))
+		for plugin, (name, index) in enumerate(zip(names, scans)):
+			table = master_table(index.masters, name, names)
+			tables.append(table)
+			for form_id, location in index.records.items():
+				form_id = remap_form_id(form_id, table)
+				sources.setdefault(form_id, []).append((plugin, location.offset))
+				record_types.setdefault(form_id, location.type)
+
+		candidates = [
+				(form_id, record_types[form_id], tuple(overrides))
+				for form_id, overrides in sources.items()
+				if sum(plugin != form_id[3] for plugin, _ in overrides) > 1
+				]
+		del sources
+
+		chunks = [candidates[start:start + chunk_size] for start in range(0, len(candidates), chunk_size)]
+		for conflicts in executor.map(_compare_records, [plugins] * len(chunks), [tables] * len(chunks), chunks):
+			yield from conflicts
+
+
+def write_conflict_report(
+		plugins: Sequence[PathLike],
+		fp: IO[str],
+		processes: Optional[int] = None,
+		chunk_size: int = 256,
+		save: bool = True,
+		) -> int:
+	"""
+	Write a report of the conflicting records in a load order as `JSON Lines <https://jsonlines.org/>`_,
+	one conflict per line, as the conflicts are found.
+
+	:param plugins: The paths to the ESP files, in load order.
+	:param fp: The file to write the report to.
+	:param processes: The number of worker processes. Defaults to the number of processors.
+	:param chunk_size: The number of records compared by each task.
+	:param save: Whether to save the sidecar files for plugins which had to be scanned.
+
+	:returns: The number of conflicts.
+	"""
+
+	count = 0
+	for conflict in iter_conflicts(plugins, processes, chunk_size, save):
+		fp.write(json.dumps(conflict.to_json()))
+		fp.write("\n")
+		count += 1
+
+	return count
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+#
+#  diff.py
+"""
+Comparison of two revisions of an ESP file.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+# stdlib
+import mmap
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# 3rd party
+import attrs
+from domdf_python_tools.typing import PathLike
+
+# this package
+from esp_parser.scan import Buffer, header_at, iter_records, map_plugin, parse_record, record_fingerprint
+from esp_parser.types import RecordType, StructRecord
+
+__all__ = ["PluginDiff", "RecordDiff", "SubrecordChange", "diff_plugins"]
+
+# Record flag for compressed data, which is ignored when comparing records.
+_COMPRESSED = 0x00040000
+
+
+class SubrecordChange(NamedTuple):
+	"""
+	A subrecord which was added, removed or changed between two revisions of a record.
+	"""
+
+	#: The subrecord type, e.g. ``b"DATA"``.
+	type: bytes
+
+	#: The subrecord in the old revision, or :py:obj:`None` if it was added.
+	old: Optional[RecordType]
+
+	#: The subrecord in the new revision, or :py:obj:`None` if it was removed.
+	new: Optional[RecordType]
+
+	#: For subrecords with named fields, a mapping of the names of the fields which changed to their old and new values.
+	fields: Dict[str, Tuple[Any, Any]] = {}
+
+
+class RecordDiff(NamedTuple):
+	"""
+	The differences between two revisions of a record.
+	"""
+
+	#: 4-byte form ID
+	form_id: bytes
+
+	#: The record type, e.g. ``b"WEAP"``.
+	type: bytes
+
+	#: The old and new record flags, or :py:obj:`None` if they are unchanged.
+	flags: Optional[Tuple[int, int]]
+
+	changes: List[SubrecordChange]
+
+
+class PluginDiff(NamedTuple):
+	"""
+	The differences between two revisions of an ESP file.
+	"""
+
+	#: The form IDs of the records only in the new revision, in the order they appear.
+	added: List[bytes]
+
+	#: The form IDs of the records only in the old revision, in the order they appeared.
+	removed: List[bytes]
+
+	#: The records in both revisions which differ, in the order they appear in the new revision.
+	changed: List[RecordDiff]
+
+	def __bool__(self) -> bool:
+		return bool(self.added or self.removed or self.changed)
+
+
+def _signature(subrecord: RecordType) -> bytes:
+	name = type(subrecord).__name__
+	if len(name) == 6 and name.startswith("x"):
+		# Signatures starting with a non-printable byte, e.g. ``x00IAD`` for ``b"\x00IAD"``.
+		return bytes([int(name[1:3], 16)]) + name[3:].encode()
+	return name.encode()
+
+
+def _field_names(subrecord: RecordType) -> Optional[Sequence[str]]:
+	if isinstance(subrecord, StructRecord):
+		return subrecord.get_field_names()
+	elif attrs.has(type(subrecord)):
+		return [field.name for field in attrs.fields(type(subrecord))]
+	elif isinstance(subrecord, tuple) and hasattr(subrecord, "_fields"):
+		return subrecord._fields
+	return None
+
+
+def _field_changes(old: RecordType, new: RecordType) -> Dict[str, Tuple[Any, Any]]:
+	if type(old) is not type(new):
+		return {}
+
+	names = _field_names(old)
+	if names is None:
+		return {}
+
+	changes = {}
+	for name in names:
+		old_value, new_value = getattr(old, name), getattr(new, name)
+		if old_value != new_value:
+			changes[name] = (old_value, new_value)
+
+	return changes
+
+
+def _subrecord_changes(old: Sequence[RecordType], new: Sequence[RecordType]) -> List[SubrecordChange]:
+	# Subrecords are aligned by their raw bytes, so repeated subrecords (e.g. inventory items) are matched up.
+	matcher = SequenceMatcher(None, [s.unparse() for s in old], [s.unparse() for s in new], autojunk=False)
+	changes = []
+
+	for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+		if tag == "equal":
+			continue
+
+		removed = list(old[old_start:old_end])
+		added = list(new[new_start:new_end])
+
+		# Pair up subrecords of the same type which were changed in place.
+		while removed and added and type(removed[0]) is type(added[0]):
+			old_subrecord, new_subrecord = removed.pop(0), added.pop(0)
+			changes.append(
+					SubrecordChange(
+							_signature(new_subrecord),
+							old_subrecord,
+							new_subrecord,
+							_field_changes(old_subrecord, new_subrecord),
+							)
+					)
+
+		changes.extend(SubrecordChange(_signature(s), s, None) for s in removed)
+		changes.extend(SubrecordChange(_signature(s), None, s) for s in added)
+
+	return changes
+
+
+def _record_digests(buffer: Buffer) -> Dict[bytes, Tuple[int, bytes]]:
+	# Mapping of form IDs to the offset and fingerprint of the record.
+	return {header.id: (header.offset, record_fingerprint(buffer, header)) for header in iter_records(buffer)}
+
+
+def diff_plugins(old: PathLike, new: PathLike) -> PluginDiff:
+	"""
+	Compare two revisions of an ESP file.
+
+	Every record is fingerprinted (see :func:`~.record_fingerprint`) during a scan of the record headers,
+	and only the records whose fingerprints differ are decoded.
+	The subrecords of each changed record are compared, and for subrecords with named fields
+	(e.g. :class:`~.StructRecord` and attrs classes) the fields which changed are given.
+
+	Compressed records are compared by their decompressed data.
+
+	:param old: The path to the old revision of the ESP file.
+	:param new: The path to the new revision of the ESP file.
+	"""
+
+	old_buffer = map_plugin(old)
+	new_buffer = map_plugin(new)
+
+	try:
+		if memoryview(old_buffer) == memoryview(new_buffer):
+			return PluginDiff([], [], [])
+
+		old_digests = _record_digests(old_buffer)
+		new_digests = _record_digests(new_buffer)
+
+		added = [form_id for form_id in new_digests if form_id not in old_digests]
+		removed = [form_id for form_id in old_digests if form_id not in new_digests]
+		changed = []
+
+		for form_id, (new_offset, new_digest) in new_digests.items():
+			if form_id not in old_digests:
+				continue
+
+			old_offset, old_digest = old_digests[form_id]
+			if old_digest == new_digest:
+				continue
+
+			old_header = header_at(old_buffer, old_offset)
+			new_header = header_at(new_buffer, new_offset)
+			old_record = parse_record(old_buffer, old_header)
+			new_record = parse_record(new_buffer, new_header)
+
+			flags = None
+			if (old_record.flags ^ new_record.flags) & ~_COMPRESSED:
+				flags = (old_record.flags, new_record.flags)
+
+			changes = _subrecord_changes(old_record.data, new_record.data)
+			changed.append(RecordDiff(form_id, new_header.type, flags, changes))
+
+	finally:
+		for buffer in (old_buffer, new_buffer):
+			if isinstance(buffer, mmap.mmap):
+				buffer.close()
+
+	return PluginDiff(added, removed, changed)
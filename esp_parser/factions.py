@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+#
+#  factions.py
+"""
+Faction relationships across a load order.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from typing import Dict, Mapping, NamedTuple, Optional, Sequence, Set, Type, Union
+
+# 3rd party
+import attrs
+from domdf_python_tools.typing import PathLike
+from typing_extensions import Self
+
+# this package
+from esp_parser.formids import iter_load_order, remap_form_id
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+from esp_parser.subrecords import XNAM, XnamCombatReactionEnum, _xnam_struct
+from esp_parser.types import Record
+
+__all__ = ["FactionRelations", "Relation"]
+
+_FRIENDLY = frozenset({XnamCombatReactionEnum.Ally, XnamCombatReactionEnum.Friend})
+
+
+class Relation(NamedTuple):
+	"""
+	A faction's relation to another faction or race (an ``XNAM`` subrecord).
+	"""
+
+	modifier: int = 0
+
+	#: The group combat reaction, or its value as stored if it is not one of :class:`~.XnamCombatReactionEnum`.
+	reaction: Union[XnamCombatReactionEnum, int] = XnamCombatReactionEnum.Neutral
+
+
+def _reaction(value: int) -> Union[XnamCombatReactionEnum, int]:
+	# Unknown reactions are kept as their value as stored, rather than being rejected.
+	try:
+		return XnamCombatReactionEnum(value)
+	except ValueError:
+		return value
+
+
+@attrs.define
+class FactionRelations:
+	"""
+	Sparse matrix of the relations between factions, from the ``XNAM`` subrecords of :class:`~.FACT` records.
+
+	Relations are directional: the relation from faction ``A`` to faction ``B`` is stored on ``A``'s record.
+	Pairs of factions without a relation are neutral towards each other.
+	"""
+
+	#: Mapping of the form IDs of factions to the factions they have relations with, and those relations.
+	relations: Dict[bytes, Dict[bytes, Relation]] = attrs.field(factory=dict)
+
+	# The factions with each reaction towards each faction.
+	_incoming: Dict[bytes, Dict[Union[XnamCombatReactionEnum, int], Set[bytes]]] = attrs.field(
+			factory=dict,
+			init=False,
+			repr=False,
+			eq=False,
+			)
+
+	def __attrs_post_init__(self) -> None:
+		for faction, relations in self.relations.items():
+			self._link(faction, relations)
+
+	def _link(self, faction: bytes, relations: Mapping[bytes, Relation]) -> None:
+		for target, relation in relations.items():
+			self._incoming.setdefault(target, {}).setdefault(relation.reaction, set()).add(faction)
+
+	def set_relations(self, faction: bytes, relations: Mapping[bytes, Relation]) -> None:
+		"""
+		Add or replace (override) the relations of a faction.
+
+		:param faction: The form ID of the :class:`~.FACT` record.
+		:param relations: Mapping of the form IDs of other factions to relations.
+		"""
+
+		self.remove(faction)
+		self.relations[faction] = dict(relations)
+		self._link(faction, relations)
+
+	def remove(self, faction: bytes) -> None:
+		"""
+		Remove the relations of a faction, e.g. after the record is deleted.
+
+		:param faction: The form ID of the :class:`~.FACT` record.
+		"""
+
+		for target, relation in self.relations.pop(faction, {}).items():
+			reactions = self._incoming[target]
+			reactions[relation.reaction].discard(faction)
+			if not reactions[relation.reaction]:
+				del reactions[relation.reaction]
+			if not reactions:
+				del self._incoming[target]
+
+	def update(self, record: Record) -> None:
+		"""
+		Add or replace the relations of a faction after the record has been changed.
+
+		:param record: A :class:`~.FACT` record.
+		"""
+
+		self.set_relations(
+				record.id,
+				{
+						s.faction: Relation(s.modifier, _reaction(s.group_combat_reaction))
+						for s in record.data
+						if isinstance(s, XNAM)
+						},
+				)
+
+	def add_plugin(self, buffer: Buffer, table: Optional[bytes] = None) -> None:
+		"""
+		Add the factions in an ESP file, overriding any factions already added with the same form IDs.
+
+		:param buffer: The raw bytes of the ESP file.
+		:param table: A table returned by :func:`~.master_table` to rewrite the plugin's form IDs
+			in terms of the full load order.
+		"""
+
+		for header in iter_records(buffer, {b"FACT"}):
+			payload = record_payload(buffer, header)
+			relations = {}
+			for subrecord in iter_subrecords(payload):
+				if subrecord.type == b"XNAM" and subrecord.size >= 12:
+					target, modifier, reaction = _xnam_struct.unpack_from(payload, subrecord.offset)
+					if table is not None:
+						target = remap_form_id(target, table)
+					relations[target] = Relation(modifier, _reaction(reaction))
+
+			faction = header.id if table is None else remap_form_id(header.id, table)
+			self.set_relations(faction, relations)
+
+	@classmethod
+	def from_load_order(cls: Type[Self], plugins: Sequence[PathLike]) -> Self:
+		"""
+		Construct from the factions in the given ESP files, with later plugins overriding earlier ones.
+
+		Form IDs are rewritten in terms of the full load order, so the last byte of each as stored
+		(the most significant) is the index of the plugin in ``plugins`` which created the record.
+
+		:param plugins: The paths to the ESP files, in load order.
+		"""
+
+		matrix = cls()
+
+		for _, buffer, table in iter_load_order(plugins):
+			matrix.add_plugin(buffer, table)
+
+		return matrix
+
+	def relation(self, faction: bytes, other: bytes) -> Relation:
+		"""
+		Returns the relation from one faction to another.
+
+		:param faction: The form ID of the :class:`~.FACT` record.
+		:param other: The form ID of the other :class:`~.FACT` (or :class:`~.RACE`) record.
+		"""
+
+		return self.relations.get(faction, {}).get(other, Relation())
+
+	def reaction(self, faction: bytes, other: bytes) -> Union[XnamCombatReactionEnum, int]:
+		"""
+		Returns the combat reaction of one faction towards another.
+
+		:param faction: The form ID of the :class:`~.FACT` record.
+		:param other: The form ID of the other :class:`~.FACT` (or :class:`~.RACE`) record.
+		"""
+
+		return self.relation(faction, other).reaction
+
+	def with_reaction(self, faction: bytes, *reactions: XnamCombatReactionEnum) -> Set[bytes]:
+		"""
+		Returns the factions with any of the given reactions towards a faction.
+
+		Factions are neutral to a faction unless they have a relation with it,
+		so only the factions which do are returned for :attr:`~.XnamCombatReactionEnum.Neutral`.
+
+		:param faction: The form ID of the :class:`~.FACT` record.
+		:param reactions:
+		"""
+
+		incoming = self._incoming.get(faction, {})
+		return set().union(*(incoming.get(reaction, ()) for reaction in reactions))
+
+	def hostile_to(self, faction: bytes) -> Set[bytes]:
+		"""
+		Returns the factions which are enemies of a faction.
+
+		:param faction: The form ID of the :class:`~.FACT` record.
+		"""
+
+		return self.with_reaction(faction, XnamCombatReactionEnum.Enemy)
+
+	def allies(self, faction: bytes) -> Set[bytes]:
+		"""
+		Returns the factions a faction is allied or friendly with.
+
+		This includes factions reached through other allied or friendly factions.
+		The faction itself is not included unless it is reached again through its allies.
+
+		:param faction: The form ID of the :class:`~.FACT` record.
+		"""
+
+		pending = [faction]
+		seen: Set[bytes] = set()
+
+		while pending:
+			current = pending.pop()
+			for target, relation in self.relations.get(current, {}).items():
+				if relation.reaction in _FRIENDLY and target not in seen:
+					seen.add(target)
+					pending.append(target)
+
+		return seen
+
+	def enemies(self, faction: bytes) -> Set[bytes]:
+		"""
+		Returns the factions which a faction, or any of its allies, regards as an enemy.
+
+		Allies are found with :meth:`~.FactionRelations.allies`.
+
+		:param faction: The form ID of the :class:`~.FACT` record.
+		"""
+
+		enemies = set()
+		for member in self.allies(faction) | {faction}:
+			for target, relation in self.relations.get(member, {}).items():
+				if relation.reaction == XnamCombatReactionEnum.Enemy:
+					enemies.add(target)
+
+		return enemies
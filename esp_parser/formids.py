@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+#
+#  formids.py
+"""
+Locating form IDs within the raw data of records.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import functools
+import mmap
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+
+# this package
+from esp_parser import records, subrecords
+from esp_parser.scan import Buffer, header_at, iter_subrecords, map_plugin, record_payload
+from esp_parser.types import FormIDArrayRecord
+from esp_parser.utils import NULL
+
+__all__ = ["form_id_offsets", "iter_form_ids", "iter_load_order", "master_table", "read_masters", "remap_form_id"]
+
+# A tuple of offsets, None for form ID arrays (where every 4 bytes is a form ID),
+# or a function returning the offsets for subrecords whose layout depends on their data.
+_Offsets = Union[None, Tuple[int, ...], Callable[[Buffer], Sequence[int]]]
+
+
+def _subrecord_offsets(cls: type) -> _Offsets:
+	if isinstance(cls, type) and issubclass(cls, FormIDArrayRecord):
+		return None
+	if hasattr(cls, "get_form_id_offsets"):
+		return cls.get_form_id_offsets  # type: ignore[attr-defined]
+	return tuple(getattr(cls, "form_id_offsets", ()))
+
+
+@functools.lru_cache(1)
+def _shared_subrecords() -> Dict[bytes, _Offsets]:
+	# Subrecords from esp_parser.subrecords which contain form IDs, by signature.
+	shared: Dict[bytes, _Offsets] = {}
+
+	for name in subrecords.__all__:
+		obj = getattr(subrecords, name)
+		candidates = [(name, obj)] + [(attr, getattr(obj, attr)) for attr in vars(obj) if len(attr) == 4]
+		for attr, cls in candidates:
+			if len(attr) == 4 and isinstance(cls, type) and attr.isupper():
+				offsets = _subrecord_offsets(cls)
+				if offsets != ():
+					shared.setdefault(attr.encode(), offsets)
+
+	return shared
+
+
+@functools.lru_cache(None)
+def _offsets_for(record_type: bytes, signature: bytes) -> _Offsets:
+	record_class = getattr(records, record_type.decode("latin-1"), None)
+
+	attr_name = signature.decode("latin-1")
+	if signature[:1] < b'A':
+		attr_name = f"x{signature[0]:02x}" + attr_name[1:]
+
+	subrecord_class = getattr(record_class, attr_name, None) if record_class is not None else None
+	if isinstance(subrecord_class, type):
+		return _subrecord_offsets(subrecord_class)
+
+	return _shared_subrecords().get(signature, ())
+
+
+def form_id_offsets(
+		record_type: bytes,
+		signature: bytes,
+		size: int,
+		data: Optional[Buffer] = None,
+		) -> Sequence[int]:
+	"""
+	Returns the offsets of the form IDs within a subrecord's data.
+
+	Form IDs are found in :class:`~.FormIDRecord` and :class:`~.FormIDArrayRecord` subrecords,
+	and in the fields of other subrecords listed in their ``form_id_offsets`` attribute
+	(e.g. :attr:`Item.CNTO.item <.Item.CNTO.item>`).
+	Subrecords whose layout depends on their contents (e.g. :class:`Model.MODS <.Model.MODS>`,
+	and :class:`~.CTDA`, whose parameters are form IDs only for some functions)
+	instead provide a ``get_form_id_offsets`` method.
+
+	:param record_type: The type of the record containing the subrecord, e.g. ``b"CONT"``.
+	:param signature: The subrecord type, e.g. ``b"CNTO"``.
+	:param size: The size of the subrecord's data.
+	:param data: The subrecord's data. Required to locate the form IDs in subrecords with a variable layout;
+		without it no offsets are returned for those subrecords.
+	"""
+
+	offsets = _offsets_for(record_type, signature)
+	if offsets is None:
+		return range(0, size - size % 4, 4)
+	elif callable(offsets):
+		if data is None:
+			return []
+		offsets = offsets(data)
+
+	return [offset for offset in offsets if offset + 4 <= size]
+
+
+def iter_form_ids(record_type: bytes, payload: bytes) -> Iterator[Tuple[bytes, int, bytes]]:
+	"""
+	Returns an iterator over the non-null form IDs in a record's data, without parsing the record.
+
+	:param record_type: The record type, e.g. ``b"CONT"``.
+	:param payload: The record's data, as returned by :func:`~.record_payload`.
+
+	:returns: An iterator of ``(signature, offset, form_id)`` tuples,
+		where ``offset`` is the offset of the form ID within ``payload``.
+	"""
+
+	view = memoryview(payload)
+	for subrecord in iter_subrecords(payload):
+		data = view[subrecord.offset:subrecord.end]
+		for offset in form_id_offsets(record_type, subrecord.type, subrecord.size, data):
+			offset += subrecord.offset
+			form_id = payload[offset:offset + 4]
+			if form_id != NULL:
+				yield subrecord.type, offset, form_id
+
+
+def read_masters(buffer: Buffer) -> List[str]:
+	"""
+	Returns the names of an ESP file's masters, from the ``MAST`` subrecords of its :class:`~.TES4` record.
+
+	:param buffer: The raw bytes of the ESP file.
+	"""
+
+	if not len(buffer):
+		return []
+
+	payload = record_payload(buffer, header_at(buffer, 0))
+	return [
+			payload[subrecord.offset:subrecord.end].rstrip(b"\x00").decode("cp1252")
+			for subrecord in iter_subrecords(payload)
+			if subrecord.type == b"MAST"
+			]
+
+
+def master_table(masters: Sequence[str], plugin: str, load_order: Sequence[str]) -> bytes:
+	"""
+	Returns a table mapping the load order indexes of an ESP file's form IDs to their indexes in the full load order.
+
+	The last byte of a form ID as stored (the most significant, as form IDs are little-endian) is the index
+	of the plugin which created the record within the plugin's masters,
+	or the number of masters for records the plugin created itself.
+
+	:param masters: The names of the plugin's masters, as returned by :func:`~.read_masters`.
+	:param plugin: The name of the plugin.
+	:param load_order: The names of every plugin in the load order. Names are compared case-insensitively.
+
+	:returns: A 256 byte table for :func:`~.remap_form_id`.
+	"""
+
+	positions = {name.casefold(): index for index, name in enumerate(load_order)}
+	indexes = []
+	for name in [*masters, plugin]:
+		if name.casefold() not in positions:
+			raise ValueError(f"{name!r} (a master of {plugin!r}) is not in the load order")
+		indexes.append(positions[name.casefold()])
+
+	return bytes(indexes + [indexes[-1]] * (256 - len(indexes)))
+
+
+def iter_load_order(plugins: Sequence[PathLike]) -> Iterator[Tuple[str, Buffer, bytes]]:
+	"""
+	Iterate over the given ESP files, mapping each into memory with :func:`~.map_plugin` in turn.
+
+	Yields each plugin's name, its raw bytes, and a table returned by :func:`~.master_table`
+	to rewrite its form IDs in terms of the full load order, so the last byte of each as stored
+	(the most significant) is the index of the plugin in ``plugins`` which created the record.
+
+	Each plugin is closed once the next is requested, so its raw bytes must not be kept.
+
+	:param plugins: The paths to the ESP files, in load order.
+
+	:raises ValueError: If a plugin's master is not in the load order.
+	"""
+
+	names = [PathPlus(plugin).name for plugin in plugins]
+
+	for plugin, name in zip(plugins, names):
+		buffer = map_plugin(plugin)
+		try:
+			yield name, buffer, master_table(read_masters(buffer), name, names)
+		finally:
+			if isinstance(buffer, mmap.mmap):
+				buffer.close()
+
+
+def remap_form_id(form_id: bytes, table: bytes) -> bytes:
+	"""
+	Rewrite a form ID from one ESP file in terms of the full load order.
+
+	:param form_id:
+	:param table: A table returned by :func:`~.master_table`.
+	"""
+
+	if form_id == NULL:
+		return form_id
+
+	return form_id[:3] + table[form_id[3]:form_id[3] + 1]
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+#
+#  formlists.py
+"""
+Expansion of nested form lists.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from typing import Dict, FrozenSet, Iterable, Optional, Sequence, Set, Tuple, Type
+
+# 3rd party
+import attrs
+from domdf_python_tools.typing import PathLike
+from typing_extensions import Self
+
+# this package
+from esp_parser.formids import iter_load_order, remap_form_id
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+from esp_parser.types import Record
+
+__all__ = ["FormLists"]
+
+
+@attrs.define
+class FormLists:
+	"""
+	Resolves form lists (:class:`~.FLST` records) to the set of form IDs they contain.
+
+	Form lists nested within a list are replaced by their contents.
+	Expanded lists are cached, and when a list changes only the cached expansions of that list
+	and the lists which contain it (directly or indirectly) are discarded.
+	"""
+
+	#: Mapping of the form IDs of form lists to their direct members (``LNAM``).
+	lists: Dict[bytes, Tuple[bytes, ...]] = attrs.field(factory=dict)
+
+	_expanded: Dict[bytes, FrozenSet[bytes]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+
+	# The form lists directly containing each form list.
+	_parents: Dict[bytes, Set[bytes]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+
+	def __attrs_post_init__(self) -> None:
+		for form_id, members in self.lists.items():
+			self._link(form_id, members)
+
+	def _link(self, form_id: bytes, members: Iterable[bytes]) -> None:
+		for member in members:
+			self._parents.setdefault(member, set()).add(form_id)
+
+	def _invalidate(self, form_id: bytes) -> None:
+		pending = [form_id]
+		seen = set()
+		while pending:
+			current = pending.pop()
+			if current in seen:
+				continue
+			seen.add(current)
+			self._expanded.pop(current, None)
+			pending.extend(self._parents.get(current, ()))
+
+	def update_list(self, form_id: bytes, members: Iterable[bytes]) -> None:
+		"""
+		Add or replace a form list.
+
+		:param form_id: The form ID of the :class:`~.FLST` record.
+		:param members: The form IDs in the list.
+		"""
+
+		self.remove(form_id)
+		self.lists[form_id] = members = tuple(members)
+		self._link(form_id, members)
+
+	def remove(self, form_id: bytes) -> None:
+		"""
+		Remove a form list, e.g. after the record is deleted.
+
+		:param form_id: The form ID of the :class:`~.FLST` record.
+		"""
+
+		self._invalidate(form_id)
+
+		members = self.lists.pop(form_id, ())
+		for member in members:
+			parents = self._parents[member]
+			parents.discard(form_id)
+			if not parents:
+				del self._parents[member]
+
+	def update(self, record: Record) -> None:
+		"""
+		Add or replace a form list after the record has been changed.
+
+		:param record: A :class:`~.FLST` record.
+		"""
+
+		self.update_list(record.id, [bytes(s) for s in record.data if s.__class__.__name__ == "LNAM"])
+
+	def add_plugin(self, buffer: Buffer, table: Optional[bytes] = None) -> None:
+		"""
+		Add the form lists in an ESP file, overriding any lists already added with the same form IDs.
+
+		:param buffer: The raw bytes of the ESP file.
+		:param table: A table returned by :func:`~.master_table` to rewrite the plugin's form IDs
+			in terms of the full load order.
+		"""
+
+		for header in iter_records(buffer, {b"FLST"}):
+			payload = record_payload(buffer, header)
+			members = [payload[s.offset:s.end] for s in iter_subrecords(payload) if s.type == b"LNAM"]
+			if table is None:
+				self.update_list(header.id, members)
+			else:
+				self.update_list(remap_form_id(header.id, table), [remap_form_id(member, table) for member in members])
+
+	@classmethod
+	def from_load_order(cls: Type[Self], plugins: Sequence[PathLike]) -> Self:
+		"""
+		Construct from the form lists in the given ESP files, with later plugins overriding earlier ones.
+
+		Form IDs are rewritten in terms of the full load order, so the last byte of each as stored
+		(the most significant) is the index of the plugin in ``plugins`` which created the record.
+
+		:param plugins: The paths to the ESP files, in load order.
+		"""
+
+		form_lists = cls()
+
+		for _, buffer, table in iter_load_order(plugins):
+			form_lists.add_plugin(buffer, table)
+
+		return form_lists
+
+	def expand(self, form_id: bytes) -> FrozenSet[bytes]:
+		"""
+		Returns the form IDs in a form list, replacing nested form lists with their contents.
+
+		:param form_id: The form ID of the :class:`~.FLST` record.
+
+		:raises ValueError: If the list contains itself, directly or through other lists.
+		"""
+
+		return self._expand(form_id, ())
+
+	def _expand(self, form_id: bytes, stack: Tuple[bytes, ...]) -> FrozenSet[bytes]:
+		if form_id in self._expanded:
+			return self._expanded[form_id]
+
+		if form_id in stack:
+			cycle = " -> ".join(f.hex() for f in stack[stack.index(form_id):] + (form_id, ))
+			raise ValueError(f"Form list cycle: {cycle}")
+
+		stack += (form_id, )
+		expanded: Set[bytes] = set()
+		for member in self.lists[form_id]:
+			if member in self.lists:
+				expanded.update(self._expand(member, stack))
+			else:
+				expanded.add(member)
+
+		self._expanded[form_id] = result = frozenset(expanded)
+		return result
+
+	def contains(self, form_id: bytes, member: bytes) -> bool:
+		"""
+		Returns whether a form list contains the given form ID, directly or through a nested list.
+
+		:param form_id: The form ID of the :class:`~.FLST` record.
+		:param member:
+		"""
+
+		return member in self.expand(form_id)
+
+	def union(self, *form_ids: bytes) -> FrozenSet[bytes]:
+		"""
+		Returns the form IDs in any of the given form lists.
+
+		:param form_ids: The form IDs of :class:`~.FLST` records.
+		"""
+
+		return frozenset().union(*map(self.expand, form_ids))
+
+	def intersection(self, *form_ids: bytes) -> FrozenSet[bytes]:
+		"""
+		Returns the form IDs in all of the given form lists.
+
+		:param form_ids: The form IDs of :class:`~.FLST` records.
+		"""
+
+		if not form_ids:
+			return frozenset()
+
+		return self.expand(form_ids[0]).intersection(*map(self.expand, form_ids[1:]))
+
+	def difference(self, form_id: bytes, *others: bytes) -> FrozenSet[bytes]:
+		"""
+		Returns the form IDs in the first form list but not in any of the others.
+
+		:param form_id: The form ID of a :class:`~.FLST` record.
+		:param others: The form IDs of :class:`~.FLST` records.
+		"""
+
+		return self.expand(form_id).difference(*map(self.expand, others))
@@ -27,9 +27,11 @@ Group (``GRUP``) of records.
 #
 
 # stdlib
+import copy
+import hashlib
 import struct
 from io import BytesIO
-from typing import List, Type, Union
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Type, Union
 
 # 3rd party
 import attrs
@@ -41,6 +43,14 @@ from esp_parser.types import IntEnum, RecordType
 
 __all__ = ["Group", "GroupTypeEnum"]
 
+# A group's label, type, date stamp and unknown field, as pickled.
+_pickle_header_struct = struct.Struct("<4sIH6s")
+
+
+def _unpickle_group(header: bytes, data: List[Union[RecordType, "Group"]]) -> "Group":
+	label, group_type, stamp, unknown = _pickle_header_struct.unpack(header)
+	return Group(label, GroupTypeEnum(group_type), stamp, unknown, data)
+
 
 class GroupTypeEnum(IntEnum):
 	"""
@@ -112,8 +122,44 @@ class Group:
 		Turn this group back into raw bytes for an ESP file.
 		"""
 
-		body = b"".join(subrecord.unparse() for subrecord in self.data)
-		group_size = len(body) + 24
+		if self.group_type == GroupTypeEnum.TopLevel and self.label == b"WRLD":
+			# this package
+			from esp_parser.records import WRLD
+
+			# The worldspaces' cell offset tables depend on the layout of the cells as written.
+			body = WRLD._unparse_worlds(self.data)
+		else:
+			body = b"".join(subrecord.unparse() for subrecord in self.data)
+
+		return self._pack_header(len(body) + 24) + body
+
+	def _pack_header(self, group_size: int) -> bytes:
 		packed = struct.pack("<I4sIH6s", group_size, self.label, self.group_type, self.stamp, self.unknown)
+		return b"GRUP" + packed
+
+	def fingerprint(self) -> bytes:
+		"""
+		Returns a 16-byte BLAKE2 digest of the group's label, type and the fingerprints of its records and groups.
+
+		The date stamp is not included, so groups with the same content have the same fingerprint
+		whenever they were saved. See :meth:`Record.fingerprint() <.Record.fingerprint>`.
+		"""
+
+		digest = hashlib.blake2b(b"GRUP", digest_size=16)
+		digest.update(self.label)
+		digest.update(struct.pack("<I", self.group_type))
+		for child in self.data:
+			digest.update(child.fingerprint())  # type: ignore[attr-defined]
+
+		return digest.digest()
+
+	def __reduce__(self) -> Tuple[Callable[..., "Group"], Tuple[Any, ...]]:
+		# Groups are pickled as their packed header fields and children, which in turn pickle as their raw data.
+		header = _pickle_header_struct.pack(self.label, self.group_type, self.stamp, self.unknown)
+		return _unpickle_group, (header, list(self.data))
+
+	def __copy__(self) -> Self:
+		return attrs.evolve(self)
 
-		return b"GRUP" + packed + body
+	def __deepcopy__(self, memo: Dict[int, Any]) -> Self:
+		return attrs.evolve(self, data=copy.deepcopy(self.data, memo))
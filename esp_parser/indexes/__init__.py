@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+#
+#  __init__.py
+"""
+Indexes over the contents of ESP files, built without fully parsing them.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# this package
+from esp_parser.indexes._cells import ExteriorCell, ExteriorCellIndex, load_exterior_cell
+from esp_parser.indexes._conditions import Condition, ConditionIndex
+from esp_parser.indexes._dialogue import DialogueIndex, DialogueResponse, DialogueTopic
+from esp_parser.indexes._edid import EditorIDEntry, EditorIDIndex
+from esp_parser.indexes._effects import EffectIndex, EffectUsage
+from esp_parser.indexes._inventory import Holding, InventoryIndex
+from esp_parser.indexes._records import RecordIndex, RecordLocation
+from esp_parser.indexes._references import Reference, ReferenceIndex
+from esp_parser.indexes._scripts import ScriptEntry, ScriptIndex, ScriptVariable
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.indexes._spatial import SpatialEntry, SpatialIndex
+from esp_parser.indexes._text import TextEntry, TextIndex
+
+__all__ = [
+		"Condition",
+		"ConditionIndex",
+		"DialogueIndex",
+		"DialogueResponse",
+		"DialogueTopic",
+		"EditorIDEntry",
+		"EditorIDIndex",
+		"EffectIndex",
+		"EffectUsage",
+		"ExteriorCell",
+		"ExteriorCellIndex",
+		"Holding",
+		"InventoryIndex",
+		"RecordIndex",
+		"RecordLocation",
+		"Reference",
+		"ReferenceIndex",
+		"ScriptEntry",
+		"ScriptIndex",
+		"ScriptVariable",
+		"SidecarIndex",
+		"SpatialEntry",
+		"SpatialIndex",
+		"TextEntry",
+		"TextIndex",
+		"load_exterior_cell",
+		]
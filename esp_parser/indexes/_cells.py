@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+#
+#  _cells.py
+"""
+Index of exterior cells, and random access to them.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import mmap
+import struct
+from io import BytesIO
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Type
+
+# 3rd party
+import attrs
+from domdf_python_tools.typing import PathLike
+from typing_extensions import Self
+
+# this package
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.scan import (
+		Buffer,
+		RecordHeader,
+		header_at,
+		iter_records,
+		iter_subrecords,
+		map_plugin,
+		parse_record,
+		record_payload
+		)
+from esp_parser.types import RecordType
+
+__all__ = ["ExteriorCell", "ExteriorCellIndex", "load_exterior_cell"]
+
+_grid_struct = struct.Struct("<ii")
+_group_struct = struct.Struct("<4sI4si")
+
+
+def _cell_grid(buffer: Buffer, header: RecordHeader) -> Optional[Tuple[int, int]]:
+	# Returns the grid coordinates of the CELL record, from its XCLC subrecord.
+
+	payload = record_payload(buffer, header)
+	for subrecord in iter_subrecords(payload):
+		if subrecord.type == b"XCLC":
+			return _grid_struct.unpack_from(payload, subrecord.offset)
+
+	return None
+
+
+class ExteriorCell(NamedTuple):
+	"""
+	An exterior cell loaded by :func:`~.load_exterior_cell`.
+	"""
+
+	#: The :class:`~.CELL` record.
+	cell: RecordType
+
+	#: The :attr:`~.GroupTypeEnum.CellChildren` group containing the cell's references, if it has any.
+	children: Optional[Group]
+
+
+@attrs.define
+class ExteriorCellIndex(SidecarIndex):
+	"""
+	Maps the grid coordinates of each worldspace's exterior cells to the locations of their :class:`~.CELL` records.
+
+	Used by :func:`~.load_exterior_cell` when a worldspace's :class:`~.WRLD.OFST` is missing or out of date.
+	"""
+
+	kind = "cells"
+
+	#: Mapping of worldspace form IDs to a mapping of grid coordinates to :class:`~.CELL` record offsets.
+	worlds: Dict[bytes, Dict[Tuple[int, int], int]] = attrs.field(factory=dict)
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		worlds: Dict[bytes, Dict[Tuple[int, int], int]] = {}
+
+		for header in iter_records(buffer, {b"CELL"}):
+			world = header.find_group(GroupTypeEnum.WorldChildren)
+			if world is None:
+				continue
+
+			grid = _cell_grid(buffer, header)
+			if grid is not None:
+				worlds.setdefault(world.label, {})[grid] = header.offset
+
+		return cls(worlds)
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return {
+				world.hex(): [[x, y, offset] for (x, y), offset in cells.items()]
+				for world, cells in self.worlds.items()
+				}
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.ExteriorCellIndex.to_json`.
+
+		:param data:
+		"""
+
+		return cls({
+				bytes.fromhex(world): {(x, y): offset
+										for x, y, offset in cells}
+				for world, cells in data.items()
+				})
+
+	def get(self, world: bytes, x: int, y: int) -> Optional[int]:
+		"""
+		Returns the offset of the :class:`~.CELL` record at the given grid coordinates, or :py:obj:`None` if there isn't one.
+
+		:param world: The form ID of the :class:`~.WRLD` record.
+		:param x:
+		:param y:
+		"""
+
+		return self.worlds.get(world, {}).get((x, y))
+
+
+def _find_world(buffer: Buffer, world: bytes) -> Optional[RecordHeader]:
+	# Find the WRLD record, skipping over the top-level groups of other record types and the worldspaces' children.
+
+	position = 0
+	end = len(buffer)
+	in_worlds = False
+	worlds_end = 0
+
+	while position < end:
+		if in_worlds and position >= worlds_end:
+			in_worlds = False
+
+		if buffer[position:position + 4] == b"GRUP":
+			_, size, label, group_type = _group_struct.unpack_from(buffer, position)
+			if not in_worlds and group_type == GroupTypeEnum.TopLevel and label == b"WRLD":
+				in_worlds, worlds_end = True, position + size
+				position += 24
+			else:
+				position += size
+			continue
+
+		header = header_at(buffer, position)
+		if in_worlds and header.id == world:
+			return header
+		position = header.end
+
+	return None
+
+
+def load_exterior_cell(path: PathLike, world: bytes, x: int, y: int) -> Optional[ExteriorCell]:
+	"""
+	Load a single exterior cell and its references from an ESP file, without reading the rest of the worldspace.
+
+	The cell is located using the worldspace's :class:`~.WRLD.OFST` where it is accurate,
+	falling back to an :class:`~.ExteriorCellIndex` (loaded or built and saved alongside the ESP file) if not.
+
+	:param path: The path to the ESP file.
+	:param world: The form ID of the :class:`~.WRLD` record.
+	:param x: The cell's grid X coordinate.
+	:param y: The cell's grid Y coordinate.
+
+	:returns: The cell, or :py:obj:`None` if it does not exist in the ESP file.
+	"""
+
+	buffer = map_plugin(path)
+	try:
+		offset: Optional[int] = None
+
+		world_header = _find_world(buffer, world)
+		if world_header is not None:
+			relative_offset = parse_record(buffer, world_header).get_cell_offset(x, y)  # type: ignore[attr-defined]
+			if relative_offset is not None:
+				offset = world_header.offset + relative_offset
+				if not _is_cell_at(buffer, offset, x, y):
+					offset = None
+
+		if offset is None:
+			offset = ExteriorCellIndex.for_plugin(path).get(world, x, y)
+			if offset is None:
+				return None
+
+		header = header_at(buffer, offset)
+		cell = parse_record(buffer, header)
+
+		children = None
+		if buffer[header.end:header.end + 4] == b"GRUP":
+			_, size, label, group_type = _group_struct.unpack_from(buffer, header.end)
+			if group_type == GroupTypeEnum.CellChildren and label == header.id:
+				children = Group.parse(BytesIO(buffer[header.end + 4:header.end + size]))
+
+		return ExteriorCell(cell, children)
+
+	finally:
+		if isinstance(buffer, mmap.mmap):
+			buffer.close()
+
+
+def _is_cell_at(buffer: Buffer, offset: int, x: int, y: int) -> bool:
+	# Check whether an offset from a WRLD.OFST points at the expected CELL record.
+
+	if offset + 24 > len(buffer) or buffer[offset:offset + 4] != b"CELL":
+		return False
+
+	return _cell_grid(buffer, header_at(buffer, offset)) == (x, y)
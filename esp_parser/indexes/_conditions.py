@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+#
+#  _conditions.py
+"""
+Columnar table of conditions.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from array import array
+from typing import Any, Dict, List, NamedTuple, Optional, Type
+
+# 3rd party
+import attrs
+from typing_extensions import Self
+
+# this package
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+from esp_parser.subrecords import _ctda_struct
+from esp_parser.utils import NULL
+
+__all__ = ["Condition", "ConditionIndex"]
+
+
+class Condition(NamedTuple):
+	"""
+	A single row of a :class:`~.ConditionIndex`.
+	"""
+
+	#: The form ID of the record the condition belongs to.
+	owner: bytes
+
+	#: The type of the record the condition belongs to, e.g. ``b"INFO"``.
+	owner_type: bytes
+
+	#: The condition type and comparison operator (:attr:`CTDA.type <.CTDA.type>`).
+	type: int
+
+	#: A form ID or a float32 value
+	comparison_value: bytes
+
+	#: Function index.
+	function: int
+
+	param1: bytes
+	param2: bytes
+
+	#: What the function is run on (e.g. ``0`` for the subject, ``2`` for :attr:`~.reference`).
+	run_on: int
+
+	#: The form ID of the reference the function is run on, or null.
+	reference: bytes
+
+
+@attrs.define
+class ConditionIndex(SidecarIndex):
+	"""
+	Columnar table of every condition (``CTDA`` subrecord) in an ESP file.
+
+	The conditions can be selected by function, by the record they belong to, and by the form IDs they refer to.
+	Each attribute is a column, with one entry per condition.
+	"""
+
+	kind = "conditions"
+
+	owners: List[bytes] = attrs.field(factory=list)
+	owner_types: List[bytes] = attrs.field(factory=list)
+	types: "array[int]" = attrs.field(factory=lambda: array('B'))
+	comparison_values: List[bytes] = attrs.field(factory=list)
+	functions: "array[int]" = attrs.field(factory=lambda: array('I'))
+	params1: List[bytes] = attrs.field(factory=list)
+	params2: List[bytes] = attrs.field(factory=list)
+	run_on: "array[int]" = attrs.field(factory=lambda: array('I'))
+	references: List[bytes] = attrs.field(factory=list)
+
+	_by_function: Dict[int, List[int]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+	_by_owner: Dict[bytes, List[int]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+	_by_form_id: Dict[bytes, List[int]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+
+	def __attrs_post_init__(self) -> None:
+		for row in range(len(self)):
+			self._index_row(row)
+
+	def __len__(self) -> int:
+		return len(self.owners)
+
+	def __getitem__(self, row: int) -> Condition:
+		return Condition(
+				self.owners[row],
+				self.owner_types[row],
+				self.types[row],
+				self.comparison_values[row],
+				self.functions[row],
+				self.params1[row],
+				self.params2[row],
+				self.run_on[row],
+				self.references[row],
+				)
+
+	def _index_row(self, row: int) -> None:
+		self._by_function.setdefault(self.functions[row], []).append(row)
+		self._by_owner.setdefault(self.owners[row], []).append(row)
+
+		# Parameters may or may not be form IDs, depending on the function.
+		form_ids = {self.params1[row], self.params2[row], self.references[row]}
+		form_ids.discard(NULL)
+		for form_id in form_ids:
+			self._by_form_id.setdefault(form_id, []).append(row)
+
+	def append(self, condition: Condition) -> None:
+		"""
+		Add a condition to the end of the table.
+
+		:param condition:
+		"""
+
+		self.owners.append(condition.owner)
+		self.owner_types.append(condition.owner_type)
+		self.types.append(condition.type)
+		self.comparison_values.append(condition.comparison_value)
+		self.functions.append(condition.function)
+		self.params1.append(condition.param1)
+		self.params2.append(condition.param2)
+		self.run_on.append(condition.run_on)
+		self.references.append(condition.reference)
+		self._index_row(len(self) - 1)
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		table = cls()
+		append = table.append
+
+		for header in iter_records(buffer):
+			payload = record_payload(buffer, header)
+			if b"CTDA" not in payload:
+				continue
+
+			for subrecord in iter_subrecords(payload):
+				if subrecord.type != b"CTDA" or subrecord.size < 24:
+					continue
+
+				# Older conditions have no reference, which is null-padded.
+				raw = payload[subrecord.offset:subrecord.offset + min(subrecord.size, 28)].ljust(28, b'\x00')
+				type_, _, comparison_value, function, param1, param2, run_on, reference = _ctda_struct.unpack(raw)
+				append(
+						Condition(
+								header.id,
+								header.type,
+								type_,
+								comparison_value,
+								function,
+								param1,
+								param2,
+								int.from_bytes(run_on, "little"),
+								reference,
+								)
+						)
+
+		return table
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return [[
+				condition.owner.hex(),
+				condition.owner_type.decode("latin-1"),
+				condition.type,
+				condition.comparison_value.hex(),
+				condition.function,
+				condition.param1.hex(),
+				condition.param2.hex(),
+				condition.run_on,
+				condition.reference.hex(),
+				] for condition in map(self.__getitem__, range(len(self)))]
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.ConditionIndex.to_json`.
+
+		:param data:
+		"""
+
+		table = cls()
+		for owner, owner_type, type_, comparison_value, function, param1, param2, run_on, reference in data:
+			table.append(
+					Condition(
+							bytes.fromhex(owner),
+							owner_type.encode("latin-1"),
+							type_,
+							bytes.fromhex(comparison_value),
+							function,
+							bytes.fromhex(param1),
+							bytes.fromhex(param2),
+							run_on,
+							bytes.fromhex(reference),
+							)
+					)
+
+		return table
+
+	def select(
+			self,
+			function: Optional[int] = None,
+			form_id: Optional[bytes] = None,
+			owner: Optional[bytes] = None,
+			) -> List[int]:
+		"""
+		Returns the rows of the conditions matching all of the given criteria.
+
+		:param function: The function index.
+		:param form_id: A form ID used as a parameter to the function or as the reference it's run on.
+		:param owner: The form ID of the record the condition belongs to.
+		"""
+
+		candidates = []
+		if function is not None:
+			candidates.append(self._by_function.get(function, []))
+		if form_id is not None:
+			candidates.append(self._by_form_id.get(form_id, []))
+		if owner is not None:
+			candidates.append(self._by_owner.get(owner, []))
+
+		if not candidates:
+			return list(range(len(self)))
+
+		# Start from the most selective index.
+		candidates.sort(key=len)
+		rows = set(candidates[0]).intersection(*candidates[1:])
+		return sorted(rows)
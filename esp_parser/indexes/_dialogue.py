@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+#
+#  _dialogue.py
+"""
+Index of dialogue topics and their responses.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Type
+
+# 3rd party
+import attrs
+from typing_extensions import Self
+
+# this package
+from esp_parser.group import GroupTypeEnum
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+from esp_parser.types import Record
+from esp_parser.utils import NULL
+
+__all__ = ["DialogueIndex", "DialogueResponse", "DialogueTopic"]
+
+
+class DialogueTopic(NamedTuple):
+	"""
+	A dialogue topic (:class:`~.DIAL` record) in a :class:`~.DialogueIndex`.
+	"""
+
+	#: The form IDs of the topic's quests (``QSTI``).
+	quests: Tuple[bytes, ...] = ()
+
+	#: The form IDs of the responses connected to the topic (``INFC``).
+	connections: Tuple[bytes, ...] = ()
+
+
+class DialogueResponse(NamedTuple):
+	"""
+	A dialogue response (:class:`~.INFO` record) in a :class:`~.DialogueIndex`.
+	"""
+
+	#: The form ID of the topic the response belongs to.
+	topic: bytes
+
+	#: The form ID of the previous response in the topic (``PNAM``), or :py:data:`~.NULL`.
+	previous: bytes = NULL
+
+	#: The form ID of the response's quest (``QSTI``), or :py:data:`~.NULL`.
+	quest: bytes = NULL
+
+
+@attrs.define
+class DialogueIndex(SidecarIndex):
+	"""
+	Maps dialogue topics to their responses in order, and quests to their topics.
+
+	The order of a topic's responses is given by a linked list through each :class:`~.INFO`'s ``PNAM``
+	(the previous response), which is resolved in linear time and cached until the topic's responses change.
+	"""
+
+	kind = "dialogue"
+
+	#: Mapping of the form IDs of :class:`~.DIAL` records to topics.
+	topics: Dict[bytes, DialogueTopic] = attrs.field(factory=dict)
+
+	#: Mapping of the form IDs of :class:`~.INFO` records to responses.
+	infos: Dict[bytes, DialogueResponse] = attrs.field(factory=dict)
+
+	# Responses for each topic, in file order.
+	_by_topic: Dict[bytes, Dict[bytes, None]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+	_ordered: Dict[bytes, List[bytes]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+	_by_quest: Dict[bytes, Counter] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+
+	def __attrs_post_init__(self) -> None:
+		for form_id, topic in self.topics.items():
+			self._link_quests(form_id, topic.quests)
+
+		for form_id, response in self.infos.items():
+			self._by_topic.setdefault(response.topic, {})[form_id] = None
+			self._link_quests(response.topic, (response.quest, ))
+
+	def _link_quests(self, topic: bytes, quests: Iterable[bytes], count: int = 1) -> None:
+		for quest in quests:
+			if quest == NULL:
+				continue
+
+			topics = self._by_quest.setdefault(quest, Counter())
+			topics[topic] += count
+			if topics[topic] <= 0:
+				del topics[topic]
+				if not topics:
+					del self._by_quest[quest]
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		topics: Dict[bytes, DialogueTopic] = {}
+		infos: Dict[bytes, DialogueResponse] = {}
+
+		for header in iter_records(buffer, {b"DIAL", b"INFO"}):
+			payload = record_payload(buffer, header)
+			subrecords = [(subrecord.type, payload[subrecord.offset:subrecord.end])
+							for subrecord in iter_subrecords(payload)]
+
+			if header.type == b"DIAL":
+				topics[header.id] = DialogueTopic(
+						tuple(data for signature, data in subrecords if signature == b"QSTI"),
+						tuple(data for signature, data in subrecords if signature == b"INFC"),
+						)
+			else:
+				group = header.find_group(GroupTypeEnum.TopicChildren)
+				if group is None:
+					continue
+
+				fields = dict(subrecords)
+				infos[header.id] = DialogueResponse(
+						group.label,
+						fields.get(b"PNAM", NULL),
+						fields.get(b"QSTI", NULL),
+						)
+
+		return cls(topics, infos)
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return {
+				"topics": {
+						form_id.hex(): [[q.hex() for q in topic.quests], [c.hex() for c in topic.connections]]
+						for form_id, topic in self.topics.items()
+						},
+				"infos": {form_id.hex(): [f.hex() for f in response]
+							for form_id, response in self.infos.items()},
+				}
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.DialogueIndex.to_json`.
+
+		:param data:
+		"""
+
+		return cls(
+				{
+						bytes.fromhex(form_id): DialogueTopic(
+								tuple(map(bytes.fromhex, quests)),
+								tuple(map(bytes.fromhex, connections)),
+								)
+						for form_id, (quests, connections) in data["topics"].items()
+						},
+				{
+						bytes.fromhex(form_id): DialogueResponse(*map(bytes.fromhex, response))
+						for form_id, response in data["infos"].items()
+						},
+				)
+
+	def responses(self, topic: bytes) -> List[bytes]:
+		"""
+		Returns the form IDs of the topic's responses, in order.
+
+		Responses whose previous response is not in the topic start a new chain, in file order.
+		Any responses left over (e.g. because their ``PNAM`` values form a cycle) are placed at the end, in file order.
+
+		:param topic: The form ID of the :class:`~.DIAL` record.
+		"""
+
+		if topic not in self._ordered:
+			self._ordered[topic] = self._resolve_order(topic)
+
+		return list(self._ordered[topic])
+
+	def _resolve_order(self, topic: bytes) -> List[bytes]:
+		members = self._by_topic.get(topic, {})
+		following: Dict[bytes, List[bytes]] = {}
+		roots = []
+
+		for form_id in members:
+			previous = self.infos[form_id].previous
+			if previous in members and previous != form_id:
+				following.setdefault(previous, []).append(form_id)
+			else:
+				roots.append(form_id)
+
+		order = []
+		seen: Set[bytes] = set()
+		for root in roots:
+			stack = [root]
+			while stack:
+				form_id = stack.pop()
+				if form_id in seen:
+					continue
+				seen.add(form_id)
+				order.append(form_id)
+				stack.extend(reversed(following.get(form_id, ())))
+
+		order.extend(form_id for form_id in members if form_id not in seen)
+		return order
+
+	def topics_for_quest(self, quest: bytes) -> Set[bytes]:
+		"""
+		Returns the form IDs of the topics associated with a quest, either directly or through one of their responses.
+
+		:param quest: The form ID of the :class:`~.QUST` record.
+		"""
+
+		return set(self._by_quest.get(quest, ()))
+
+	def update_topic(self, form_id: bytes, topic: DialogueTopic) -> None:
+		"""
+		Add or replace a topic.
+
+		:param form_id: The form ID of the :class:`~.DIAL` record.
+		:param topic:
+		"""
+
+		self.remove_topic(form_id)
+		self.topics[form_id] = topic
+		self._link_quests(form_id, topic.quests)
+
+	def remove_topic(self, form_id: bytes) -> None:
+		"""
+		Remove a topic, e.g. after the record is deleted. Its responses are not removed.
+
+		:param form_id: The form ID of the :class:`~.DIAL` record.
+		"""
+
+		topic = self.topics.pop(form_id, None)
+		if topic is not None:
+			self._link_quests(form_id, topic.quests, -1)
+
+	def update_info(self, form_id: bytes, response: DialogueResponse) -> None:
+		"""
+		Add or replace a response.
+
+		:param form_id: The form ID of the :class:`~.INFO` record.
+		:param response:
+		"""
+
+		self.remove_info(form_id)
+		self.infos[form_id] = response
+		self._by_topic.setdefault(response.topic, {})[form_id] = None
+		self._link_quests(response.topic, (response.quest, ))
+		self._ordered.pop(response.topic, None)
+
+	def remove_info(self, form_id: bytes) -> None:
+		"""
+		Remove a response, e.g. after the record is deleted.
+
+		:param form_id: The form ID of the :class:`~.INFO` record.
+		"""
+
+		response = self.infos.pop(form_id, None)
+		if response is None:
+			return
+
+		members = self._by_topic[response.topic]
+		del members[form_id]
+		if not members:
+			del self._by_topic[response.topic]
+
+		self._link_quests(response.topic, (response.quest, ), -1)
+		self._ordered.pop(response.topic, None)
+
+	def update(self, record: Record, topic: Optional[bytes] = None) -> None:
+		"""
+		Add or replace a :class:`~.DIAL` or :class:`~.INFO` record after it has been changed.
+
+		:param record:
+		:param topic: The form ID of the topic, for :class:`~.INFO` records.
+			Defaults to the topic the response is already indexed under.
+		"""
+
+		record_type = record.__class__.__name__
+		fields = [(subrecord.__class__.__name__, subrecord) for subrecord in record.data]
+
+		if record_type == "DIAL":
+			self.update_topic(
+					record.id,
+					DialogueTopic(
+							tuple(bytes(value) for name, value in fields if name == "QSTI"),
+							tuple(bytes(value) for name, value in fields if name == "INFC"),
+							),
+					)
+
+		elif record_type == "INFO":
+			if topic is None:
+				if record.id not in self.infos:
+					raise ValueError(f"The topic of INFO record {record.id!r} must be given.")
+				topic = self.infos[record.id].topic
+
+			values = {name: bytes(value) for name, value in fields if name in {"PNAM", "QSTI"}}
+			self.update_info(record.id, DialogueResponse(topic, values.get("PNAM", NULL), values.get("QSTI", NULL)))
+
+		else:
+			raise TypeError(f"Expected a DIAL or INFO record, not {record_type}")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+#
+#  _edid.py
+"""
+Index of records by editor ID.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+# 3rd party
+import attrs
+from typing_extensions import Self
+
+# this package
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.scan import Buffer, first_subrecord, header_at, iter_records, parse_record
+from esp_parser.types import RecordType
+
+__all__ = ["EditorIDEntry", "EditorIDIndex"]
+
+
+class EditorIDEntry(NamedTuple):
+	"""
+	The location of a record in an :class:`~.EditorIDIndex`.
+	"""
+
+	#: 4-byte form ID
+	id: bytes
+
+	#: The record type, e.g. ``b"WEAP"``.
+	type: bytes
+
+	#: The offset of the record's header within the ESP file.
+	offset: int
+
+
+@attrs.define
+class EditorIDIndex(SidecarIndex):
+	"""
+	Maps editor IDs (``EDID``) to the form ID, type and location of their records.
+
+	The index is built by reading only the first subrecord of each record (the ``EDID``, where present).
+	"""
+
+	kind = "edid"
+
+	#: Mapping of editor IDs to records.
+	entries: Dict[str, EditorIDEntry] = attrs.field(factory=dict)
+
+	_folded: Optional[Dict[str, str]] = attrs.field(default=None, init=False, repr=False, eq=False)
+	_sorted_folded: Optional[List[Tuple[str, str]]] = attrs.field(default=None, init=False, repr=False, eq=False)
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		entries: Dict[str, EditorIDEntry] = {}
+		for header in iter_records(buffer):
+			subrecord = first_subrecord(buffer, header)
+			if subrecord is None or subrecord[0] != b"EDID":
+				continue
+
+			editor_id = subrecord[1].split(b"\x00", 1)[0].decode("cp1252", errors="replace")
+			entries.setdefault(editor_id, EditorIDEntry(header.id, header.type, header.offset))
+
+		return cls(entries)
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return {
+				editor_id: [entry.id.hex(), entry.type.decode(), entry.offset]
+				for editor_id, entry in self.entries.items()
+				}
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.EditorIDIndex.to_json`.
+
+		:param data:
+		"""
+
+		return cls({
+				editor_id: EditorIDEntry(bytes.fromhex(form_id), record_type.encode(), offset)
+				for editor_id, (form_id, record_type, offset) in data.items()
+				})
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+	def __contains__(self, editor_id: object) -> bool:
+		return editor_id in self.entries
+
+	def __getitem__(self, editor_id: str) -> EditorIDEntry:
+		return self.entries[editor_id]
+
+	def get(self, editor_id: str, case_sensitive: bool = True) -> Optional[EditorIDEntry]:
+		"""
+		Returns the entry for the given editor ID, or :py:obj:`None` if there is no such record.
+
+		:param editor_id:
+		:param case_sensitive: Whether to match the case of the editor ID exactly.
+		"""
+
+		if case_sensitive:
+			return self.entries.get(editor_id)
+
+		if self._folded is None:
+			self._folded = {}
+			for key in self.entries:
+				self._folded.setdefault(key.casefold(), key)
+
+		key = self._folded.get(editor_id.casefold())
+		return None if key is None else self.entries[key]
+
+	def startswith(self, prefix: str, case_sensitive: bool = True) -> Iterator[Tuple[str, EditorIDEntry]]:
+		"""
+		Returns an iterator over the editor IDs starting with ``prefix`` and their entries, in sorted order.
+
+		:param prefix:
+		:param case_sensitive: Whether to match the case of the prefix exactly.
+		"""
+
+		if self._sorted_folded is None:
+			self._sorted_folded = sorted((key.casefold(), key) for key in self.entries)
+
+		folded_prefix = prefix.casefold()
+		sorted_folded = self._sorted_folded
+		for idx in range(bisect_left(sorted_folded, (folded_prefix, '')), len(sorted_folded)):
+			folded, key = sorted_folded[idx]
+			if not folded.startswith(folded_prefix):
+				break
+			if case_sensitive and not key.startswith(prefix):
+				continue
+
+			yield key, self.entries[key]
+
+	def parse_record(self, buffer: Buffer, editor_id: str) -> RecordType:
+		"""
+		Parse the record with the given editor ID.
+
+		:param buffer: The raw bytes of the ESP file the index was built from.
+		:param editor_id:
+		"""
+
+		return parse_record(buffer, header_at(buffer, self.entries[editor_id].offset))
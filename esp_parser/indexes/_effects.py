@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+#
+#  _effects.py
+"""
+Index of the magic effects used by enchantments, spells, ingestibles and ingredients.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import struct
+from typing import Any, Dict, List, NamedTuple, Optional, Type
+
+# 3rd party
+import attrs
+from typing_extensions import Self
+
+# this package
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+
+__all__ = ["EffectIndex", "EffectUsage"]
+
+#: The types of record with effects.
+EFFECT_TYPES = frozenset({b"ENCH", b"SPEL", b"ALCH", b"INGR"})
+
+_efit_struct = struct.Struct("<IIII")
+
+
+class EffectUsage(NamedTuple):
+	"""
+	The use of a magic effect by a record, as stored in an :class:`~.EffectIndex`.
+	"""
+
+	#: The form ID of the record using the effect.
+	owner: bytes
+
+	#: The type of the record using the effect, e.g. ``b"ALCH"``.
+	owner_type: bytes
+
+	magnitude: int = 0
+	area: int = 0
+	duration: int = 0
+
+	#: Self, touch or target (:class:`Effect.EfitTypeEnum <.Effect.EfitTypeEnum>`).
+	range: int = 0
+
+
+@attrs.define
+class EffectIndex(SidecarIndex):
+	"""
+	Maps magic effects (:class:`~.MGEF` records) to the enchantments, spells, ingestibles and ingredients using them.
+
+	The index is built from the ``EFID`` and ``EFIT`` subrecords of each effect,
+	in a single pass over the top-level groups of those record types.
+	"""
+
+	kind = "effects"
+
+	#: Mapping of the form IDs of :class:`~.MGEF` records to their uses.
+	usages: Dict[bytes, List[EffectUsage]] = attrs.field(factory=dict)
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		usages: Dict[bytes, List[EffectUsage]] = {}
+
+		for header in iter_records(buffer, set(EFFECT_TYPES)):
+			payload = record_payload(buffer, header)
+			effect: Optional[bytes] = None
+
+			for subrecord in iter_subrecords(payload):
+				if subrecord.type == b"EFID":
+					if effect is not None:
+						# An effect without data
+						usages.setdefault(effect, []).append(EffectUsage(header.id, header.type))
+					effect = payload[subrecord.offset:subrecord.end]
+
+				elif subrecord.type == b"EFIT" and effect is not None and subrecord.size >= 16:
+					magnitude, area, duration, range_ = _efit_struct.unpack_from(payload, subrecord.offset)
+					usage = EffectUsage(header.id, header.type, magnitude, area, duration, range_)
+					usages.setdefault(effect, []).append(usage)
+					effect = None
+
+			if effect is not None:
+				usages.setdefault(effect, []).append(EffectUsage(header.id, header.type))
+
+		return cls(usages)
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return {
+				effect.hex(): [[u.owner.hex(), u.owner_type.decode("latin-1"), *u[2:]] for u in usages]
+				for effect, usages in self.usages.items()
+				}
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.EffectIndex.to_json`.
+
+		:param data:
+		"""
+
+		return cls({
+				bytes.fromhex(effect): [
+						EffectUsage(bytes.fromhex(owner), owner_type.encode("latin-1"), *values)
+						for owner, owner_type, *values in usages
+						]
+				for effect, usages in data.items()
+				})
+
+	def users(self, effect: bytes, owner_type: Optional[bytes] = None) -> List[EffectUsage]:
+		"""
+		Returns the uses of a magic effect.
+
+		:param effect: The form ID of the :class:`~.MGEF` record.
+		:param owner_type: If given, only return uses by records of this type, e.g. ``b"SPEL"``.
+		"""
+
+		usages = self.usages.get(effect, [])
+		if owner_type is None:
+			return list(usages)
+
+		return [usage for usage in usages if usage.owner_type == owner_type]
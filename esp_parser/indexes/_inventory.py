@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+#
+#  _inventory.py
+"""
+Inverted index of the items held by containers, actors and leveled lists.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from typing import Any, Dict, List, NamedTuple, Optional, Type
+
+# 3rd party
+import attrs
+from typing_extensions import Self
+
+# this package
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.records._lvli import _lvlo_struct
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+from esp_parser.subrecords import _cnto_struct, _coed_struct
+
+__all__ = ["Holding", "InventoryIndex"]
+
+#: The record types which can carry inventories (``CNTO``) or leveled list entries (``LVLO``).
+INVENTORY_TYPES = frozenset({b"CONT", b"NPC_", b"CREA", b"LVLI"})
+
+
+class Holding(NamedTuple):
+	"""
+	An item held by a container, actor or leveled list.
+	"""
+
+	#: The form ID of the :class:`~.CONT`, :class:`~.NPC_`, :class:`~.CREA` or :class:`~.LVLI` record.
+	holder: bytes
+
+	#: The type of the holder record, e.g. ``b"CONT"``.
+	type: bytes
+
+	count: int
+
+	#: The item condition from the following ``COED`` subrecord, or :py:obj:`None` if there is none.
+	condition: Optional[float] = None
+
+	#: For leveled list entries, the level at which the item appears.
+	level: Optional[int] = None
+
+
+@attrs.define
+class InventoryIndex(SidecarIndex):
+	"""
+	Maps the form IDs of items to the containers, actors and leveled lists holding them.
+
+	The index is built from the ``CNTO``, ``LVLO`` and ``COED`` subrecords of :class:`~.CONT`, :class:`~.NPC_`,
+	:class:`~.CREA` and :class:`~.LVLI` records, skipping all other top-level groups without reading them.
+	"""
+
+	kind = "inventory"
+
+	#: Mapping of item form IDs to their holders.
+	holdings: Dict[bytes, List[Holding]] = attrs.field(factory=dict)
+
+	_totals: Dict[bytes, int] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+
+	def __attrs_post_init__(self) -> None:
+		for item, holdings in self.holdings.items():
+			self._totals[item] = sum(holding.count for holding in holdings if holding.level is None)
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		holdings: Dict[bytes, List[Holding]] = {}
+
+		for header in iter_records(buffer, INVENTORY_TYPES):
+			payload = record_payload(buffer, header)
+			last: Optional[List[Holding]] = None
+
+			for subrecord in iter_subrecords(payload):
+				if subrecord.type == b"CNTO" and subrecord.size == 8:
+					item, count = _cnto_struct.unpack_from(payload, subrecord.offset)
+					last = holdings.setdefault(item, [])
+					last.append(Holding(header.id, header.type, count))
+				elif subrecord.type == b"LVLO" and subrecord.size == 12:
+					level, _, item, count, _ = _lvlo_struct.unpack_from(payload, subrecord.offset)
+					last = holdings.setdefault(item, [])
+					last.append(Holding(header.id, header.type, count, level=level))
+				elif subrecord.type == b"COED" and subrecord.size == 12 and last is not None:
+					condition = _coed_struct.unpack_from(payload, subrecord.offset)[2]
+					last[-1] = last[-1]._replace(condition=condition)
+					last = None
+				else:
+					last = None
+
+		return cls(holdings)
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return {
+				item.hex(): [[h.holder.hex(), h.type.decode(), h.count, h.condition, h.level] for h in holdings]
+				for item, holdings in self.holdings.items()
+				}
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.InventoryIndex.to_json`.
+
+		:param data:
+		"""
+
+		return cls({
+				bytes.fromhex(item): [
+						Holding(bytes.fromhex(holder), record_type.encode(), count, condition, level)
+						for holder, record_type, count, condition, level in holdings
+						]
+				for item, holdings in data.items()
+				})
+
+	def holders(self, item: bytes, include_leveled: bool = True) -> List[Holding]:
+		"""
+		Returns the containers, actors and (optionally) leveled lists holding the given item.
+
+		:param item: The form ID of the item.
+		:param include_leveled: Whether to include leveled list entries.
+		"""
+
+		holdings = self.holdings.get(item, [])
+		if include_leveled:
+			return list(holdings)
+		return [holding for holding in holdings if holding.level is None]
+
+	def total_quantity(self, item: bytes) -> int:
+		"""
+		Returns the total number of the given item held by containers and actors.
+
+		Leveled list entries are not counted, as they are not placed in the world directly.
+
+		:param item: The form ID of the item.
+		"""
+
+		return self._totals.get(item, 0)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+#
+#  _records.py
+"""
+Index of the locations of every record in an ESP file.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+# stdlib
+from typing import Any, Dict, List, NamedTuple, Type
+
+# 3rd party
+import attrs
+from typing_extensions import Self
+
+# this package
+from esp_parser.formids import read_masters
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.scan import Buffer, iter_records
+
+__all__ = ["RecordIndex", "RecordLocation"]
+
+
+class RecordLocation(NamedTuple):
+	"""
+	The location of a record in a :class:`~.RecordIndex`.
+	"""
+
+	#: The record type, e.g. ``b"WEAP"``.
+	type: bytes
+
+	#: The offset of the record's header within the ESP file.
+	offset: int
+
+	#: Record flags
+	flags: int
+
+
+@attrs.define
+class RecordIndex(SidecarIndex):
+	"""
+	Maps the form ID of every record in an ESP file (other than the :class:`~.TES4` header) to its type and location.
+
+	The index is built from the record headers alone.
+	"""
+
+	kind = "records"
+
+	#: The names of the ESP file's masters.
+	masters: List[str] = attrs.field(factory=list)
+
+	#: Mapping of form IDs, as stored in the ESP file, to records.
+	records: Dict[bytes, RecordLocation] = attrs.field(factory=dict)
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		records = {
+				header.id: RecordLocation(header.type, header.offset, header.flags)
+				for header in iter_records(buffer)
+				if header.type != b"TES4"
+				}
+		return cls(read_masters(buffer), records)
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return {
+				"masters": self.masters,
+				"records": {
+						form_id.hex(): [location.type.decode("latin-1"), location.offset, location.flags]
+						for form_id, location in self.records.items()
+						},
+				}
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.RecordIndex.to_json`.
+
+		:param data:
+		"""
+
+		return cls(
+				data["masters"],
+				{
+						bytes.fromhex(form_id): RecordLocation(record_type.encode("latin-1"), offset, flags)
+						for form_id, (record_type, offset, flags) in data["records"].items()
+						},
+				)
+
+	def __len__(self) -> int:
+		return len(self.records)
+
+	def __contains__(self, form_id: object) -> bool:
+		return form_id in self.records
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+#
+#  _references.py
+"""
+Reverse index of references between records.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from typing import Any, Dict, Iterable, List, NamedTuple, Set, Tuple, Type
+
+# 3rd party
+import attrs
+from typing_extensions import Self
+
+# this package
+from esp_parser.formids import iter_form_ids
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.scan import Buffer, iter_records, record_payload
+from esp_parser.types import Record
+
+__all__ = ["Reference", "ReferenceIndex"]
+
+
+class Reference(NamedTuple):
+	"""
+	A reference from one record to another, as stored in a :class:`~.ReferenceIndex`.
+	"""
+
+	#: The form ID of the record containing the reference.
+	source: bytes
+
+	#: The type of the record containing the reference, e.g. ``b"CONT"``.
+	type: bytes
+
+	#: The type of the subrecord containing the reference, e.g. ``b"CNTO"``.
+	signature: bytes
+
+
+@attrs.define
+class ReferenceIndex(SidecarIndex):
+	"""
+	Maps form IDs to the records which reference them.
+
+	The index is built in a single pass over the ESP file, locating form IDs within each record's data
+	with :func:`~.iter_form_ids` rather than parsing the records.
+	"""
+
+	kind = "references"
+
+	#: Mapping of the form IDs of records to their type and the ``(target form ID, signature)`` pairs they reference.
+	outgoing: Dict[bytes, Tuple[bytes, List[Tuple[bytes, bytes]]]] = attrs.field(factory=dict)
+
+	_incoming: Dict[bytes, Set[Reference]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+
+	def __attrs_post_init__(self) -> None:
+		for source, (record_type, targets) in self.outgoing.items():
+			self._link(source, record_type, targets)
+
+	def _link(self, source: bytes, record_type: bytes, targets: Iterable[Tuple[bytes, bytes]]) -> None:
+		for target, signature in targets:
+			self._incoming.setdefault(target, set()).add(Reference(source, record_type, signature))
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		index = cls()
+		for header in iter_records(buffer):
+			# The file header's overridden records (ONAM) are not references.
+			if header.type == b"TES4":
+				continue
+			index.update_raw(header.id, header.type, record_payload(buffer, header))
+
+		return index
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return {
+				source.hex(): [record_type.decode("latin-1"), [[t.hex(), s.decode("latin-1")] for t, s in targets]]
+				for source, (record_type, targets) in self.outgoing.items()
+				}
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.ReferenceIndex.to_json`.
+
+		:param data:
+		"""
+
+		return cls({
+				bytes.fromhex(source): (
+						record_type.encode("latin-1"),
+						[(bytes.fromhex(t), s.encode("latin-1")) for t, s in targets],
+						)
+				for source, (record_type, targets) in data.items()
+				})
+
+	def referenced_by(self, form_id: bytes) -> Set[Reference]:
+		"""
+		Returns the references to the record with the given form ID.
+
+		:param form_id:
+		"""
+
+		return set(self._incoming.get(form_id, ()))
+
+	def references(self, form_id: bytes) -> List[Tuple[bytes, bytes]]:
+		"""
+		Returns the ``(target form ID, signature)`` pairs referenced by the record with the given form ID.
+
+		:param form_id:
+		"""
+
+		return list(self.outgoing.get(form_id, (b'', []))[1])
+
+	def remove(self, form_id: bytes) -> None:
+		"""
+		Remove the references from the record with the given form ID, e.g. after the record is deleted.
+
+		:param form_id:
+		"""
+
+		if form_id not in self.outgoing:
+			return
+
+		record_type, targets = self.outgoing.pop(form_id)
+		for target, signature in targets:
+			incoming = self._incoming[target]
+			incoming.discard(Reference(form_id, record_type, signature))
+			if not incoming:
+				del self._incoming[target]
+
+	def update_raw(self, form_id: bytes, record_type: bytes, payload: bytes) -> None:
+		"""
+		Replace the references from a record, given its raw data.
+
+		:param form_id:
+		:param record_type:
+		:param payload: The record's data, as returned by :func:`~.record_payload`.
+		"""
+
+		self.remove(form_id)
+
+		targets = list(dict.fromkeys((target, signature) for signature, _, target in iter_form_ids(record_type, payload)))
+		if targets:
+			self.outgoing[form_id] = (record_type, targets)
+			self._link(form_id, record_type, targets)
+
+	def update(self, record: Record) -> None:
+		"""
+		Replace the references from a record after it has been changed.
+
+		:param record:
+		"""
+
+		payload = b"".join(subrecord.unparse() for subrecord in record.data)
+		self.update_raw(record.id, record.__class__.__name__.encode(), payload)
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+#
+#  _scripts.py
+"""
+Index of scripts, the form IDs they reference, and their variables.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+# stdlib
+import re
+import struct
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Type
+
+# 3rd party
+import attrs
+from domdf_python_tools.typing import PathLike
+from typing_extensions import Self
+
+# this package
+from esp_parser.formids import iter_load_order, remap_form_id
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+
+__all__ = ["ScriptEntry", "ScriptIndex", "ScriptVariable"]
+
+_token_pattern = re.compile(r"\w+")
+
+# A script within the index: the form ID of the record, and the position of the script within the record.
+_ScriptKey = Tuple[bytes, int]
+
+
+def _tokenize(text: str) -> Set[str]:
+	return set(_token_pattern.findall(text.casefold()))
+
+
+class ScriptVariable(NamedTuple):
+	"""
+	A local variable declared by a script (``SLSD`` and ``SCVR`` subrecords).
+	"""
+
+	index: int
+
+	#: The name of the variable.
+	name: str
+
+	#: :attr:`SLSD.flags <.Script.SLSD.flags>`. ``1`` for ``short`` and ``long`` variables.
+	flags: int
+
+
+class ScriptEntry(NamedTuple):
+	"""
+	A script in a :class:`~.ScriptIndex`.
+	"""
+
+	#: The form ID of the record containing the script.
+	owner: bytes
+
+	#: The type of the record containing the script, e.g. ``b"SCPT"``, or ``b"INFO"`` for a result script.
+	owner_type: bytes
+
+	#: The position of the script within the record, for records with several scripts such as quest stages.
+	number: int
+
+	#: The source code of the script (``SCTX``).
+	source: str
+
+	variables: Tuple[ScriptVariable, ...] = ()
+
+	#: The form IDs referenced by the script (``SCRO``), in the order the compiled script refers to them.
+	references: Tuple[bytes, ...] = ()
+
+
+@attrs.define
+class ScriptIndex(SidecarIndex):
+	"""
+	Index of the scripts in an ESP file, both :class:`~.SCPT` records and the scripts embedded in
+	quest stages, dialogue responses, packages and terminal menu items.
+
+	The scripts referencing each form ID and the records each :class:`~.SCPT` is attached to (``SCRI``)
+	can be looked up, and the source code searched for words.
+
+	Only the script subrecords are decoded; every other subrecord is skipped over by its size.
+	"""
+
+	kind = "scripts"
+
+	#: Mapping of the form IDs of records to the scripts they contain.
+	scripts: Dict[bytes, List[ScriptEntry]] = attrs.field(factory=dict)
+
+	#: Mapping of the form IDs of records to the :class:`~.SCPT` attached to them.
+	attachments: Dict[bytes, bytes] = attrs.field(factory=dict)
+
+	_users: Dict[bytes, Set[_ScriptKey]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+	_attached: Dict[bytes, Set[bytes]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+	_postings: Dict[str, Set[_ScriptKey]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+
+	def __attrs_post_init__(self) -> None:
+		for scripts in self.scripts.values():
+			self._link(scripts)
+
+		for form_id, script in self.attachments.items():
+			self._attached.setdefault(script, set()).add(form_id)
+
+	def _link(self, scripts: Iterable[ScriptEntry]) -> None:
+		for script in scripts:
+			key = (script.owner, script.number)
+			for form_id in script.references:
+				self._users.setdefault(form_id, set()).add(key)
+			for token in _tokenize(script.source):
+				self._postings.setdefault(token, set()).add(key)
+
+	def _unlink(self, scripts: Iterable[ScriptEntry]) -> None:
+		for script in scripts:
+			key = (script.owner, script.number)
+			for mapping, keys in ((self._users, script.references), (self._postings, _tokenize(script.source))):
+				for item in keys:
+					entries = mapping.get(item)
+					if entries is None:
+						continue
+					entries.discard(key)
+					if not entries:
+						del mapping[item]
+
+	def update_record(self, form_id: bytes, scripts: Iterable[ScriptEntry], attached: Optional[bytes] = None) -> None:
+		"""
+		Add or replace the scripts in a record.
+
+		:param form_id:
+		:param scripts: The scripts embedded in the record, or the script itself for a :class:`~.SCPT` record.
+		:param attached: The form ID of the :class:`~.SCPT` attached to the record (``SCRI``), if any.
+		"""
+
+		self.remove(form_id)
+
+		scripts = list(scripts)
+		if scripts:
+			self.scripts[form_id] = scripts
+			self._link(scripts)
+
+		if attached is not None:
+			self.attachments[form_id] = attached
+			self._attached.setdefault(attached, set()).add(form_id)
+
+	def remove(self, form_id: bytes) -> None:
+		"""
+		Remove the scripts in a record, e.g. after the record is deleted.
+
+		:param form_id:
+		"""
+
+		self._unlink(self.scripts.pop(form_id, ()))
+
+		attached = self.attachments.pop(form_id, None)
+		if attached is not None:
+			records = self._attached[attached]
+			records.discard(form_id)
+			if not records:
+				del self._attached[attached]
+
+	@staticmethod
+	def _extract(form_id: bytes, record_type: bytes, payload: bytes,
+					table: Optional[bytes]) -> Tuple[List[ScriptEntry], Optional[bytes]]:
+		scripts: List[ScriptEntry] = []
+		attached = None
+
+		source = ""
+		variables: List[ScriptVariable] = []
+		references: List[bytes] = []
+		slsd: Optional[Tuple[int, int]] = None
+
+		def finish() -> None:
+			scripts.append(ScriptEntry(form_id, record_type, len(scripts), source, tuple(variables), tuple(references)))
+
+		in_script = False
+		for subrecord in iter_subrecords(payload):
+			if subrecord.type == b"SCHR":
+				if in_script:
+					finish()
+				in_script = True
+				source, variables, references, slsd = "", [], [], None
+			elif subrecord.type == b"SCRI" and subrecord.size == 4:
+				attached = payload[subrecord.offset:subrecord.end]
+				if table is not None:
+					attached = remap_form_id(attached, table)
+			elif not in_script:
+				continue
+			elif subrecord.type == b"SCTX":
+				source = payload[subrecord.offset:subrecord.end].decode("cp1252", errors="replace")
+			elif subrecord.type == b"SLSD":
+				index, flags = struct.unpack_from("<I12xB", payload, subrecord.offset)
+				slsd = (index, flags)
+				variables.append(ScriptVariable(index, "", flags))
+			elif subrecord.type == b"SCVR" and slsd is not None:
+				name = payload[subrecord.offset:subrecord.end].rstrip(b"\x00").decode("cp1252", errors="replace")
+				variables[-1] = ScriptVariable(slsd[0], name, slsd[1])
+				slsd = None
+			elif subrecord.type == b"SCRO":
+				reference = payload[subrecord.offset:subrecord.end]
+				references.append(reference if table is None else remap_form_id(reference, table))
+
+		if in_script:
+			finish()
+
+		return scripts, attached
+
+	def add_plugin(self, buffer: Buffer, table: Optional[bytes] = None) -> None:
+		"""
+		Add the scripts in an ESP file, replacing the scripts of any records already added with the same form IDs.
+
+		:param buffer: The raw bytes of the ESP file.
+		:param table: A table returned by :func:`~.master_table` to rewrite the plugin's form IDs
+			in terms of the full load order.
+		"""
+
+		for header in iter_records(buffer):
+			form_id = header.id if table is None else remap_form_id(header.id, table)
+			payload = record_payload(buffer, header)
+
+			if b"SCHR" not in payload and b"SCRI" not in payload:
+				if form_id in self.scripts or form_id in self.attachments:
+					self.remove(form_id)
+				continue
+
+			scripts, attached = self._extract(form_id, header.type, payload, table)
+			if scripts or attached is not None or form_id in self.scripts or form_id in self.attachments:
+				self.update_record(form_id, scripts, attached)
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		index = cls()
+		index.add_plugin(buffer)
+		return index
+
+	@classmethod
+	def from_load_order(cls: Type[Self], plugins: Sequence[PathLike]) -> Self:
+		"""
+		Construct from the scripts in the given ESP files, with later plugins overriding earlier ones.
+
+		Form IDs are rewritten in terms of the full load order, so the last byte of each as stored
+		(the most significant) is the index of the plugin in ``plugins`` which created the record.
+
+		:param plugins: The paths to the ESP files, in load order.
+		"""
+
+		index = cls()
+
+		for _, buffer, table in iter_load_order(plugins):
+			index.add_plugin(buffer, table)
+
+		return index
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return {
+				"scripts": {
+						form_id.hex(): [[
+								script.owner_type.decode("latin-1"),
+								script.source,
+								[list(variable) for variable in script.variables],
+								[reference.hex() for reference in script.references],
+								] for script in scripts]
+						for form_id, scripts in self.scripts.items()
+						},
+				"attachments": {form_id.hex(): script.hex() for form_id, script in self.attachments.items()},
+				}
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.ScriptIndex.to_json`.
+
+		:param data:
+		"""
+
+		scripts = {}
+		for form_id, entries in data["scripts"].items():
+			owner = bytes.fromhex(form_id)
+			scripts[owner] = [
+					ScriptEntry(
+							owner,
+							owner_type.encode("latin-1"),
+							number,
+							source,
+							tuple(ScriptVariable(*variable) for variable in variables),
+							tuple(bytes.fromhex(reference) for reference in references),
+							) for number, (owner_type, source, variables, references) in enumerate(entries)
+					]
+
+		attachments = {
+				bytes.fromhex(form_id): bytes.fromhex(script)
+				for form_id, script in data["attachments"].items()
+				}
+		return cls(scripts, attachments)
+
+	def _entries(self, keys: Iterable[_ScriptKey]) -> List[ScriptEntry]:
+		return [self.scripts[owner][number] for owner, number in sorted(keys)]
+
+	def get(self, form_id: bytes) -> List[ScriptEntry]:
+		"""
+		Returns the scripts in a record.
+
+		:param form_id:
+		"""
+
+		return list(self.scripts.get(form_id, ()))
+
+	def variables(self, form_id: bytes) -> Tuple[ScriptVariable, ...]:
+		"""
+		Returns the local variables declared by a :class:`~.SCPT`.
+
+		:param form_id:
+		"""
+
+		scripts = self.scripts.get(form_id)
+		if not scripts:
+			return ()
+		return scripts[0].variables
+
+	def users(self, form_id: bytes) -> List[ScriptEntry]:
+		"""
+		Returns the scripts referencing the given form ID.
+
+		:param form_id:
+		"""
+
+		return self._entries(self._users.get(form_id, ()))
+
+	def callers(self, form_id: bytes) -> List[bytes]:
+		"""
+		Returns the form IDs of the records a :class:`~.SCPT` is attached to, such as objects, NPCs and quests.
+
+		:param form_id:
+		"""
+
+		return sorted(self._attached.get(form_id, ()))
+
+	def search(self, query: str) -> List[ScriptEntry]:
+		"""
+		Returns the scripts whose source code contains all of the words in the query, in any order.
+
+		Words are compared case-insensitively.
+
+		:param query:
+		"""
+
+		tokens = _tokenize(query)
+		if not tokens:
+			return []
+
+		postings = sorted((self._postings.get(token, set()) for token in tokens), key=len)
+		return self._entries(postings[0].intersection(*postings[1:]))
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+#
+#  _sidecar.py
+"""
+Persistence of indexes alongside ESP files.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import json
+import mmap
+import os
+from abc import abstractmethod
+from typing import Any, ClassVar, Optional, Type
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from typing_extensions import Self
+
+# this package
+from esp_parser.scan import Buffer, map_plugin
+
+__all__ = ["SidecarIndex"]
+
+
+class SidecarIndex:
+	"""
+	Base class for indexes which can be persisted in a sidecar file next to the ESP file they index.
+
+	The sidecar file records the size and modification time of the ESP file,
+	and is ignored (and rebuilt by :meth:`~.SidecarIndex.for_plugin`) if the ESP file has changed.
+	"""
+
+	#: Identifies the type of index in the sidecar file's name.
+	kind: ClassVar[str]
+
+	#: Incremented when the sidecar file format changes, which invalidates existing sidecar files.
+	format_version: ClassVar[int] = 1
+
+	@classmethod
+	@abstractmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		raise NotImplementedError
+
+	@abstractmethod
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		raise NotImplementedError
+
+	@classmethod
+	@abstractmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.SidecarIndex.to_json`.
+
+		:param data:
+		"""
+
+		raise NotImplementedError
+
+	@classmethod
+	def sidecar_path(cls, plugin: PathLike) -> PathPlus:
+		"""
+		Returns the path of the sidecar file for the given ESP file.
+
+		:param plugin: The path to the ESP file.
+		"""
+
+		plugin = PathPlus(plugin)
+		return plugin.with_name(f"{plugin.name}.{cls.kind}.json")
+
+	@classmethod
+	def _source_stamp(cls, plugin: PathLike) -> Any:
+		stat = os.stat(plugin)
+		return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "format": cls.format_version}
+
+	def save(self, plugin: PathLike) -> None:
+		"""
+		Save the index to the sidecar file for the given ESP file.
+
+		:param plugin: The path to the ESP file the index was built from.
+		"""
+
+		self.sidecar_path(plugin).dump_json({"source": self._source_stamp(plugin), "index": self.to_json()})
+
+	@classmethod
+	def load(cls: Type[Self], plugin: PathLike) -> Optional[Self]:
+		"""
+		Load the index from the sidecar file for the given ESP file.
+
+		:param plugin: The path to the ESP file.
+
+		:returns: The index, or :py:obj:`None` if the sidecar file does not exist or is out of date.
+		"""
+
+		sidecar = cls.sidecar_path(plugin)
+		if not sidecar.is_file():
+			return None
+
+		try:
+			data = sidecar.load_json()
+		except json.JSONDecodeError:
+			return None
+
+		if data.get("source") != cls._source_stamp(plugin):
+			return None
+
+		return cls.from_json(data["index"])
+
+	@classmethod
+	def for_plugin(cls: Type[Self], plugin: PathLike, save: bool = True) -> Self:
+		"""
+		Load the index for the given ESP file, building it (and optionally saving it) if it is missing or out of date.
+
+		:param plugin: The path to the ESP file.
+		:param save: Whether to save a newly built index to the sidecar file.
+		"""
+
+		index = cls.load(plugin)
+		if index is None:
+			buffer = map_plugin(plugin)
+			try:
+				index = cls.build(buffer)
+			finally:
+				if isinstance(buffer, mmap.mmap):
+					buffer.close()
+
+			if save:
+				index.save(plugin)
+
+		return index
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+#
+#  _spatial.py
+"""
+Spatial grid index of placed references.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import math
+import struct
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+# 3rd party
+import attrs
+from typing_extensions import Self
+
+# this package
+from esp_parser.group import GroupTypeEnum
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.placements import PLACED_TYPES
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+
+__all__ = ["SpatialEntry", "SpatialIndex"]
+
+_position_struct = struct.Struct("<3f")
+
+
+class SpatialEntry(NamedTuple):
+	"""
+	A placed reference in a :class:`~.SpatialIndex`.
+	"""
+
+	#: 4-byte form ID
+	id: bytes
+
+	#: The record type, e.g. ``b"REFR"``.
+	type: bytes
+
+	x: float
+	y: float
+	z: float
+
+	#: The offset of the record's header within the ESP file.
+	offset: int
+
+
+@attrs.define
+class SpatialIndex(SidecarIndex):
+	"""
+	Grid index of the positions of placed references, for bounding box and radius queries without parsing any records.
+
+	The index covers :class:`~.REFR`, :class:`~.ACHR`, :class:`~.ACRE` and :class:`~.PGRE` records.
+	References are grouped by space: the form ID of the :class:`~.WRLD` for references in exterior cells,
+	or of the :class:`~.CELL` for references in interior cells.
+	Within each space references are bucketed into square grid cells of ``cell_size`` units
+	(by default the size of an exterior cell).
+	"""
+
+	kind = "spatial"
+
+	#: Mapping of spaces to the references within them.
+	spaces: Dict[bytes, List[SpatialEntry]] = attrs.field(factory=dict)
+
+	#: The size of each grid cell, in game units.
+	cell_size: float = 4096.0
+
+	_grids: Dict[bytes, Dict[Tuple[int, int], List[SpatialEntry]]] = attrs.field(
+			factory=dict,
+			init=False,
+			repr=False,
+			eq=False,
+			)
+
+	def __attrs_post_init__(self) -> None:
+		for space, entries in self.spaces.items():
+			grid = self._grids[space] = {}
+			for entry in entries:
+				grid.setdefault(self._grid_key(entry.x, entry.y), []).append(entry)
+
+	def _grid_key(self, x: float, y: float) -> Tuple[int, int]:
+		return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer, cell_size: float = 4096.0) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		:param cell_size: The size of each grid cell, in game units.
+		"""
+
+		spaces: Dict[bytes, List[SpatialEntry]] = {}
+
+		for header in iter_records(buffer, PLACED_TYPES):
+			world = header.find_group(GroupTypeEnum.WorldChildren)
+			space = world.label if world is not None else header.cell
+			if space is None:
+				continue
+
+			payload = record_payload(buffer, header)
+			for subrecord in iter_subrecords(payload):
+				if subrecord.type == b"DATA" and subrecord.size == 24:
+					x, y, z = _position_struct.unpack_from(payload, subrecord.offset)
+					spaces.setdefault(space, []).append(SpatialEntry(header.id, header.type, x, y, z, header.offset))
+					break
+
+		return cls(spaces, cell_size)
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return {
+				"cell_size": self.cell_size,
+				"spaces": {
+						space.hex(): [[e.id.hex(), e.type.decode(), e.x, e.y, e.z, e.offset] for e in entries]
+						for space, entries in self.spaces.items()
+						},
+				}
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.SpatialIndex.to_json`.
+
+		:param data:
+		"""
+
+		spaces = {
+				bytes.fromhex(space): [
+						SpatialEntry(bytes.fromhex(form_id), record_type.encode(), x, y, z, offset)
+						for form_id, record_type, x, y, z, offset in entries
+						]
+				for space, entries in data["spaces"].items()
+				}
+		return cls(spaces, data["cell_size"])
+
+	def within_box(
+			self,
+			space: bytes,
+			min_x: float,
+			min_y: float,
+			max_x: float,
+			max_y: float,
+			) -> Iterator[SpatialEntry]:
+		"""
+		Returns an iterator over the references in the given space within a bounding box.
+
+		:param space: The form ID of the :class:`~.WRLD` or interior :class:`~.CELL`.
+		:param min_x:
+		:param min_y:
+		:param max_x:
+		:param max_y:
+		"""
+
+		grid = self._grids.get(space, {})
+		min_key_x, min_key_y = self._grid_key(min_x, min_y)
+		max_key_x, max_key_y = self._grid_key(max_x, max_y)
+
+		if (max_key_x - min_key_x + 1) * (max_key_y - min_key_y + 1) > len(grid):
+			# Cheaper to check every occupied grid cell.
+			keys = [key for key in grid if min_key_x <= key[0] <= max_key_x and min_key_y <= key[1] <= max_key_y]
+		else:
+			keys = [(x, y) for x in range(min_key_x, max_key_x + 1) for y in range(min_key_y, max_key_y + 1)]
+
+		for key in keys:
+			for entry in grid.get(key, ()):
+				if min_x <= entry.x <= max_x and min_y <= entry.y <= max_y:
+					yield entry
+
+	def within_radius(
+			self,
+			space: bytes,
+			x: float,
+			y: float,
+			radius: float,
+			z: Optional[float] = None,
+			) -> Iterator[SpatialEntry]:
+		"""
+		Returns an iterator over the references in the given space within ``radius`` of a point.
+
+		:param space: The form ID of the :class:`~.WRLD` or interior :class:`~.CELL`.
+		:param x:
+		:param y:
+		:param radius:
+		:param z: If given, the distance is measured in three dimensions rather than in the horizontal plane.
+		"""
+
+		radius_squared = radius * radius
+		for entry in self.within_box(space, x - radius, y - radius, x + radius, y + radius):
+			distance_squared = (entry.x - x)**2 + (entry.y - y)**2
+			if z is not None:
+				distance_squared += (entry.z - z)**2
+			if distance_squared <= radius_squared:
+				yield entry
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+#
+#  _text.py
+"""
+Full-text index of in-game text.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import re
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Type
+
+# 3rd party
+import attrs
+from domdf_python_tools.typing import PathLike
+from typing_extensions import Self
+
+# this package
+from esp_parser.formids import iter_load_order, remap_form_id
+from esp_parser.indexes._sidecar import SidecarIndex
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+
+__all__ = ["TextEntry", "TextIndex"]
+
+# Subrecords containing player-visible text, and the record types they do so in (None for all).
+_TEXT_SUBRECORDS = {
+		b"FULL": None,
+		b"DESC": None,
+		b"ITXT": {b"MESG", b"TERM"},
+		b"RNAM": {b"INFO", b"TERM"},
+		b"NAM1": {b"INFO"},
+		b"NNAM": {b"QUST"},
+		b"TNAM": {b"NOTE"},
+		}
+
+_token_pattern = re.compile(r"\w+")
+
+# A text within the index: the form ID of the record, and the position of the text within the record.
+_Document = Tuple[bytes, int]
+
+
+def _tokenize(text: str) -> List[str]:
+	return _token_pattern.findall(text.casefold())
+
+
+class TextEntry(NamedTuple):
+	"""
+	A piece of text in a :class:`~.TextIndex`.
+	"""
+
+	#: The form ID of the record containing the text.
+	id: bytes
+
+	#: The type of the record containing the text, e.g. ``b"BOOK"``.
+	type: bytes
+
+	#: The type of the subrecord containing the text, e.g. ``b"DESC"``.
+	signature: bytes
+
+	text: str
+
+
+@attrs.define
+class TextIndex(SidecarIndex):
+	"""
+	Inverted index of the player-visible text in an ESP file, supporting word, phrase and prefix searches.
+
+	The index covers names (``FULL``) and descriptions (``DESC``) of any record,
+	book and note text, message and terminal menu items, dialogue responses and prompts, and quest objectives.
+	Only those subrecords are decoded; every other subrecord is skipped over by its size.
+
+	Text is split into words, which are compared case-insensitively.
+	"""
+
+	kind = "text"
+
+	#: Mapping of the form IDs of records to their type and ``(signature, text)`` pairs.
+	records: Dict[bytes, Tuple[bytes, List[Tuple[bytes, str]]]] = attrs.field(factory=dict)
+
+	# Mapping of words to the positions they appear at in each document.
+	_postings: Dict[str, Dict[_Document, List[int]]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+	_vocabulary: Optional[List[str]] = attrs.field(default=None, init=False, repr=False, eq=False)
+
+	def __attrs_post_init__(self) -> None:
+		for form_id, (_, texts) in self.records.items():
+			self._link(form_id, texts)
+
+	def _link(self, form_id: bytes, texts: Sequence[Tuple[bytes, str]]) -> None:
+		for number, (_, text) in enumerate(texts):
+			for position, token in enumerate(_tokenize(text)):
+				self._postings.setdefault(token, {}).setdefault((form_id, number), []).append(position)
+
+		self._vocabulary = None
+
+	def update_texts(self, form_id: bytes, record_type: bytes, texts: Iterable[Tuple[bytes, str]]) -> None:
+		"""
+		Add or replace the text of a record.
+
+		:param form_id:
+		:param record_type:
+		:param texts: ``(signature, text)`` pairs.
+		"""
+
+		self.remove(form_id)
+		texts = list(texts)
+		if texts:
+			self.records[form_id] = (record_type, texts)
+			self._link(form_id, texts)
+
+	def remove(self, form_id: bytes) -> None:
+		"""
+		Remove the text of a record, e.g. after the record is deleted.
+
+		:param form_id:
+		"""
+
+		if form_id not in self.records:
+			return
+
+		_, texts = self.records.pop(form_id)
+		for number, (_, text) in enumerate(texts):
+			for token in set(_tokenize(text)):
+				documents = self._postings[token]
+				documents.pop((form_id, number), None)
+				if not documents:
+					del self._postings[token]
+
+		self._vocabulary = None
+
+	@staticmethod
+	def _extract(record_type: bytes, payload: bytes) -> List[Tuple[bytes, str]]:
+		texts = []
+
+		for subrecord in iter_subrecords(payload):
+			if subrecord.type not in _TEXT_SUBRECORDS:
+				continue
+
+			record_types = _TEXT_SUBRECORDS[subrecord.type]
+			if record_types is not None and record_type not in record_types:
+				continue
+
+			if subrecord.type == b"TNAM" and subrecord.size == 4:
+				# The form ID of a topic.
+				continue
+
+			text = payload[subrecord.offset:subrecord.end].rstrip(b"\x00").decode("cp1252", errors="replace")
+			if text:
+				texts.append((subrecord.type, text))
+
+		return texts
+
+	def add_plugin(self, buffer: Buffer, table: Optional[bytes] = None) -> None:
+		"""
+		Add the text in an ESP file, replacing the text of any records already added with the same form IDs.
+
+		:param buffer: The raw bytes of the ESP file.
+		:param table: A table returned by :func:`~.master_table` to rewrite the plugin's form IDs
+			in terms of the full load order.
+		"""
+
+		for header in iter_records(buffer):
+			texts = self._extract(header.type, record_payload(buffer, header))
+			form_id = header.id if table is None else remap_form_id(header.id, table)
+			if texts or form_id in self.records:
+				self.update_texts(form_id, header.type, texts)
+
+	@classmethod
+	def build(cls: Type[Self], buffer: Buffer) -> Self:
+		"""
+		Build the index by scanning an ESP file.
+
+		:param buffer: The raw bytes of the ESP file.
+		"""
+
+		index = cls()
+		index.add_plugin(buffer)
+		return index
+
+	@classmethod
+	def from_load_order(cls: Type[Self], plugins: Sequence[PathLike]) -> Self:
+		"""
+		Construct from the text in the given ESP files, with later plugins overriding earlier ones.
+
+		Form IDs are rewritten in terms of the full load order, so the last byte of each as stored
+		(the most significant) is the index of the plugin in ``plugins`` which created the record.
+
+		:param plugins: The paths to the ESP files, in load order.
+		"""
+
+		index = cls()
+
+		for _, buffer, table in iter_load_order(plugins):
+			index.add_plugin(buffer, table)
+
+		return index
+
+	def to_json(self) -> Any:
+		"""
+		Returns a JSON-serializable representation of the index.
+		"""
+
+		return {
+				form_id.hex(): [record_type.decode("latin-1"), [[s.decode("latin-1"), text] for s, text in texts]]
+				for form_id, (record_type, texts) in self.records.items()
+				}
+
+	@classmethod
+	def from_json(cls: Type[Self], data: Any) -> Self:
+		"""
+		Construct the index from the output of :meth:`~.TextIndex.to_json`.
+
+		:param data:
+		"""
+
+		return cls({
+				bytes.fromhex(form_id): (
+						record_type.encode("latin-1"),
+						[(s.encode("latin-1"), text) for s, text in texts],
+						)
+				for form_id, (record_type, texts) in data.items()
+				})
+
+	def _entries(self, documents: Iterable[_Document]) -> List[TextEntry]:
+		entries = []
+		for form_id, number in sorted(documents):
+			record_type, texts = self.records[form_id]
+			entries.append(TextEntry(form_id, record_type, *texts[number]))
+
+		return entries
+
+	def search(self, query: str) -> List[TextEntry]:
+		"""
+		Returns the text containing all of the words in the query, in any order.
+
+		:param query:
+		"""
+
+		tokens = _tokenize(query)
+		if not tokens:
+			return []
+
+		postings = sorted((self._postings.get(token, {}) for token in set(tokens)), key=len)
+		documents = set(postings[0]).intersection(*postings[1:])
+		return self._entries(documents)
+
+	def search_phrase(self, phrase: str) -> List[TextEntry]:
+		"""
+		Returns the text containing the words in the phrase, consecutively and in order.
+
+		:param phrase:
+		"""
+
+		tokens = _tokenize(phrase)
+		if not tokens:
+			return []
+
+		postings = [self._postings.get(token, {}) for token in tokens]
+		documents = set(postings[0]).intersection(*postings[1:])
+
+		matches = set()
+		for document in documents:
+			starts: Set[int] = set(postings[0][document])
+			for offset, token_postings in enumerate(postings[1:], start=1):
+				starts.intersection_update(position - offset for position in token_postings[document])
+				if not starts:
+					break
+			else:
+				matches.add(document)
+
+		return self._entries(matches)
+
+	def search_prefix(self, prefix: str) -> List[TextEntry]:
+		"""
+		Returns the text containing a word starting with the given prefix.
+
+		:param prefix:
+		"""
+
+		prefix = prefix.casefold()
+		if self._vocabulary is None:
+			self._vocabulary = sorted(self._postings)
+
+		documents: Set[_Document] = set()
+		for token in self._vocabulary[bisect_left(self._vocabulary, prefix):]:
+			if not token.startswith(prefix):
+				break
+			documents.update(self._postings[token])
+
+		return self._entries(documents)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+#
+#  leveled.py
+"""
+Flattening of leveled lists into the items they can give.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Sequence, Tuple, Type
+
+# 3rd party
+import attrs
+from domdf_python_tools.typing import PathLike
+from typing_extensions import Self
+
+# this package
+from esp_parser.formids import iter_load_order, remap_form_id
+from esp_parser.records._lvli import _lvlo_struct
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+from esp_parser.types import Record
+from esp_parser.utils import NULL
+
+__all__ = [
+		"CALCULATE_ALL_LEVELS",
+		"CALCULATE_EACH_ITEM",
+		"LEVELED_TYPES",
+		"LeveledEntry",
+		"LeveledList",
+		"LeveledLists",
+		"USE_ALL"
+		]
+
+#: The types of leveled list record.
+LEVELED_TYPES = frozenset({b"LVLI", b"LVLN", b"LVLC"})
+
+#: ``LVLF`` flag: choose from entries at all levels up to the player's level, rather than only the highest.
+CALCULATE_ALL_LEVELS = 0x01
+
+#: ``LVLF`` flag: choose again for each of an entry's ``count``, rather than once.
+CALCULATE_EACH_ITEM = 0x02
+
+#: ``LVLF`` flag: give every eligible entry, rather than choosing one (:class:`~.LVLI` only).
+USE_ALL = 0x04
+
+
+class LeveledEntry(NamedTuple):
+	"""
+	An entry (``LVLO``) in a :class:`~.LeveledList`.
+	"""
+
+	#: The minimum player level for the entry.
+	level: int
+
+	#: The form ID of an item, NPC, creature or another leveled list.
+	reference: bytes
+
+	count: int = 1
+
+
+class LeveledList(NamedTuple):
+	"""
+	The contents of a leveled list record.
+	"""
+
+	#: The chance (percent) that the list gives nothing (``LVLD``).
+	chance_none: int = 0
+
+	#: Flags (``LVLF``).
+	flags: int = 0
+
+	#: The form ID of a :class:`~.GLOB` record overriding ``chance_none`` (``LVLG``), or :py:data:`~.NULL`.
+	chance_none_global: bytes = NULL
+
+	entries: Tuple[LeveledEntry, ...] = ()
+
+	@classmethod
+	def from_payload(cls: Type[Self], payload: bytes) -> Self:
+		"""
+		Construct the leveled list from a record's data, without parsing the record.
+
+		:param payload: The record's data, as returned by :func:`~.record_payload`.
+		"""
+
+		chance_none, flags, chance_none_global = 0, 0, NULL
+		entries = []
+
+		for subrecord in iter_subrecords(payload):
+			if subrecord.type == b"LVLD":
+				chance_none = payload[subrecord.offset]
+			elif subrecord.type == b"LVLF":
+				flags = payload[subrecord.offset]
+			elif subrecord.type == b"LVLG":
+				chance_none_global = payload[subrecord.offset:subrecord.end]
+			elif subrecord.type == b"LVLO":
+				level, _, reference, count, _ = _lvlo_struct.unpack_from(payload, subrecord.offset)
+				entries.append(LeveledEntry(level, reference, count))
+
+		return cls(chance_none, flags, chance_none_global, tuple(entries))
+
+	@classmethod
+	def from_record(cls: Type[Self], record: Record) -> Self:
+		"""
+		Construct the leveled list from a parsed :class:`~.LVLI`, :class:`~.LVLN` or :class:`~.LVLC` record.
+
+		:param record:
+		"""
+
+		return cls.from_payload(b"".join(subrecord.unparse() for subrecord in record.data))
+
+	def remap(self, table: bytes) -> "LeveledList":
+		"""
+		Returns a copy of the list with its form IDs rewritten with :func:`~.remap_form_id`.
+
+		:param table: A table returned by :func:`~.master_table`.
+		"""
+
+		return self._replace(
+				chance_none_global=remap_form_id(self.chance_none_global, table),
+				entries=tuple(entry._replace(reference=remap_form_id(entry.reference, table)) for entry in self.entries),
+				)
+
+
+@attrs.define
+class LeveledLists:
+	"""
+	Resolves leveled lists into the probability of giving each number of each item at a given player level.
+
+	Nested lists are expanded, and the results are the items, NPCs or creatures themselves.
+	Results are memoized for each list and level, so evaluating many lists which share sub-lists is cheap.
+	The cache is cleared whenever lists are added.
+	"""
+
+	#: Mapping of form IDs to leveled lists.
+	lists: Dict[bytes, LeveledList] = attrs.field(factory=dict)
+
+	#: The values of :class:`~.GLOB` records used for the lists' chance none, by form ID.
+	global_values: Dict[bytes, float] = attrs.field(factory=dict)
+
+	_cache: Dict[Tuple[bytes, int], Dict[bytes, Dict[int, float]]] = attrs.field(
+			factory=dict,
+			init=False,
+			repr=False,
+			eq=False,
+			)
+
+	def add(self, form_id: bytes, leveled_list: LeveledList) -> None:
+		"""
+		Add a leveled list, replacing (overriding) any existing list with the same form ID.
+
+		:param form_id:
+		:param leveled_list:
+		"""
+
+		self.lists[form_id] = leveled_list
+		self._cache.clear()
+
+	def add_plugin(self, buffer: Buffer, table: Optional[bytes] = None) -> None:
+		"""
+		Add the leveled lists in an ESP file, overriding any lists already added with the same form IDs.
+
+		:param buffer: The raw bytes of the ESP file.
+		:param table: A table returned by :func:`~.master_table` to rewrite the plugin's form IDs
+			in terms of the full load order.
+		"""
+
+		for header in iter_records(buffer, set(LEVELED_TYPES)):
+			leveled_list = LeveledList.from_payload(record_payload(buffer, header))
+			form_id = header.id
+			if table is not None:
+				leveled_list = leveled_list.remap(table)
+				form_id = remap_form_id(form_id, table)
+			self.lists[form_id] = leveled_list
+
+		self._cache.clear()
+
+	@classmethod
+	def from_load_order(cls: Type[Self], plugins: Sequence[PathLike]) -> Self:
+		"""
+		Construct from the leveled lists in the given ESP files, with later plugins overriding earlier ones.
+
+		Form IDs are rewritten in terms of the full load order, so the last byte of each as stored
+		(the most significant) is the index of the plugin in ``plugins`` which created the record.
+
+		:param plugins: The paths to the ESP files, in load order.
+		"""
+
+		resolver = cls()
+
+		for _, buffer, table in iter_load_order(plugins):
+			resolver.add_plugin(buffer, table)
+
+		return resolver
+
+	def distribution(self, form_id: bytes, level: int) -> Dict[bytes, Dict[int, float]]:
+		"""
+		Returns the probability of a leveled list giving each number of each item at the given player level.
+
+		Nested lists are expanded, so the keys are the form IDs of the items (or NPCs or creatures) themselves.
+		The values map the numbers of the item which can be given to their probabilities;
+		the list gives none of the item with the remaining probability.
+
+		:param form_id: The form ID of the leveled list.
+		:param level: The player's level.
+
+		:raises ValueError: If the list contains itself, directly or through other lists.
+		"""
+
+		return {item: dict(counts) for item, counts in self._resolve(form_id, level, ()).items()}
+
+	def distributions(
+			self,
+			form_id: bytes,
+			levels: Iterable[int] = range(1, 51),
+			) -> Dict[int, Dict[bytes, Dict[int, float]]]:
+		"""
+		Returns the probability of a leveled list giving each number of each item at each of the given player levels.
+
+		:param form_id: The form ID of the leveled list.
+		:param levels:
+		"""
+
+		return {level: self.distribution(form_id, level) for level in levels}
+
+	def drop_chances(self, form_id: bytes, level: int) -> Dict[bytes, float]:
+		"""
+		Returns the probability of a leveled list giving at least one of each item at the given player level.
+
+		:param form_id: The form ID of the leveled list.
+		:param level: The player's level.
+		"""
+
+		return {item: sum(counts.values()) for item, counts in self._resolve(form_id, level, ()).items()}
+
+	def expected_counts(self, form_id: bytes, level: int) -> Dict[bytes, float]:
+		"""
+		Returns the expected number of each item given by a leveled list at the given player level.
+
+		:param form_id: The form ID of the leveled list.
+		:param level: The player's level.
+		"""
+
+		return {
+				item: sum(count * probability for count, probability in counts.items())
+				for item, counts in self._resolve(form_id, level, ()).items()
+				}
+
+	def can_give(self, form_id: bytes, item: bytes, level: int) -> bool:
+		"""
+		Returns whether a leveled list can ever give the given item at the given player level.
+
+		:param form_id: The form ID of the leveled list.
+		:param item: The form ID of the item (or NPC or creature).
+		:param level: The player's level.
+		"""
+
+		return sum(self._resolve(form_id, level, ()).get(item, {}).values()) > 0
+
+	def _chance(self, leveled_list: LeveledList) -> float:
+		chance_none = self.global_values.get(leveled_list.chance_none_global, leveled_list.chance_none)
+		return max(0.0, min(1.0, 1 - chance_none / 100))
+
+	def _resolve(
+			self,
+			form_id: bytes,
+			level: int,
+			stack: Tuple[bytes, ...],
+			) -> Mapping[bytes, Mapping[int, float]]:
+		key = (form_id, level)
+		if key in self._cache:
+			return self._cache[key]
+
+		if form_id in stack:
+			cycle = " -> ".join(f.hex() for f in stack[stack.index(form_id):] + (form_id, ))
+			raise ValueError(f"Leveled list cycle: {cycle}")
+
+		leveled_list = self.lists[form_id]
+		eligible = [entry for entry in leveled_list.entries if entry.level <= level]
+		if eligible and not leveled_list.flags & CALCULATE_ALL_LEVELS:
+			highest = max(entry.level for entry in eligible)
+			eligible = [entry for entry in eligible if entry.level == highest]
+
+		result: Dict[bytes, Dict[int, float]] = {}
+		stack += (form_id, )
+		for entry in eligible:
+			items: Dict[bytes, Mapping[int, float]]
+			if entry.reference not in self.lists:
+				items = {entry.reference: {entry.count: 1.0}}
+			elif leveled_list.flags & CALCULATE_EACH_ITEM:
+				# The sub-list is chosen from again for each of the entry's count.
+				items = {}
+				for item, counts in self._resolve(entry.reference, level, stack).items():
+					total = counts
+					for _ in range(entry.count - 1):
+						total = _add_counts(total, counts)
+					items[item] = total
+			else:
+				items = {
+						item: {count * entry.count: probability for count, probability in counts.items()}
+						for item, counts in self._resolve(entry.reference, level, stack).items()
+						}
+
+			for item, counts in items.items():
+				if leveled_list.flags & USE_ALL:
+					# Every entry is given, independently of the others.
+					result[item] = _add_counts(result.get(item, {}), counts)
+				else:
+					# One entry is chosen, with equal probability.
+					item_counts = result.setdefault(item, {})
+					for count, probability in counts.items():
+						item_counts[count] = item_counts.get(count, 0) + probability / len(eligible)
+
+		# The list gives nothing with its chance none, whichever entries would have been given.
+		chance = self._chance(leveled_list)
+		for counts in result.values():
+			for count in counts:
+				counts[count] *= chance
+
+		self._cache[key] = result
+		return result
+
+
+def _add_counts(first: Mapping[int, float], second: Mapping[int, float]) -> Dict[int, float]:
+	# The distribution of the sum of two independent numbers of an item,
+	# each given as the probabilities of its non-zero values.
+
+	first_zero = 1 - sum(first.values())
+	second_zero = 1 - sum(second.values())
+
+	result: Dict[int, float] = {}
+	for count, probability in first.items():
+		result[count] = result.get(count, 0) + probability * second_zero
+	for count, probability in second.items():
+		result[count] = result.get(count, 0) + probability * first_zero
+	for first_count, first_probability in first.items():
+		for second_count, second_probability in second.items():
+			total = first_count + second_count
+			result[total] = result.get(total, 0) + first_probability * second_probability
+
+	# Numbers which cannot be given, as the other is always given.
+	return {count: probability for count, probability in result.items() if probability}
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+#
+#  load_order.py
+"""
+Resolution of the winning overrides of records across a load order.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+# stdlib
+import mmap
+from bisect import insort
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Set
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from typing_extensions import Self
+
+# this package
+from esp_parser.formids import master_table, remap_form_id
+from esp_parser.indexes import RecordIndex, RecordLocation
+from esp_parser.scan import Buffer, header_at, map_plugin, parse_record, record_payload
+from esp_parser.types import RecordType
+
+__all__ = ["LoadOrder", "Winner"]
+
+
+class Winner(NamedTuple):
+	"""
+	The winning override of a record in a :class:`~.LoadOrder`.
+	"""
+
+	#: The index of the plugin containing the winning override.
+	plugin: int
+
+	#: The record type, e.g. ``b"WEAP"``.
+	type: bytes
+
+	#: The offset of the record's header within the plugin.
+	offset: int
+
+	#: Record flags
+	flags: int
+
+
+class LoadOrder:
+	"""
+	Resolves the winning override of every record across a list of plugins.
+
+	Form IDs are rewritten in terms of the full load order, so the last byte of each as stored
+	(the most significant) is the index of the plugin in ``plugins`` which created the record.
+	The last plugin in the load order containing a record wins.
+
+	Only the record headers of each plugin are read, and are cached in a :class:`~.RecordIndex`
+	sidecar file next to the plugin, so unchanged plugins are not scanned again.
+	Records are only decoded when requested with :meth:`~.LoadOrder.parse_record`.
+
+	:param plugins: The paths to the ESP files, in load order.
+	:param save: Whether to save the sidecar files for plugins which had to be scanned.
+	"""
+
+	#: The paths to the ESP files, in load order.
+	plugins: List[PathPlus]
+
+	#: Mapping of form IDs to their winning overrides.
+	winners: Dict[bytes, Winner]
+
+	def __init__(self, plugins: Sequence[PathLike], save: bool = True):
+		self.plugins = [PathPlus(plugin) for plugin in plugins]
+		self.winners = {}
+		self._save = save
+		self._names = [plugin.name for plugin in self.plugins]
+
+		# The records in each plugin, by form ID in terms of the full load order.
+		self._records: List[Dict[bytes, RecordLocation]] = [{} for _ in self.plugins]
+
+		# The indexes of the plugins containing each record, in load order.
+		self._sources: Dict[bytes, List[int]] = {}
+
+		self._stamps: List[Any] = [None] * len(self.plugins)
+		self._buffers: Dict[int, Buffer] = {}
+
+		for index in range(len(self.plugins)):
+			self._load_plugin(index)
+
+	def __repr__(self) -> str:
+		return f"<{self.__class__.__name__}({len(self.plugins)} plugins, {len(self.winners)} records)>"
+
+	def __len__(self) -> int:
+		return len(self.winners)
+
+	def __contains__(self, form_id: object) -> bool:
+		return form_id in self.winners
+
+	def __getitem__(self, form_id: bytes) -> Winner:
+		return self.winners[form_id]
+
+	def __iter__(self) -> Iterator[bytes]:
+		return iter(self.winners)
+
+	def __enter__(self: Self) -> Self:
+		return self
+
+	def __exit__(self, *args: Any) -> None:
+		self.close()
+
+	def _load_plugin(self, index: int) -> None:
+		plugin = self.plugins[index]
+		self._stamps[index] = RecordIndex._source_stamp(plugin)
+		record_index = RecordIndex.for_plugin(plugin, save=self._save)
+		table = master_table(record_index.masters, self._names[index], self._names)
+
+		records = {remap_form_id(form_id, table): location for form_id, location in record_index.records.items()}
+
+		previous = self._records[index]
+		self._records[index] = records
+
+		changed: Set[bytes] = set()
+		for form_id in previous.keys() - records.keys():
+			sources = self._sources[form_id]
+			sources.remove(index)
+			if not sources:
+				del self._sources[form_id]
+			changed.add(form_id)
+
+		for form_id in records:
+			sources = self._sources.setdefault(form_id, [])
+			if index not in sources:
+				insort(sources, index)
+			changed.add(form_id)
+
+		for form_id in changed:
+			self._update_winner(form_id)
+
+	def _update_winner(self, form_id: bytes) -> None:
+		sources = self._sources.get(form_id)
+		if not sources:
+			self.winners.pop(form_id, None)
+			return
+
+		plugin = sources[-1]
+		self.winners[form_id] = Winner(plugin, *self._records[plugin][form_id])
+
+	def update_plugin(self, plugin: int) -> None:
+		"""
+		Rescan a plugin after it has changed, updating the winning overrides of the records it contains
+		or used to contain.
+
+		:param plugin: The index of the plugin in the load order.
+		"""
+
+		self._close_buffer(plugin)
+		self._load_plugin(plugin)
+
+	def refresh(self) -> List[int]:
+		"""
+		Rescan the plugins which have changed on disk since they were last scanned.
+
+		:returns: The indexes of the plugins which were rescanned.
+		"""
+
+		changed = []
+		for index, plugin in enumerate(self.plugins):
+			if RecordIndex._source_stamp(plugin) != self._stamps[index]:
+				self.update_plugin(index)
+				changed.append(index)
+
+		return changed
+
+	def overrides(self, form_id: bytes) -> List[int]:
+		"""
+		Returns the indexes of the plugins containing a record, in load order.
+
+		The last plugin is the winner.
+
+		:param form_id:
+		"""
+
+		return list(self._sources.get(form_id, ()))
+
+	def _buffer(self, plugin: int) -> Buffer:
+		if plugin not in self._buffers:
+			self._buffers[plugin] = map_plugin(self.plugins[plugin])
+		return self._buffers[plugin]
+
+	def _close_buffer(self, plugin: int) -> None:
+		buffer = self._buffers.pop(plugin, None)
+		if isinstance(buffer, mmap.mmap):
+			buffer.close()
+
+	def close(self) -> None:
+		"""
+		Close the plugins opened to read records.
+		"""
+
+		for plugin in list(self._buffers):
+			self._close_buffer(plugin)
+
+	def payload(self, form_id: bytes, plugin: Optional[int] = None) -> bytes:
+		"""
+		Returns the data of a record (its subrecords), decompressing it if required.
+
+		:param form_id:
+		:param plugin: The index of the plugin to read the record from. Defaults to the winning override.
+		"""
+
+		if plugin is None:
+			plugin = self.winners[form_id].plugin
+
+		buffer = self._buffer(plugin)
+		return record_payload(buffer, header_at(buffer, self._records[plugin][form_id].offset))
+
+	def parse_record(self, form_id: bytes, plugin: Optional[int] = None) -> RecordType:
+		"""
+		Parse a record.
+
+		The form IDs within the returned record are as stored in the plugin,
+		and can be rewritten with :func:`~.remap_form_id` and :func:`~.master_table`.
+
+		:param form_id:
+		:param plugin: The index of the plugin to read the record from. Defaults to the winning override.
+		"""
+
+		if plugin is None:
+			plugin = self.winners[form_id].plugin
+
+		buffer = self._buffer(plugin)
+		return parse_record(buffer, header_at(buffer, self._records[plugin][form_id].offset))
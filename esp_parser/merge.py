@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+#
+#  merge.py
+"""
+Merging of several ESP files into one.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+
+# stdlib
+import mmap
+import struct
+import zlib
+from io import BytesIO
+from typing import IO, Any, Dict, List, Optional, Sequence, Set, Tuple
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+
+# this package
+from esp_parser.formids import iter_form_ids, read_masters
+from esp_parser.group import GroupTypeEnum
+from esp_parser.records import TES4, WRLD
+from esp_parser.scan import (
+		Buffer,
+		GroupHeader,
+		header_at,
+		iter_records,
+		iter_subrecords,
+		map_plugin,
+		record_payload
+		)
+from esp_parser.utils import NULL, TES4_0_94, create_tes4
+
+__all__ = ["merge_plugins"]
+
+_record_header_struct = struct.Struct("<4sII4s")
+_group_header_struct = struct.Struct("<4sI4sI")
+
+#: Group types whose label is a form ID.
+_form_id_group_types = {
+		GroupTypeEnum.WorldChildren,
+		GroupTypeEnum.CellChildren,
+		GroupTypeEnum.TopicChildren,
+		GroupTypeEnum.CellPersistentChildren,
+		GroupTypeEnum.CellTemporaryChildren,
+		GroupTypeEnum.CellVisibleDistantChildren,
+		}
+
+# Identifies a group in the merged file: its type and label (rewritten for form ID labels).
+_GroupKey = Tuple[int, bytes]
+
+# The location of a record in the inputs: the index of the plugin and the offset of the record's header.
+_Location = Tuple[int, int]
+
+
+class _Node:
+	# A group in the merged file, and the records and groups it contains in the order they are written.
+
+	__slots__ = ("key", "stamp", "items", "records", "groups")
+
+	def __init__(self, key: _GroupKey, stamp: bytes):
+		self.key = key
+
+		# The date stamp and unknown field of the group's header.
+		self.stamp = stamp
+
+		# ``(True, form_id)`` for records, ``(False, group_key)`` for groups.
+		self.items: List[Tuple[bool, Any]] = []
+		self.records: Dict[bytes, _Location] = {}
+		self.groups: Dict[_GroupKey, "_Node"] = {}
+
+
+class _Remapper:
+	# Rewrites form IDs from one of the input plugins in terms of the merged plugin.
+
+	def __init__(
+			self,
+			masters: Sequence[str],
+			plugin: int,
+			names: Sequence[str],
+			output_masters: Sequence[str],
+			renumbered: Sequence[Dict[int, int]],
+			):
+		positions = {name.casefold(): index for index, name in enumerate(names)}
+		output_positions = {name.casefold(): index for index, name in enumerate(output_masters)}
+
+		# For each load order index within the plugin: the index of the master in the merged plugin,
+		# and the renumbered object IDs of the input plugin which created the records.
+		self.sources: List[Tuple[int, Dict[int, int]]] = []
+		for index, name in enumerate([*masters, names[plugin]]):
+			if name.casefold() in output_positions:
+				self.sources.append((output_positions[name.casefold()], {}))
+			else:
+				self.sources.append((len(output_masters), renumbered[positions[name.casefold()]]))
+
+		self.identity = all(
+				source == index and not renumbers for index, (source, renumbers) in enumerate(self.sources)
+				)
+
+	def __call__(self, form_id: bytes) -> bytes:
+		if form_id == NULL:
+			return form_id
+
+		source, renumbers = self.sources[min(form_id[3], len(self.sources) - 1)]
+		object_id = int.from_bytes(form_id[:3], "little")
+		return renumbers.get(object_id, object_id).to_bytes(3, "little") + bytes([source])
+
+
+def _rewrite_record(buffer: Buffer, offset: int, form_id: bytes, remap: _Remapper) -> bytes:
+	# Returns the raw bytes of the record with its form IDs rewritten.
+
+	header = header_at(buffer, offset)
+	raw = buffer[header.offset:header.end]
+
+	if remap.identity:
+		return bytes(raw)
+
+	payload = record_payload(buffer, header)
+	rewritten = bytearray(payload)
+	changed = False
+
+	for _, position, old_form_id in iter_form_ids(header.type, payload):
+		new_form_id = remap(old_form_id)
+		if new_form_id != old_form_id:
+			rewritten[position:position + 4] = new_form_id
+			changed = True
+
+	if not changed:
+		data = bytes(raw[24:])
+	elif header.compressed:
+		data = struct.pack("<I", len(rewritten)) + zlib.compress(bytes(rewritten))
+	else:
+		data = bytes(rewritten)
+
+	return _record_header_struct.pack(header.type, len(data), header.flags, form_id) + raw[16:24] + data
+
+
+def _cell_grid(buffer: Buffer, offset: int) -> Optional[Tuple[int, int]]:
+	# Returns the grid coordinates of an exterior cell (from its XCLC), or None for other records.
+
+	header = header_at(buffer, offset)
+	if header.type != b"CELL":
+		return None
+
+	payload = record_payload(buffer, header)
+	for subrecord in iter_subrecords(payload):
+		if subrecord.type == b"XCLC":
+			return struct.unpack_from("<ii", payload, subrecord.offset)
+
+	return None
+
+
+def _write_world(
+		fp: IO[bytes],
+		raw: bytes,
+		children: Optional[_Node],
+		buffers: Sequence[Buffer],
+		remappers: Sequence[_Remapper],
+		) -> int:
+	# Writes a WRLD record followed by the group of its children, with its OFST regenerated for the cells'
+	# offsets in the merged file, and returns the number of records and groups written.
+
+	world = WRLD.parse(BytesIO(raw))
+	start = fp.tell()
+	fp.write(world._with_cell_offsets({}).unparse())
+	children_start = fp.tell()
+
+	count = 1
+	cells: Dict[Tuple[int, int], int] = {}
+	if children is not None:
+		count += _write_group(fp, children, buffers, remappers, cells)
+	end = fp.tell()
+
+	record = world._with_cell_offsets({
+			grid: position - children_start
+			for grid, position in cells.items()
+			}).unparse()
+
+	if len(record) == children_start - start:
+		fp.seek(start)
+		fp.write(record)
+	else:
+		# The size of a compressed record depends on the offsets, so the children are moved after it.
+		fp.seek(children_start)
+		children_raw = fp.read(end - children_start)
+		fp.seek(start)
+		fp.write(record)
+		fp.write(children_raw)
+		fp.truncate()
+
+	fp.seek(0, 2)
+	return count
+
+
+def _write_group(
+		fp: IO[bytes],
+		node: _Node,
+		buffers: Sequence[Buffer],
+		remappers: Sequence[_Remapper],
+		cells: Optional[Dict[Tuple[int, int], int]] = None,
+		) -> int:
+	# Returns the number of records and groups written, which is 0 if the group was empty and not written.
+
+	start = fp.tell()
+	group_type, label = node.key
+	fp.write(_group_header_struct.pack(b"GRUP", 0, label, group_type))
+	fp.write(node.stamp)
+
+	count = _write_items(fp, node, buffers, remappers, cells)
+	end = fp.tell()
+
+	if not count:
+		fp.seek(start)
+		fp.truncate()
+		return 0
+
+	fp.seek(start + 4)
+	fp.write(struct.pack("<I", end - start))
+	fp.seek(end)
+	return count + 1
+
+
+def _write_items(
+		fp: IO[bytes],
+		node: _Node,
+		buffers: Sequence[Buffer],
+		remappers: Sequence[_Remapper],
+		cells: Optional[Dict[Tuple[int, int], int]] = None,
+		) -> int:
+	# Writes the records and groups of the node, and records the positions of exterior cells in ``cells``.
+
+	count = 0
+
+	# The groups of children of the worldspaces among the records, which are written with them.
+	worlds = {
+			(int(GroupTypeEnum.WorldChildren), key)
+			for is_record, key in node.items
+			if is_record and key in node.records
+			}
+
+	for is_record, key in node.items:
+		if is_record:
+			location = node.records.get(key)
+			if location is None:
+				continue
+
+			plugin, offset = location
+			raw = _rewrite_record(buffers[plugin], offset, key, remappers[plugin])
+			if raw[:4] == b"WRLD":
+				# Each worldspace is followed by its children, which are needed to locate its cells.
+				children = node.groups.get((int(GroupTypeEnum.WorldChildren), key))
+				count += _write_world(fp, raw, children, buffers, remappers)
+				continue
+
+			if cells is not None:
+				grid = _cell_grid(buffers[plugin], offset)
+				if grid is not None:
+					cells[grid] = fp.tell()
+
+			fp.write(raw)
+			count += 1
+		elif key not in worlds:
+			count += _write_group(fp, node.groups[key], buffers, remappers, cells)
+
+	return count
+
+
+def _group_key(group: GroupHeader, remap: _Remapper) -> _GroupKey:
+	label = group.label
+	if group.group_type in _form_id_group_types:
+		label = remap(label)
+	return int(group.group_type), label
+
+
+def _read_header(buffers: Sequence[Buffer]) -> Tuple[float, Optional[bytes], Optional[bytes]]:
+	# The version from the HEDR of the first plugin, and its author (CNAM) and description (SNAM).
+	for buffer in buffers:
+		if len(buffer):
+			payload = record_payload(buffer, header_at(buffer, 0))
+			fields: Dict[bytes, bytes] = {
+					subrecord.type: bytes(payload[subrecord.offset:subrecord.end]).rstrip(b"\x00")
+					for subrecord in iter_subrecords(payload)
+					}
+			return struct.unpack_from("<f", payload, 6)[0], fields.get(b"CNAM"), fields.get(b"SNAM")
+	return TES4_0_94, None, None
+
+
+def _check_order(names: Sequence[str], masters: Sequence[Sequence[str]]) -> None:
+	positions = {name.casefold(): index for index, name in enumerate(names)}
+	for plugin, plugin_masters in enumerate(masters):
+		for master in plugin_masters:
+			if positions.get(master.casefold(), -1) > plugin:
+				raise ValueError(f"{master!r} (a master of {names[plugin]!r}) must come before it")
+
+
+def merge_plugins(plugins: Sequence[PathLike], out: PathLike) -> Dict[str, Dict[bytes, bytes]]:
+	"""
+	Merge several ESP files into one.
+
+	The ESP files are merged in the order given, as in a load order, so where several of them contain a record
+	the last one wins. Their top-level groups are merged by type, and cells, worldspaces and dialogue topics
+	by their form IDs.
+
+	The merged plugin's masters are the masters of the ESP files, other than the ESP files themselves.
+	Its author and description are those of the first ESP file.
+	Records created by the ESP files become records created by the merged plugin. Where records created by
+	different ESP files have the same object ID, the later ones are given new, unused object IDs.
+	Form IDs within the records are rewritten to match, and records which need no changes are copied unchanged.
+
+	Only the record headers are held in memory; records are read and written one at a time.
+	The cell offset tables of worldspaces (:class:`WRLD.OFST <.WRLD.OFST>`) are regenerated,
+	as the cells are no longer at the same offsets.
+
+	:param plugins: The paths to the ESP files, in load order. The masters of each must come before it.
+	:param out: The path to write the merged ESP file to.
+
+	:returns: For each ESP file with renumbered records, a mapping of their form IDs, as stored in the ESP file,
+		to their form IDs in the merged plugin.
+	"""
+
+	names = [PathPlus(plugin).name for plugin in plugins]
+	folded_names = {name.casefold() for name in names}
+	buffers: List[Buffer] = []
+
+	try:
+		for plugin in plugins:
+			buffers.append(map_plugin(plugin))
+
+		masters = [read_masters(buffer) for buffer in buffers]
+		_check_order(names, masters)
+
+		output_masters: List[str] = []
+		for plugin_masters in masters:
+			for master in plugin_masters:
+				if master.casefold() not in folded_names and master not in output_masters:
+					output_masters.append(master)
+
+		# Renumber object IDs of new records which collide with those of earlier plugins.
+		new_records: List[List[int]] = []
+		for buffer, plugin_masters in zip(buffers, masters):
+			new_records.append([
+					int.from_bytes(header.id[:3], "little")
+					for header in iter_records(buffer)
+					if header.type != b"TES4" and header.id[3] >= len(plugin_masters)
+					])
+
+		next_object_id = max((max(ids, default=0) for ids in new_records), default=0) + 1
+		next_object_id = max(next_object_id, 0x800)
+
+		used: Set[int] = set()
+		renumbered: List[Dict[int, int]] = []
+		for object_ids in new_records:
+			renumbers = {}
+			for object_id in dict.fromkeys(object_ids):
+				if object_id in used:
+					renumbers[object_id] = next_object_id
+					object_id = next_object_id
+					next_object_id += 1
+				used.add(object_id)
+			renumbered.append(renumbers)
+
+		remappers = [
+				_Remapper(plugin_masters, plugin, names, output_masters, renumbered)
+				for plugin, plugin_masters in enumerate(masters)
+				]
+
+		# Arrange the records from every plugin into the groups of the merged plugin.
+		root = _Node((0, NULL), b'')
+		placed: Dict[bytes, _Node] = {}
+
+		for plugin, (buffer, remap) in enumerate(zip(buffers, remappers)):
+			previous_top_level: Optional[_GroupKey] = None
+
+			for header in iter_records(buffer):
+				if header.type == b"TES4":
+					continue
+
+				node = root
+				for depth, group in enumerate(header.groups):
+					key = _group_key(group, remap)
+					if key not in node.groups:
+						node.groups[key] = _Node(key, bytes(buffer[group.offset + 16:group.offset + 24]))
+						if depth == 0:
+							# Keep the top-level groups in the order they appear in the plugins.
+							position = 0
+							if previous_top_level is not None:
+								position = node.items.index((False, previous_top_level)) + 1
+							node.items.insert(position, (False, key))
+						else:
+							node.items.append((False, key))
+					if depth == 0:
+						previous_top_level = key
+					node = node.groups[key]
+
+				form_id = remap(header.id)
+				previous_node = placed.get(form_id)
+				if previous_node is not node:
+					if previous_node is not None:
+						del previous_node.records[form_id]
+					node.items.append((True, form_id))
+					placed[form_id] = node
+				node.records[form_id] = (plugin, header.offset)
+
+		del placed
+
+		with open(out, "w+b") as fp:
+			version, author, description = _read_header(buffers)
+			tes4 = create_tes4(version, 0, NULL, masters=output_masters)
+
+			# Keep the author and description as stored, rather than re-encoding them.
+			if author is not None:
+				tes4.data[1] = TES4.CNAM(author)
+			if description is not None:
+				tes4.data.insert(2, TES4.SNAM(description))
+
+			fp.write(tes4.unparse())
+
+			num_records = _write_items(fp, root, buffers, remappers)
+
+			fp.seek(0)
+			tes4.data[0] = tes4.HEDR(version, num_records, next_object_id.to_bytes(4, "little"))
+			fp.write(tes4.unparse())
+
+	finally:
+		for buffer in buffers:
+			if isinstance(buffer, mmap.mmap):
+				buffer.close()
+
+	return {
+			name: {
+					old.to_bytes(3, "little") + bytes([len(plugin_masters)]):
+							new.to_bytes(3, "little") + bytes([len(output_masters)])
+					for old, new in renumbers.items()
+					}
+			for name, plugin_masters, renumbers in zip(names, masters, renumbered)
+			if renumbers
+			}
+
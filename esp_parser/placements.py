@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+#
+#  placements.py
+"""
+Columnar table of the positions of placed references.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import struct
+from array import array
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+# 3rd party
+import attrs
+
+# this package
+from esp_parser.scan import Buffer, RecordHeader, iter_records, iter_subrecords, record_payload
+from esp_parser.utils import NULL
+
+__all__ = ["Placement", "PlacementTable", "placements"]
+
+#: The record types of placed references.
+PLACED_TYPES = frozenset({b"REFR", b"ACHR", b"ACRE", b"PGRE"})
+
+_data_struct = struct.Struct("<6f")
+_scale_struct = struct.Struct("<f")
+
+
+class Placement(NamedTuple):
+	"""
+	A single row of a :class:`~.PlacementTable`.
+	"""
+
+	#: The record type, e.g. ``b"REFR"``.
+	type: bytes
+
+	#: The form ID of the placed reference.
+	id: bytes
+
+	#: The form ID of the placed object (``NAME``), or null.
+	base: bytes
+
+	#: The form ID of the :class:`~.CELL` containing the reference, or null.
+	cell: bytes
+
+	xp: float
+	yp: float
+	zp: float
+	xr: float
+	yr: float
+	zr: float
+	scale: float
+
+
+def _floats() -> "array[float]":
+	return array('f')
+
+
+@attrs.define
+class PlacementTable:
+	"""
+	Columnar table of the positions, rotations and scales of placed references.
+
+	Each attribute is a column, with one entry per placed reference.
+	Edit the position and scale columns (directly or with :meth:`~.translate` and :meth:`~.rescale`)
+	and then call :meth:`~.write` to patch the changes into the ESP file.
+	"""
+
+	types: List[bytes] = attrs.field(factory=list)
+	ids: List[bytes] = attrs.field(factory=list)
+	bases: List[bytes] = attrs.field(factory=list)
+	cells: List[bytes] = attrs.field(factory=list)
+	xp: "array[float]" = attrs.field(factory=_floats)
+	yp: "array[float]" = attrs.field(factory=_floats)
+	zp: "array[float]" = attrs.field(factory=_floats)
+	xr: "array[float]" = attrs.field(factory=_floats)
+	yr: "array[float]" = attrs.field(factory=_floats)
+	zr: "array[float]" = attrs.field(factory=_floats)
+
+	#: The ``XSCL`` scale, or ``1.0`` if the reference has no ``XSCL`` subrecord.
+	scale: "array[float]" = attrs.field(factory=_floats)
+
+	# The location of each reference's record, its DATA subrecord and its XSCL subrecord (or -1).
+	_headers: List[RecordHeader] = attrs.field(factory=list, repr=False)
+	_data_offsets: "array[int]" = attrs.field(factory=lambda: array('q'), repr=False)
+	_scale_offsets: "array[int]" = attrs.field(factory=lambda: array('q'), repr=False)
+
+	# The packed DATA and XSCL values as last read from or written to the file.
+	_written: List[bytes] = attrs.field(factory=list, repr=False)
+
+	def __len__(self) -> int:
+		return len(self.ids)
+
+	def __getitem__(self, row: int) -> Placement:
+		return Placement(
+				self.types[row],
+				self.ids[row],
+				self.bases[row],
+				self.cells[row],
+				self.xp[row],
+				self.yp[row],
+				self.zp[row],
+				self.xr[row],
+				self.yr[row],
+				self.zr[row],
+				self.scale[row],
+				)
+
+	def append(self, header: RecordHeader, payload: bytes) -> None:
+		"""
+		Add the placed reference with the given header and data to the table.
+
+		References without a position (``DATA``) subrecord are ignored.
+
+		:param header:
+		:param payload: The record's data, as returned by :func:`~.record_payload`.
+		"""
+
+		base, position, scale_offset = NULL, None, -1
+		for subrecord in iter_subrecords(payload):
+			if subrecord.type == b"NAME" and subrecord.size == 4:
+				base = payload[subrecord.offset:subrecord.end]
+			elif subrecord.type == b"DATA" and subrecord.size == 24:
+				position = subrecord.offset
+			elif subrecord.type == b"XSCL" and subrecord.size == 4:
+				scale_offset = subrecord.offset
+
+		if position is None:
+			return
+
+		xp, yp, zp, xr, yr, zr = _data_struct.unpack_from(payload, position)
+		scale = 1.0 if scale_offset == -1 else _scale_struct.unpack_from(payload, scale_offset)[0]
+
+		self.types.append(header.type)
+		self.ids.append(header.id)
+		self.bases.append(base)
+		self.cells.append(header.cell or NULL)
+		for column, value in zip(self._columns, (xp, yp, zp, xr, yr, zr, scale)):
+			column.append(value)
+
+		self._headers.append(header)
+		self._data_offsets.append(header.data_offset + position)
+		self._scale_offsets.append(header.data_offset + scale_offset if scale_offset != -1 else -1)
+		self._written.append(self._pack(len(self) - 1))
+
+	@property
+	def _columns(self) -> Sequence["array[float]"]:
+		return self.xp, self.yp, self.zp, self.xr, self.yr, self.zr, self.scale
+
+	def _pack(self, row: int) -> bytes:
+		return _data_struct.pack(
+				self.xp[row],
+				self.yp[row],
+				self.zp[row],
+				self.xr[row],
+				self.yr[row],
+				self.zr[row],
+				) + _scale_struct.pack(self.scale[row])
+
+	def select(
+			self,
+			*,
+			cell: Optional[bytes] = None,
+			base: Optional[bytes] = None,
+			type: Optional[bytes] = None,  # noqa: A002  # pylint: disable=redefined-builtin
+			) -> List[int]:
+		"""
+		Returns the indices of the rows matching all the given criteria.
+
+		:param cell: The form ID of the parent :class:`~.CELL`.
+		:param base: The form ID of the placed object.
+		:param type: The record type.
+		"""
+
+		rows = range(len(self))
+		if cell is not None:
+			rows = [row for row in rows if self.cells[row] == cell]  # type: ignore[assignment]
+		if base is not None:
+			rows = [row for row in rows if self.bases[row] == base]  # type: ignore[assignment]
+		if type is not None:
+			rows = [row for row in rows if self.types[row] == type]  # type: ignore[assignment]
+
+		return list(rows)
+
+	def translate(
+			self,
+			x: float = 0.0,
+			y: float = 0.0,
+			z: float = 0.0,
+			rows: Optional[Iterable[int]] = None,
+			) -> None:
+		"""
+		Move references by the given offset.
+
+		:param x:
+		:param y:
+		:param z:
+		:param rows: The rows to move, e.g. from :meth:`~.select`. Defaults to every row.
+		"""
+
+		for column, offset in zip(self._columns, (x, y, z)):
+			if not offset:
+				continue
+
+			if rows is None:
+				column[:] = array('f', [value + offset for value in column])
+			else:
+				for row in rows:
+					column[row] += offset
+
+	def rescale(self, factor: float, rows: Optional[Iterable[int]] = None) -> None:
+		"""
+		Multiply the scale of references by ``factor``.
+
+		:param factor:
+		:param rows: The rows to rescale, e.g. from :meth:`~.select`. Defaults to every row.
+		"""
+
+		if rows is None:
+			self.scale[:] = array('f', [value * factor for value in self.scale])
+		else:
+			for row in rows:
+				self.scale[row] *= factor
+
+	def write(self, buffer: Buffer) -> int:
+		"""
+		Patch the changed positions and scales into the ESP file, in place.
+
+		Only the ``DATA`` and ``XSCL`` subrecords of changed references are overwritten.
+
+		:param buffer: The raw bytes of the ESP file the table was created from, as a writable buffer.
+
+		:raises ValueError: If a changed reference is compressed, or if the scale was changed for a reference
+			without an ``XSCL`` subrecord, as these changes would alter the size of the record.
+
+		:returns: The number of references written.
+		"""
+
+		changed = []
+		for row in range(len(self)):
+			packed = self._pack(row)
+			if packed == self._written[row]:
+				continue
+
+			header = self._headers[row]
+			if header.compressed:
+				raise ValueError(f"Cannot update compressed {header.type.decode()} record {header.id!r} in place")
+			if self._scale_offsets[row] == -1 and packed[24:] != self._written[row][24:]:
+				raise ValueError(f"Cannot add an XSCL subrecord to {header.type.decode()} record {header.id!r} in place")
+
+			changed.append((row, packed))
+
+		for row, packed in changed:
+			data_offset = self._data_offsets[row]
+			buffer[data_offset:data_offset + 24] = packed[:24]  # type: ignore[index]
+			scale_offset = self._scale_offsets[row]
+			if scale_offset != -1:
+				buffer[scale_offset:scale_offset + 4] = packed[24:]  # type: ignore[index]
+			self._written[row] = packed
+
+		return len(changed)
+
+
+def placements(plugin: Buffer) -> PlacementTable:
+	"""
+	Extract the positions of all placed references in an ESP file, in a single pass over the record headers.
+
+	Placed references are :class:`~.REFR`, :class:`~.ACHR`, :class:`~.ACRE` and :class:`~.PGRE` records.
+	Only their subrecords are read; other records are skipped by size.
+
+	:param plugin: The raw bytes of the ESP file.
+	"""
+
+	table = PlacementTable()
+	for header in iter_records(plugin, PLACED_TYPES):
+		table.append(header, record_payload(plugin, header))
+
+	return table
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+#
+#  recipes.py
+"""
+Graph of crafting recipes.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import struct
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple, Type
+
+# 3rd party
+import attrs
+from domdf_python_tools.typing import PathLike
+from typing_extensions import Self
+
+# this package
+from esp_parser.formids import iter_load_order, remap_form_id
+from esp_parser.scan import Buffer, iter_records, iter_subrecords, record_payload
+from esp_parser.types import Record
+from esp_parser.utils import NULL
+
+__all__ = ["Recipe", "RecipeGraph"]
+
+_uint32_struct = struct.Struct("<I")
+_data_struct = struct.Struct("<iI4s4s")
+
+
+class Recipe(NamedTuple):
+	"""
+	A crafting recipe (:class:`~.RCPE` record).
+	"""
+
+	#: ``(form ID, quantity)`` pairs for the items consumed by the recipe (``RCIL`` and ``RCQY``).
+	ingredients: Tuple[Tuple[bytes, int], ...] = ()
+
+	#: ``(form ID, quantity)`` pairs for the items produced by the recipe (``RCOD`` and ``RCQY``).
+	outputs: Tuple[Tuple[bytes, int], ...] = ()
+
+	#: The form ID of the recipe's category (a :class:`~.RCCT` record), or :py:data:`~.NULL`.
+	category: bytes = NULL
+
+	#: The form ID of the recipe's sub-category (a :class:`~.RCCT` record), or :py:data:`~.NULL`.
+	sub_category: bytes = NULL
+
+	@classmethod
+	def from_payload(cls: Type[Self], payload: bytes) -> Self:
+		"""
+		Construct the recipe from a record's data, without parsing the record.
+
+		:param payload: The record's data, as returned by :func:`~.record_payload`.
+		"""
+
+		ingredients: List[Tuple[bytes, int]] = []
+		outputs: List[Tuple[bytes, int]] = []
+		category = sub_category = NULL
+		current: Optional[List[Tuple[bytes, int]]] = None
+
+		for subrecord in iter_subrecords(payload):
+			if subrecord.type in {b"RCIL", b"RCOD"}:
+				current = ingredients if subrecord.type == b"RCIL" else outputs
+				current.append((payload[subrecord.offset:subrecord.end], 1))
+			elif subrecord.type == b"RCQY" and current:
+				quantity = _uint32_struct.unpack_from(payload, subrecord.offset)[0]
+				current[-1] = (current[-1][0], quantity)
+				current = None
+			elif subrecord.type == b"DATA" and subrecord.size >= 16:
+				category, sub_category = _data_struct.unpack_from(payload, subrecord.offset)[2:]
+
+		return cls(tuple(ingredients), tuple(outputs), category, sub_category)
+
+	@classmethod
+	def from_record(cls: Type[Self], record: Record) -> Self:
+		"""
+		Construct the recipe from a parsed :class:`~.RCPE` record.
+
+		:param record:
+		"""
+
+		return cls.from_payload(b"".join(subrecord.unparse() for subrecord in record.data))
+
+	def remap(self, table: bytes) -> "Recipe":
+		"""
+		Returns a copy of the recipe with its form IDs rewritten with :func:`~.remap_form_id`.
+
+		:param table: A table returned by :func:`~.master_table`.
+		"""
+
+		return Recipe(
+				tuple((remap_form_id(item, table), quantity) for item, quantity in self.ingredients),
+				tuple((remap_form_id(item, table), quantity) for item, quantity in self.outputs),
+				remap_form_id(self.category, table),
+				remap_form_id(self.sub_category, table),
+				)
+
+
+@attrs.define
+class RecipeGraph:
+	"""
+	Graph of the items consumed and produced by crafting recipes.
+
+	The raw material cost of each item is memoized.
+	When a recipe changes only the costs of its outputs, and of the items made from them, are recalculated.
+	"""
+
+	#: Mapping of the form IDs of :class:`~.RCPE` records to recipes.
+	recipes: Dict[bytes, Recipe] = attrs.field(factory=dict)
+
+	_by_ingredient: Dict[bytes, Set[bytes]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+	_by_output: Dict[bytes, Set[bytes]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+	_costs: Dict[bytes, Dict[bytes, float]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+
+	# The items whose costs were calculated from the cost of each item.
+	_dependents: Dict[bytes, Set[bytes]] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+
+	def __attrs_post_init__(self) -> None:
+		for form_id, recipe in self.recipes.items():
+			self._link(form_id, recipe)
+
+	def _link(self, form_id: bytes, recipe: Recipe) -> None:
+		for item, _ in recipe.ingredients:
+			self._by_ingredient.setdefault(item, set()).add(form_id)
+		for item, _ in recipe.outputs:
+			self._by_output.setdefault(item, set()).add(form_id)
+
+	def _unlink(self, index: Dict[bytes, Set[bytes]], form_id: bytes, items: Sequence[Tuple[bytes, int]]) -> None:
+		for item, _ in items:
+			recipes = index.get(item)
+			if recipes is not None:
+				recipes.discard(form_id)
+				if not recipes:
+					del index[item]
+
+	def _invalidate(self, items: Sequence[bytes]) -> None:
+		pending = list(items)
+		while pending:
+			item = pending.pop()
+			if self._costs.pop(item, None) is not None:
+				pending.extend(self._dependents.pop(item, ()))
+
+	def update_recipe(self, form_id: bytes, recipe: Recipe) -> None:
+		"""
+		Add or replace a recipe.
+
+		:param form_id: The form ID of the :class:`~.RCPE` record.
+		:param recipe:
+		"""
+
+		self.remove(form_id)
+		self.recipes[form_id] = recipe
+		self._link(form_id, recipe)
+		self._invalidate([item for item, _ in recipe.outputs])
+
+	def remove(self, form_id: bytes) -> None:
+		"""
+		Remove a recipe, e.g. after the record is deleted.
+
+		:param form_id: The form ID of the :class:`~.RCPE` record.
+		"""
+
+		recipe = self.recipes.pop(form_id, None)
+		if recipe is None:
+			return
+
+		self._unlink(self._by_ingredient, form_id, recipe.ingredients)
+		self._unlink(self._by_output, form_id, recipe.outputs)
+		self._invalidate([item for item, _ in recipe.outputs])
+
+	def update(self, record: Record) -> None:
+		"""
+		Add or replace a recipe after the record has been changed.
+
+		:param record: A :class:`~.RCPE` record.
+		"""
+
+		self.update_recipe(record.id, Recipe.from_record(record))
+
+	def add_plugin(self, buffer: Buffer, table: Optional[bytes] = None) -> None:
+		"""
+		Add the recipes in an ESP file, overriding any recipes already added with the same form IDs.
+
+		Only the costs affected by the plugin's recipes are recalculated.
+
+		:param buffer: The raw bytes of the ESP file.
+		:param table: A table returned by :func:`~.master_table` to rewrite the plugin's form IDs
+			in terms of the full load order.
+		"""
+
+		for header in iter_records(buffer, {b"RCPE"}):
+			recipe = Recipe.from_payload(record_payload(buffer, header))
+			if table is None:
+				self.update_recipe(header.id, recipe)
+			else:
+				self.update_recipe(remap_form_id(header.id, table), recipe.remap(table))
+
+	@classmethod
+	def from_load_order(cls: Type[Self], plugins: Sequence[PathLike]) -> Self:
+		"""
+		Construct from the recipes in the given ESP files, with later plugins overriding earlier ones.
+
+		Form IDs are rewritten in terms of the full load order, so the last byte of each as stored
+		(the most significant) is the index of the plugin in ``plugins`` which created the record.
+
+		:param plugins: The paths to the ESP files, in load order.
+		"""
+
+		graph = cls()
+
+		for _, buffer, table in iter_load_order(plugins):
+			graph.add_plugin(buffer, table)
+
+		return graph
+
+	def recipes_using(self, item: bytes) -> Set[bytes]:
+		"""
+		Returns the form IDs of the recipes which consume the given item.
+
+		:param item:
+		"""
+
+		return set(self._by_ingredient.get(item, ()))
+
+	def recipes_for(self, item: bytes) -> Set[bytes]:
+		"""
+		Returns the form IDs of the recipes which produce the given item.
+
+		:param item:
+		"""
+
+		return set(self._by_output.get(item, ()))
+
+	def raw_materials(self, item: bytes) -> Dict[bytes, float]:
+		"""
+		Returns the quantity of each raw material (an item which no recipe produces) needed to make one of the item.
+
+		Where several recipes produce an item, the one needing the fewest raw materials in total is used.
+		Recipes needing an item which is already being made further up the chain (e.g. a recipe breaking
+		an item back down into its ingredients) are skipped, and an ingredient whose every recipe is skipped
+		is counted as a raw material.
+
+		:param item:
+
+		:raises ValueError: If every recipe for the item requires the item itself.
+		"""
+
+		cost, cycle = self._cost(item, ())
+		if cost is None:
+			raise ValueError(f"Recipe cycle: {' -> '.join(f.hex() for f in cycle or ())}")
+
+		return dict(cost)
+
+	def _cost(
+			self,
+			item: bytes,
+			stack: Tuple[bytes, ...],
+			) -> Tuple[Optional[Dict[bytes, float]], Optional[Tuple[bytes, ...]]]:
+		# Returns the cost of the item, or None if every recipe for it needs an item on the stack,
+		# and the first cycle through the stack that was found.
+		# Costs found while skipping such recipes depend on the stack, so are not memoized.
+
+		if item in self._costs:
+			return self._costs[item], None
+
+		best: Optional[Dict[bytes, float]] = None
+		cycle: Optional[Tuple[bytes, ...]] = None
+		stack += (item, )
+
+		for form_id in sorted(self._by_output.get(item, ())):
+			recipe = self.recipes[form_id]
+			produced = sum(quantity for output, quantity in recipe.outputs if output == item)
+			if not produced:
+				continue
+
+			cost: Dict[bytes, float] = {}
+			for ingredient, quantity in recipe.ingredients:
+				self._dependents.setdefault(ingredient, set()).add(item)
+				if ingredient in stack:
+					cycle = cycle or stack[stack.index(ingredient):] + (ingredient, )
+					break
+
+				ingredient_cost, ingredient_cycle = self._cost(ingredient, stack)
+				cycle = cycle or ingredient_cycle
+				for material, amount in (ingredient_cost or {ingredient: 1.0}).items():
+					cost[material] = cost.get(material, 0) + amount * quantity / produced
+			else:
+				if best is None or sum(cost.values()) < sum(best.values()):
+					best = cost
+
+		if best is None and cycle is not None:
+			return None, cycle
+
+		result = {item: 1.0} if best is None else best
+		if cycle is None:
+			self._costs[item] = result
+		return result, cycle
+
+	def craftable(self, inventory: Mapping[bytes, int]) -> Set[bytes]:
+		"""
+		Returns the form IDs of the recipes which can be made from the given items.
+
+		:param inventory: Mapping of the form IDs of items to the quantity available.
+		"""
+
+		satisfied: Dict[bytes, int] = {}
+
+		for item, available in inventory.items():
+			for form_id in self._by_ingredient.get(item, ()):
+				needed = sum(quantity for ingredient, quantity in self.recipes[form_id].ingredients if ingredient == item)
+				if available >= needed:
+					satisfied[form_id] = satisfied.get(form_id, 0) + 1
+
+		return {
+				form_id
+				for form_id, count in satisfied.items()
+				if count == len({ingredient for ingredient, _ in self.recipes[form_id].ingredients})
+				}
@@ -28,7 +28,7 @@ ALCH record type.
 
 # stdlib
 from io import BytesIO
-from typing import Iterator, Tuple
+from typing import ClassVar, Iterator, Tuple
 
 # 3rd party
 import attrs
@@ -118,6 +118,9 @@ class ALCH(Record):
 		#: Form ID of a :class:`~.SOUN` record, or null.
 		sound_consume: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (8, 16)
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
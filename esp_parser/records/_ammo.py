@@ -28,7 +28,7 @@ AMMO record type.
 
 # stdlib
 from io import BytesIO
-from typing import Iterator, Tuple
+from typing import ClassVar, Iterator, Tuple
 
 # 3rd party
 import attrs
@@ -136,6 +136,9 @@ class AMMO(Record):
 		consumed_ammo: bytes
 		consumed_percentage: float
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (4, 12)
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -27,19 +27,18 @@ CELL record type.
 #
 
 # stdlib
-import struct
 from io import BytesIO
-from typing import Iterator, List, Tuple, Type
+from typing import Iterator, Tuple
 
 # 3rd party
 import attrs
-from typing_extensions import Self
 
 # this package
 from esp_parser.subrecords import EDID
 from esp_parser.types import (
 		CStringRecord,
 		Float32Record,
+		FormIDArrayRecord,
 		FormIDRecord,
 		Int32Record,
 		Record,
@@ -169,42 +168,13 @@ class CELL(Record):
 		Water noise texture name.
 		"""
 
-	class XCLR(List, RecordType):
+	class XCLR(FormIDArrayRecord):
 		"""
 		Regions.
 
 		Sequence of form IDs (as bytes) for :class:`~.REGN` records.
 		"""
 
-		def __repr__(self) -> str:
-			return f"{self.__class__.__qualname__}({super().__repr__()})"
-
-		@classmethod
-		def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
-			"""
-			Parse this subrecord.
-
-			:param raw_bytes: Raw bytes for this record
-			"""
-
-			size = struct.unpack("<H", raw_bytes.read(2))[0]
-			self = cls()
-			num_form_ids: float = size / 4
-			assert num_form_ids.is_integer()
-			for _ in range(int(num_form_ids)):
-				self.append(raw_bytes.read(4))
-			return self
-
-		def unparse(self) -> bytes:
-			"""
-			Turn this subrecord back into raw bytes for an ESP file.
-			"""
-
-			name = self.__class__.__name__.encode()
-			size = len(self) * 4
-			packed = struct.pack(f"<H", size)
-			return name + packed + b''.join(self)
-
 	class XCIM(FormIDRecord):
 		"""
 		Image Space.
@@ -29,7 +29,7 @@ CREA record type.
 # stdlib
 import struct
 from io import BytesIO
-from typing import Iterator, List, Tuple, Type
+from typing import ClassVar, Iterator, List, Tuple, Type
 
 # 3rd party
 import attrs
@@ -162,6 +162,9 @@ class CREA(Record):
 		rank: int
 		unused: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (0, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -28,7 +28,7 @@ EXPL record type.
 
 # stdlib
 from io import BytesIO
-from typing import Iterator, Tuple
+from typing import ClassVar, Iterator, Tuple
 
 # 3rd party
 import attrs
@@ -92,6 +92,9 @@ class EXPL(Record):
 		radiation_radius: float
 		sound_level: int  # Enum - See https://tes5edit.github.io/fopdoc/Fallout3/Records/EXPL.html
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (12, 16, 28, 32)
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -28,8 +28,12 @@ IMAD record type.
 
 # stdlib
 import struct
+import sys
+from array import array
+from bisect import bisect_right
+from functools import cached_property
 from io import BytesIO
-from typing import Iterator, Tuple
+from typing import ClassVar, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
 
 # 3rd party
 import attrs
@@ -46,6 +50,117 @@ class IMAD(Record):
 	Image Space Adapter.
 	"""
 
+	class Keyframes(RawBytesRecord):
+		"""
+		Base class for arrays of keyframes, each a float32 time followed by one or more float32 values.
+
+		The keyframes are decoded lazily, on first access, and the raw bytes are kept unchanged for unparsing.
+		"""
+
+		#: The number of float32 values in each keyframe, including the time.
+		stride: ClassVar[int] = 2
+
+		@cached_property
+		def _floats(self) -> "array[float]":
+			if len(self) % (self.stride * 4):
+				raise ValueError(f"Size mismatch for {self.__class__.__qualname__}: {len(self)} bytes")
+
+			floats = array('f')
+			floats.frombytes(self)
+			if sys.byteorder == "big":
+				floats.byteswap()
+
+			return floats
+
+		@property
+		def times(self) -> "array[float]":
+			"""
+			The time of each keyframe.
+			"""
+
+			return self._floats[0::self.stride]
+
+		@property
+		def channels(self) -> Tuple["array[float]", ...]:
+			"""
+			The values of each keyframe, with one array per channel.
+			"""
+
+			return tuple(self._floats[idx::self.stride] for idx in range(1, self.stride))
+
+		def sample_channels(self, times: Sequence[float]) -> List[List[float]]:
+			"""
+			Linearly interpolate each channel at the given times.
+
+			Times before the first keyframe or after the last keyframe take the value of that keyframe.
+
+			:param times:
+
+			:returns: A list of sampled values for each channel.
+			"""
+
+			key_times = self.times.tolist()
+			if not key_times:
+				raise ValueError(f"Cannot sample an empty {self.__class__.__qualname__}")
+
+			last = len(key_times) - 1
+			channels = [channel.tolist() for channel in self.channels]
+			sampled: List[List[float]] = [[] for _ in channels]
+
+			for time in times:
+				idx = bisect_right(key_times, time)
+				if idx == 0 or idx > last:
+					key = 0 if idx == 0 else last
+					for values, output in zip(channels, sampled):
+						output.append(values[key])
+				else:
+					start, end = key_times[idx - 1], key_times[idx]
+					frac = (time - start) / (end - start) if end != start else 0.0
+					for values, output in zip(channels, sampled):
+						output.append(values[idx - 1] + (values[idx] - values[idx - 1]) * frac)
+
+			return sampled
+
+	class TimeArray(Keyframes):
+		"""
+		An array of Time structures (a float32 time and a float32 value).
+		"""
+
+		stride = 2
+
+		@property
+		def values(self) -> "array[float]":
+			"""
+			The value of each keyframe.
+			"""
+
+			return self._floats[1::2]
+
+		def sample(self, times: Sequence[float]) -> List[float]:
+			"""
+			Linearly interpolate the value at the given times.
+
+			:param times:
+			"""
+
+			return self.sample_channels(times)[0]
+
+	class ColorArray(Keyframes):
+		"""
+		An array of Color structures (a float32 time and float32 red, green, blue and alpha values).
+		"""
+
+		stride = 5
+
+		def sample(self, times: Sequence[float]) -> List[Tuple[float, ...]]:
+			"""
+			Linearly interpolate the ``(red, green, blue, alpha)`` colour at the given times.
+
+			:param times:
+			"""
+
+			return list(zip(*self.sample_channels(times)))
+
 	@attrs.define
 	class DNAM(StructRecord):
 		"""
@@ -154,116 +269,74 @@ class IMAD(Record):
 					"motion_blur_strength",
 					)
 
-	class BNAM(RawBytesRecord):
+	class BNAM(TimeArray):
 		"""
 		Blur Radius.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class VNAM(RawBytesRecord):
+	class VNAM(TimeArray):
 		"""
 		Double Vision Strength.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class TNAM(RawBytesRecord):
+	class TNAM(ColorArray):
 		"""
 		Tint Color.
-
-		TODO: An array of Color structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class NAM3(RawBytesRecord):
+	class NAM3(ColorArray):
 		"""
 		Fade Color.
-
-		TODO: An array of Color structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class RNAM(RawBytesRecord):
+	class RNAM(TimeArray):
 		"""
 		Radial Blur Strength.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class SNAM(RawBytesRecord):
+	class SNAM(TimeArray):
 		"""
 		Radial Blur Ramp Up.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class UNAM(RawBytesRecord):
+	class UNAM(TimeArray):
 		"""
 		Radial Blur Start.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class NAM1(RawBytesRecord):
+	class NAM1(TimeArray):
 		"""
 		Radial Blur Ramp Down.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class NAM2(RawBytesRecord):
+	class NAM2(TimeArray):
 		"""
 		Radial Blur Down Start.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class WNAM(RawBytesRecord):
+	class WNAM(TimeArray):
 		"""
 		DoF Strength.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class XNAM(RawBytesRecord):
+	class XNAM(TimeArray):
 		"""
 		DoF Distance.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class YNAM(RawBytesRecord):
+	class YNAM(TimeArray):
 		"""
 		DoF Range.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class NAM4(RawBytesRecord):
+	class NAM4(TimeArray):
 		"""
 		Motion Blur Strength.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class x00IAD(RawBytesRecord):
+	class x00IAD(TimeArray):
 		"""
 		HDR Eye Adapt Speed Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -274,12 +347,9 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x00IAD" + size + self
 
-	class x40IAD(RawBytesRecord):
+	class x40IAD(TimeArray):
 		"""
 		HDR Eye Adapt Speed Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -290,12 +360,9 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x40IAD" + size + self
 
-	class x01IAD(RawBytesRecord):
+	class x01IAD(TimeArray):
 		"""
 		HDR Bloom Blur Radius Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -306,20 +373,14 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x01IAD" + size + self
 
-	class AIAD(RawBytesRecord):
+	class AIAD(TimeArray):
 		"""
 		HDR Bloom Blur Radius Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class x02IAD(RawBytesRecord):
+	class x02IAD(TimeArray):
 		"""
 		HDR Bloom Threshold Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -330,20 +391,14 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x02IAD" + size + self
 
-	class BIAD(RawBytesRecord):
+	class BIAD(TimeArray):
 		"""
 		HDR Bloom Threshold Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class x03IAD(RawBytesRecord):
+	class x03IAD(TimeArray):
 		"""
 		HDR Bloom Scale Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -354,20 +409,14 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x03IAD" + size + self
 
-	class CIAD(RawBytesRecord):
+	class CIAD(TimeArray):
 		"""
 		HDR Bloom Scale Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class x04IAD(RawBytesRecord):
+	class x04IAD(TimeArray):
 		"""
 		HDR Target Lum Min Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -378,20 +427,14 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x04IAD" + size + self
 
-	class DIAD(RawBytesRecord):
+	class DIAD(TimeArray):
 		"""
 		HDR Target Lum Min Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class x05IAD(RawBytesRecord):
+	class x05IAD(TimeArray):
 		"""
 		HDR Target Lum Max Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -402,20 +445,14 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x05IAD" + size + self
 
-	class EIAD(RawBytesRecord):
+	class EIAD(TimeArray):
 		"""
 		HDR Target Lum Max Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class x06IAD(RawBytesRecord):
+	class x06IAD(TimeArray):
 		"""
 		HDR Sunlight Scale Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -426,20 +463,14 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x06IAD" + size + self
 
-	class FIAD(RawBytesRecord):
+	class FIAD(TimeArray):
 		"""
 		HDR Sunlight Scale Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class x07IAD(RawBytesRecord):
+	class x07IAD(TimeArray):
 		"""
 		HDR Sky Scale Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -450,12 +481,9 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x07IAD" + size + self
 
-	class GIAD(RawBytesRecord):
+	class GIAD(TimeArray):
 		"""
 		HDR Sky Scale Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 	class x08IAD(RawBytesRecord):
@@ -620,12 +648,9 @@ class IMAD(Record):
 		Unknown.
 		"""
 
-	class x11IAD(RawBytesRecord):
+	class x11IAD(TimeArray):
 		"""
 		Cinematic Saturation Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -636,20 +661,14 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x11IAD" + size + self
 
-	class QIAD(RawBytesRecord):
+	class QIAD(TimeArray):
 		"""
 		Cinematic Saturation Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class x12IAD(RawBytesRecord):
+	class x12IAD(TimeArray):
 		"""
 		Cinematic Brightness Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -660,20 +679,14 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x12IAD" + size + self
 
-	class RIAD(RawBytesRecord):
+	class RIAD(TimeArray):
 		"""
 		Cinematic Brightness Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
-	class x13IAD(RawBytesRecord):
+	class x13IAD(TimeArray):
 		"""
 		Cinematic Contrast Mult.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 		def unparse(self) -> bytes:
@@ -684,12 +697,9 @@ class IMAD(Record):
 			size = struct.pack("<H", len(self))
 			return b"\x13IAD" + size + self
 
-	class SIAD(RawBytesRecord):
+	class SIAD(TimeArray):
 		"""
 		Cinematic Contrast Add.
-
-		TODO: An array of Time structures.
-		https://tes5edit.github.io/fopdoc/Fallout3/Records/IMAD.html
 		"""
 
 	class x14IAD(RawBytesRecord):
@@ -724,6 +734,25 @@ class IMAD(Record):
 		Form ID of a :class:`~.SOUN` record.
 		"""
 
+	def sample(self, times: Iterable[float]) -> Dict[str, Union[List[float], List[Tuple[float, ...]]]]:
+		"""
+		Sample every keyframe array of this image space adapter at the given times.
+
+		:param times:
+
+		:returns: A mapping of subrecord class names to the sampled values.
+		  Empty keyframe arrays are omitted.
+		"""
+
+		times = list(times)
+		sampled: Dict[str, Union[List[float], List[Tuple[float, ...]]]] = {}
+
+		for subrecord in self.data:
+			if isinstance(subrecord, IMAD.Keyframes) and subrecord:
+				sampled[subrecord.__class__.__name__] = subrecord.sample(times)  # type: ignore[attr-defined]
+
+		return sampled
+
 	@classmethod
 	def parse_subrecords(cls, raw_bytes: BytesIO) -> Iterator[RecordType]:
 		"""
@@ -28,7 +28,7 @@ INFO record type.
 
 # stdlib
 from io import BytesIO
-from typing import Iterator, Tuple
+from typing import ClassVar, Iterator, Tuple
 
 # 3rd party
 import attrs
@@ -141,6 +141,9 @@ class INFO(Record):
 		flags: int
 		unused__: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (16, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
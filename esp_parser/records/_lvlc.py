@@ -31,7 +31,8 @@ from io import BytesIO
 from typing import Iterator
 
 # this package
-from esp_parser.subrecords import EDID, OBND
+from esp_parser.records._lvli import LVLI
+from esp_parser.subrecords import EDID, OBND, Item
 from esp_parser.types import Record, RecordType, Uint8Record
 
 __all__ = ["LVLC"]
@@ -58,6 +59,13 @@ class LVLC(Record):
 	#
 	# See below for details.
 
+	class LVLO(LVLI.LVLO):
+		"""
+		Levelled list base data.
+
+		``reference`` is the form ID of a :class:`~.CREA` or :class:`~.LVLC` record.
+		"""
+
 	# Model Data. collection
 	#
 	# https://tes5edit.github.io/fopdoc/FalloutNV/Records/Subrecords/Model.html
@@ -79,7 +87,9 @@ class LVLC(Record):
 				yield EDID.parse(raw_bytes)
 			elif record_type == b"OBND":
 				yield OBND.parse(raw_bytes)
-			elif record_type in {b"LVLD", b"LVLF"}:
+			elif record_type == b"COED":
+				yield Item.COED.parse(raw_bytes)
+			elif record_type in {b"LVLD", b"LVLF", b"LVLO"}:
 				yield getattr(cls, record_type.decode()).parse(raw_bytes)
 			else:
 				raise NotImplementedError(record_type)
@@ -27,8 +27,9 @@ LVLI record type.
 #
 
 # stdlib
+import struct
 from io import BytesIO
-from typing import Iterator, Tuple
+from typing import ClassVar, Iterator, Tuple
 
 # 3rd party
 import attrs
@@ -39,6 +40,8 @@ from esp_parser.types import FormIDRecord, Record, RecordType, StructRecord, Uin
 
 __all__ = ["LVLI"]
 
+_lvlo_struct = struct.Struct("<h2s4sh2s")
+
 
 class LVLI(Record):
 	"""
@@ -88,13 +91,16 @@ class LVLI(Record):
 		count: int
 		unused_: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (4, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
 			Returns the pack/unpack struct string and the corresponding size.
 			"""
 
-			return "<h2s4sh2s", 12
+			return _lvlo_struct.format, _lvlo_struct.size
 
 		@staticmethod
 		def get_field_names() -> Tuple[str, ...]:
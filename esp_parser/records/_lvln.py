@@ -31,7 +31,8 @@ from io import BytesIO
 from typing import Iterator
 
 # this package
-from esp_parser.subrecords import EDID, OBND, Model
+from esp_parser.records._lvli import LVLI
+from esp_parser.subrecords import EDID, OBND, Item, Model
 from esp_parser.types import Record, RecordType, Uint8Record
 
 __all__ = ["LVLN"]
@@ -58,6 +59,13 @@ class LVLN(Record):
 	#
 	# See below for details.
 
+	class LVLO(LVLI.LVLO):
+		"""
+		Levelled list base data.
+
+		``reference`` is the form ID of a :class:`~.NPC_` or :class:`~.LVLN` record.
+		"""
+
 	@classmethod
 	def parse_subrecords(cls, raw_bytes: BytesIO) -> Iterator[RecordType]:
 		"""
@@ -75,7 +83,9 @@ class LVLN(Record):
 				yield EDID.parse(raw_bytes)
 			elif record_type == b"OBND":
 				yield OBND.parse(raw_bytes)
-			elif record_type in {b"LVLD", b"LVLF"}:
+			elif record_type == b"COED":
+				yield Item.COED.parse(raw_bytes)
+			elif record_type in {b"LVLD", b"LVLF", b"LVLO"}:
 				yield getattr(cls, record_type.decode()).parse(raw_bytes)
 			elif record_type in Model.members:
 				yield Model.parse_member(record_type, raw_bytes)
@@ -28,7 +28,7 @@ MGEF record type.
 
 # stdlib
 from io import BytesIO
-from typing import Iterator, Tuple
+from typing import ClassVar, Iterator, Tuple
 
 # 3rd party
 import attrs
@@ -113,6 +113,9 @@ class MGEF(Record):
 		archtype: int  # See https://tes5edit.github.io/fopdoc/Fallout3/Records/MGEF.html
 		actor_value: int
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (8, 24, 32, 36, 40, 44, 48, 52)
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -29,7 +29,7 @@ NAVI record type.
 # stdlib
 import struct
 from io import BytesIO
-from typing import Iterator, List, Type
+from typing import ClassVar, Iterator, List, Tuple, Type
 
 # 3rd party
 import attrs
@@ -68,6 +68,9 @@ class NAVI(Record):
 		grid_y: int
 		unknown_: List[int]
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (4, 8)
+
 		@classmethod
 		def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 			"""
@@ -29,7 +29,7 @@ NAVM record type.
 # stdlib
 import struct
 from io import BytesIO
-from typing import Iterator, List, NamedTuple, Tuple, Type
+from typing import ClassVar, Iterator, List, NamedTuple, Tuple, Type
 
 # 3rd party
 import attrs
@@ -67,6 +67,9 @@ class NAVM(Record):
 		nvca_count: int
 		doors_count: int
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (0, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
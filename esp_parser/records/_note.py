@@ -29,7 +29,7 @@ NOTE record type.
 # stdlib
 import struct
 from io import BytesIO
-from typing import Iterator, Type
+from typing import Iterator, Tuple, Type
 
 # 3rd party
 from typing_extensions import Self
@@ -101,6 +101,16 @@ class NOTE(Record):
 		A text string, or the form ID of a :class:`~.DIAL` record (in which case 4-bytes long).
 		"""
 
+		@staticmethod
+		def get_form_id_offsets(data: bytes) -> Tuple[int, ...]:
+			"""
+			Returns the offsets of form IDs within the subrecord's data.
+
+			:param data: The subrecord's data, without the type and size fields.
+			"""
+
+			return (0, ) if len(data) == 4 else ()
+
 		@classmethod
 		def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 			"""
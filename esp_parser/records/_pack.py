@@ -28,7 +28,7 @@ PACK record type.
 
 # stdlib
 from io import BytesIO
-from typing import Iterator, Tuple
+from typing import ClassVar, Iterator, Tuple
 
 # 3rd party
 import attrs
@@ -113,6 +113,9 @@ class PACK(Record):
 
 		radius: int
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (4, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -170,6 +173,9 @@ class PACK(Record):
 		count_or_distance: int
 		unknown: float
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (4, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -277,6 +283,9 @@ class PACK(Record):
 		#: Four extra bytes at end not shown in fopdoc
 		unknown: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (4, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -28,7 +28,7 @@ PROJ record type.
 
 # stdlib
 from io import BytesIO
-from typing import Iterator, Tuple
+from typing import ClassVar, Iterator, Tuple
 
 # 3rd party
 import attrs
@@ -95,6 +95,9 @@ class PROJ(Record):
 		z_rotation: float
 		bouncy_multiplier: float
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (16, 20, 36, 40, 56, 60, 64)
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
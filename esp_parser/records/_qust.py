@@ -141,6 +141,9 @@ class QUST(Record):
 		flags: int
 		unused: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets = (0, )
+
 		@classmethod
 		def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 			"""
@@ -28,7 +28,7 @@ RCPE record type.
 
 # stdlib
 from io import BytesIO
-from typing import Iterator, Tuple
+from typing import ClassVar, Iterator, Tuple
 
 # 3rd party
 import attrs
@@ -65,6 +65,9 @@ class RCPE(Record):
 		#: Form ID of a :class:`~.RCCT` record.
 		sub_category: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (8, 12)
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -29,7 +29,7 @@ REFR record type.
 # stdlib
 import struct
 from io import BytesIO
-from typing import Iterator, NamedTuple, Tuple, Type
+from typing import ClassVar, Iterator, NamedTuple, Tuple, Type
 
 # 3rd party
 import attrs
@@ -194,6 +194,9 @@ class REFR(Record):
 		zr: float
 		flags: int  # See https://tes5edit.github.io/fopdoc/FalloutNV/Records/REFR.html
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (0, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -256,6 +259,10 @@ class REFR(Record):
 		type: int
 		unused: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		#: Only the 4 byte-long patrol data variant contains a form ID.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (0, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -391,6 +398,9 @@ class REFR(Record):
 		flags: int  # See https://tes5edit.github.io/fopdoc/FalloutNV/Records/REFR.html
 		unknown: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (4, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
@@ -548,6 +558,9 @@ class REFR(Record):
 		navmesh: bytes
 		unknown: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (0, )
+
 		@staticmethod
 		def get_struct_and_size() -> Tuple[str, int]:
 			"""
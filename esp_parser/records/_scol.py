@@ -27,9 +27,25 @@ SCOL record type.
 #
 
 # stdlib
+import math
 import struct
+import sys
+from array import array
 from io import BytesIO
-from typing import Iterator, List, NamedTuple, Type
+from typing import (
+		TYPE_CHECKING,
+		Callable,
+		ClassVar,
+		Iterable,
+		Iterator,
+		List,
+		NamedTuple,
+		Sequence,
+		Tuple,
+		Type,
+		Union,
+		overload
+		)
 
 # 3rd party
 from typing_extensions import Self
@@ -39,6 +55,10 @@ from esp_parser.subrecords import EDID, OBND, Model
 from esp_parser.types import FormIDRecord, Record, RecordType
 from esp_parser.utils import namedtuple_qualname_repr
 
+if TYPE_CHECKING:
+	# this package
+	from esp_parser.group import Group
+
 __all__ = ["SCOL"]
 
 
@@ -83,13 +103,130 @@ class SCOL(Record):
 		def __repr__(self) -> str:
 			return namedtuple_qualname_repr(self)
 
-	class DATA(List[DataItem], RecordType):
+	class DATA(RecordType):
 		"""
 		Placements.
+
+		The placements are stored as a flat float32 :class:`array.array`, seven values per placement
+		(in the order of the fields of :class:`~.SCOL.DataItem`), and are decoded and encoded in a single call.
+		Indexing and iterating yields :class:`~.SCOL.DataItem` objects.
 		"""
 
+		#: The number of float32 values in each placement.
+		stride: ClassVar[int] = 7
+
+		# The methods which modify the placements in place, which shared instances do not allow.
+		_mutators: ClassVar[Tuple[str, ...]] = ("__setitem__", "append", "translate", "rotate", "scale")
+
+		def __init__(self, placements: Iterable[Sequence[float]] = ()):
+			self.placements: "array[float]" = array('f')
+			for placement in placements:
+				self.append(placement)
+
 		def __repr__(self) -> str:
-			return f"{self.__class__.__qualname__}({super().__repr__()})"
+			return f"{self.__class__.__qualname__}({list(self)!r})"
+
+		def __len__(self) -> int:
+			return len(self.placements) // self.stride
+
+		@overload
+		def __getitem__(self, index: int) -> "SCOL.DataItem": ...
+
+		@overload
+		def __getitem__(self, index: slice) -> List["SCOL.DataItem"]: ...
+
+		def __getitem__(self, index: Union[int, slice]) -> Union["SCOL.DataItem", List["SCOL.DataItem"]]:
+			if isinstance(index, slice):
+				return [self[idx] for idx in range(*index.indices(len(self)))]
+
+			if index < 0:
+				index += len(self)
+			if not 0 <= index < len(self):
+				raise IndexError("placement index out of range")
+
+			start = index * self.stride
+			return SCOL.DataItem(*self.placements[start:start + self.stride])
+
+		def __setitem__(self, index: int, placement: Sequence[float]) -> None:
+			if index < 0:
+				index += len(self)
+			if not 0 <= index < len(self):
+				raise IndexError("placement index out of range")
+
+			start = index * self.stride
+			self.placements[start:start + self.stride] = self._to_array(placement)
+
+		def __iter__(self) -> Iterator["SCOL.DataItem"]:
+			for idx in range(len(self)):
+				yield self[idx]
+
+		def __eq__(self, other: object) -> bool:
+			if isinstance(other, SCOL.DATA):
+				return self.placements == other.placements
+			elif isinstance(other, list):
+				return list(self) == other
+
+			return NotImplemented
+
+		def _to_array(self, placement: Sequence[float]) -> "array[float]":
+			if len(placement) != self.stride:
+				raise ValueError(f"Expected {self.stride} values for a placement, got {len(placement)}")
+			return array('f', placement)
+
+		def append(self, placement: Sequence[float]) -> None:
+			"""
+			Add a placement to the end of the collection.
+
+			:param placement: A :class:`~.SCOL.DataItem` or a sequence of seven floats.
+			"""
+
+			self.placements.extend(self._to_array(placement))
+
+		def _map_column(self, column: int, function: Callable[[float], float]) -> None:
+			self.placements[column::self.stride] = array('f', map(function, self.placements[column::self.stride]))
+
+		def translate(self, x: float = 0.0, y: float = 0.0, z: float = 0.0) -> None:
+			"""
+			Move every placement by the given offset.
+
+			:param x:
+			:param y:
+			:param z:
+			"""
+
+			for column, offset in enumerate((x, y, z)):
+				if offset:
+					self._map_column(column, lambda value: value + offset)
+
+		def rotate(self, angle: float) -> None:
+			"""
+			Rotate every placement about the Z axis through the collection's origin.
+
+			As with the placements' own Z rotation, positive angles rotate clockwise when viewed from above.
+
+			:param angle: The angle in radians.
+			"""
+
+			if not angle:
+				return
+
+			cos, sin = math.cos(angle), math.sin(angle)
+			xs, ys = self.placements[0::self.stride], self.placements[1::self.stride]
+			self.placements[0::self.stride] = array('f', [x * cos + y * sin for x, y in zip(xs, ys)])
+			self.placements[1::self.stride] = array('f', [y * cos - x * sin for x, y in zip(xs, ys)])
+			self._map_column(5, lambda value: value + angle)
+
+		def scale(self, factor: float) -> None:
+			"""
+			Scale every placement relative to the collection's origin.
+
+			Both the positions and the per-placement scale are multiplied by ``factor``.
+
+			:param factor:
+			"""
+
+			for column in (0, 1, 2, 6):
+				self._map_column(column, lambda value: value * factor)
 
 		@classmethod
 		def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
@@ -100,12 +237,11 @@ class SCOL(Record):
 			"""
 
 			size = struct.unpack("<H", raw_bytes.read(2))[0]
-			count = size // 28
 			assert not size % 28
 			self = cls()
-			for _ in range(count):
-				buf = BytesIO(raw_bytes.read(28))
-				self.append(SCOL.DataItem.unpack(buf))
+			self.placements.frombytes(raw_bytes.read(size))
+			if sys.byteorder == "big":
+				self.placements.byteswap()
 
 			return self
 
@@ -114,11 +250,42 @@ class SCOL(Record):
 			Turn this subrecord back into raw bytes for an ESP file.
 			"""
 
-			body = b"".join(di.pack() for di in self)
+			placements = self.placements
+			if sys.byteorder == "big":
+				placements = array('f', placements)
+				placements.byteswap()
+
+			body = placements.tobytes()
 			size = struct.pack("<H", len(body))
 
 			return b"DATA" + size + body
 
+	@staticmethod
+	def iter_data(records: Iterable[Union[RecordType, "Group"]]) -> Iterator["SCOL.DATA"]:
+		"""
+		Returns an iterator over the placements of every :class:`~.SCOL` record, recursing into groups.
+
+		Use this to transform every static collection in a plugin, e.g.:
+
+		.. code-block:: python
+
+			for placements in SCOL.iter_data(records):
+				placements.translate(z=128)
+
+		:param records:
+		"""
+
+		# this package
+		from esp_parser.group import Group
+
+		for record in records:
+			if isinstance(record, Group):
+				yield from SCOL.iter_data(record.data)
+			elif isinstance(record, SCOL):
+				for subrecord in record.data:
+					if isinstance(subrecord, SCOL.DATA):
+						yield subrecord
+
 	@classmethod
 	def parse_subrecords(cls, raw_bytes: BytesIO) -> Iterator[RecordType]:
 		"""
@@ -29,7 +29,7 @@ WEAP record type.
 # stdlib
 import struct
 from io import BytesIO
-from typing import Iterator, NamedTuple, Type
+from typing import ClassVar, Iterator, NamedTuple, Tuple, Type
 
 # 3rd party
 import attrs
@@ -600,6 +600,9 @@ class WEAP(Record):
 		#: Form ID of a :class:`~.SPEL` record, or null.s
 		effect: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (12, )
+
 		@classmethod
 		def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 			"""
@@ -642,6 +645,9 @@ class WEAP(Record):
 		mod_required: int  # Enum - see https://tes5edit.github.io/fopdoc/FalloutNV/Records/WEAP.html
 		unused: bytes
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (0, )
+
 		@classmethod
 		def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 			"""
@@ -27,11 +27,13 @@ WRLD record type.
 #
 
 # stdlib
+import math
 import struct
 from io import BytesIO
-from typing import Iterator, NamedTuple, Type
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type, Union
 
 # 3rd party
+import attrs
 from typing_extensions import Self
 
 # this package
@@ -39,8 +41,15 @@ from esp_parser.subrecords import EDID
 from esp_parser.types import CStringRecord, Float32Record, FormIDRecord, Record, RecordType, Uint8Record
 from esp_parser.utils import namedtuple_qualname_repr
 
+if TYPE_CHECKING:
+	# this package
+	from esp_parser.group import Group
+
 __all__ = ["WRLD"]
 
+#: The width of an exterior cell, in game units.
+CELL_SIZE = 4096
+
 
 class WRLD(Record):
 	"""
@@ -306,10 +315,208 @@ class WRLD(Record):
 	# 	https://tes5edit.github.io/fopdoc/FalloutNV/Records/Subrecords/IMPF.html
 	# 	"""
 
-	# class OFST(RecordType):
-	# 	"""
-	# 	Offset Data.
-	# 	"""
+	class OFST(List[int], RecordType):
+		"""
+		Offset Data.
+
+		The offsets of the worldspace's exterior :class:`~.CELL` records, relative to the start of the ``WRLD`` record,
+		for each cell in the grid bounded by :class:`~.WRLD.NAM0` and :class:`~.WRLD.NAM9`, row by row from the south west.
+		Cells which do not exist have an offset of ``0``.
+
+		Use :meth:`WRLD.get_cell_offset` to look up a cell by its grid coordinates.
+		"""
+
+		def __repr__(self) -> str:
+			return f"{self.__class__.__qualname__}({super().__repr__()})"
+
+		@classmethod
+		def parse(cls: Type[Self], raw_bytes: BytesIO, size: Optional[int] = None) -> Self:
+			"""
+			Parse this subrecord.
+
+			:param raw_bytes: Raw bytes for this record
+			:param size: The size of the subrecord, if given by a preceding ``XXXX`` subrecord.
+			"""
+
+			size_field = struct.unpack("<H", raw_bytes.read(2))[0]
+			if size is None:
+				size = size_field
+
+			assert not size % 4
+			return cls(struct.unpack(f"<{size // 4}I", raw_bytes.read(size)))
+
+		def unparse(self) -> bytes:
+			"""
+			Turn this subrecord back into raw bytes for an ESP file.
+			"""
+
+			body = struct.pack(f"<{len(self)}I", *self)
+			if len(body) > 0xffff:
+				return b"XXXX\x04\x00" + struct.pack("<I", len(body)) + b"OFST\x00\x00" + body
+
+			return b"OFST" + struct.pack("<H", len(body)) + body
+
+	def _get_subrecord(self, subrecord_type: type) -> Optional[RecordType]:
+		for subrecord in self.data:
+			# NAM9 is a subclass of NAM0
+			if type(subrecord) is subrecord_type:
+				return subrecord
+
+		return None
+
+	def get_cell_bounds(self) -> Optional[Tuple[int, int, int, int]]:
+		"""
+		Returns the grid coordinates of the cells at the corners of the worldspace.
+
+		:returns: ``(min_x, min_y, max_x, max_y)``, or :py:obj:`None` if the object bounds are not set.
+		"""
+
+		min_bounds = self._get_subrecord(WRLD.NAM0)
+		max_bounds = self._get_subrecord(WRLD.NAM9)
+		if min_bounds is None or max_bounds is None:
+			return None
+
+		assert isinstance(min_bounds, WRLD.NAM0)
+		assert isinstance(max_bounds, WRLD.NAM9)
+		return (
+				math.floor(min_bounds.x / CELL_SIZE),
+				math.floor(min_bounds.y / CELL_SIZE),
+				math.floor(max_bounds.x / CELL_SIZE),
+				math.floor(max_bounds.y / CELL_SIZE),
+				)
+
+	def get_cell_offset(self, x: int, y: int) -> Optional[int]:
+		"""
+		Returns the offset of the exterior cell at the given grid coordinates from the start of this record.
+
+		:param x:
+		:param y:
+
+		:returns: The offset, or :py:obj:`None` if the cell does not exist or the record has no :class:`~.WRLD.OFST`.
+		"""
+
+		offsets = self._get_subrecord(WRLD.OFST)
+		bounds = self.get_cell_bounds()
+		if offsets is None or bounds is None:
+			return None
+
+		min_x, min_y, max_x, max_y = bounds
+		if not (min_x <= x <= max_x and min_y <= y <= max_y):
+			return None
+
+		index = (y - min_y) * (max_x - min_x + 1) + (x - min_x)
+		assert isinstance(offsets, WRLD.OFST)
+		if index >= len(offsets) or not offsets[index]:
+			return None
+
+		return offsets[index]
+
+	def with_offsets(self, children: "Group") -> "WRLD":
+		"""
+		Returns a copy of this record with its :class:`~.WRLD.OFST` regenerated for the cells in ``children``.
+
+		The record is returned unchanged if it has no :class:`~.WRLD.OFST` or its object bounds are not set.
+
+		:param children: The :attr:`~.GroupTypeEnum.WorldChildren` group which follows this record in the ESP file.
+		"""
+
+		cells: Dict[Tuple[int, int], int] = {}
+		_unparse_cells([children], 0, cells, [])
+		return self._with_cell_offsets(cells)
+
+	def _with_cell_offsets(self, cells: Dict[Tuple[int, int], int]) -> "WRLD":
+		# Regenerate the OFST from the offsets of the cells relative to the start of the world's children.
+
+		bounds = self.get_cell_bounds()
+		if bounds is None or self._get_subrecord(WRLD.OFST) is None:
+			return self
+
+		min_x, min_y, max_x, max_y = bounds
+		columns = max_x - min_x + 1
+		offsets = WRLD.OFST([0] * (columns * (max_y - min_y + 1)))
+		data = [offsets if isinstance(subrecord, WRLD.OFST) else subrecord for subrecord in self.data]
+		world = attrs.evolve(self, data=data)
+
+		def fill(size: int) -> None:
+			for (x, y), offset in cells.items():
+				if min_x <= x <= max_x and min_y <= y <= max_y:
+					offsets[(y - min_y) * columns + (x - min_x)] = size + offset
+
+		# The offsets are relative to the start of this record, whose size doesn't depend on the table's values
+		# unless it is compressed, in which case they are filled in again until the size settles.
+		if self.flags & 0x00040000:
+			size, sizes = 0, set()
+			while size not in sizes:
+				sizes.add(size)
+				fill(size)
+				size = len(world.unparse())
+		else:
+			table_size = len(offsets) * 4
+			size = 24 + table_size + (16 if table_size > 0xffff else 6)
+			size += sum(len(subrecord.unparse()) for subrecord in data if subrecord is not offsets)
+			fill(size)
+
+		return world
+
+	@staticmethod
+	def _pair_children(
+			data: Iterable[Union[RecordType, "Group"]],
+			) -> Iterator[Tuple[Union[RecordType, "Group"], Optional["Group"]]]:
+		# Pairs each WRLD record in the contents of a top-level WRLD group with the group of its children.
+
+		previous: Optional[WRLD] = None
+
+		for item in data:
+			if previous is not None:
+				if getattr(item, "label", None) == previous.id:
+					yield previous, item  # type: ignore[misc]
+					previous = None
+					continue
+
+				yield previous, None
+				previous = None
+
+			if isinstance(item, WRLD):
+				previous = item
+			else:
+				yield item, None
+
+		if previous is not None:
+			yield previous, None
+
+	@classmethod
+	def update_offsets(cls, data: Iterable[Union[RecordType, "Group"]]) -> Iterator[Union[RecordType, "Group"]]:
+		"""
+		Regenerate the :class:`~.WRLD.OFST` of each ``WRLD`` record in the contents of a top-level ``WRLD`` group.
+
+		:param data:
+		"""
+
+		for item, children in cls._pair_children(data):
+			if children is None:
+				yield item
+			else:
+				yield item.with_offsets(children)  # type: ignore[union-attr]
+				yield children
+
+	@classmethod
+	def _unparse_worlds(cls, data: Iterable[Union[RecordType, "Group"]]) -> bytes:
+		# Unparse the contents of a top-level WRLD group with regenerated OFSTs,
+		# unparsing each worldspace's children once to both locate its cells and write them.
+
+		chunks: List[bytes] = []
+		for item, children in cls._pair_children(data):
+			if children is None:
+				chunks.append(item.unparse())
+				continue
+
+			children_chunks: List[bytes] = []
+			cells: Dict[Tuple[int, int], int] = {}
+			_unparse_cells([children], 0, cells, children_chunks)
+			chunks.append(item._with_cell_offsets(cells).unparse())  # type: ignore[union-attr]
+			chunks.extend(children_chunks)
+
+		return b"".join(chunks)
 
 	@classmethod
 	def parse_subrecords(cls, raw_bytes: BytesIO) -> Iterator[RecordType]:
@@ -326,6 +533,13 @@ class WRLD(Record):
 
 			if record_type == b"EDID":
 				yield EDID.parse(raw_bytes)
+			elif record_type == b"XXXX":
+				assert raw_bytes.read(2) == b"\x04\x00"  # size field
+				size = struct.unpack("<I", raw_bytes.read(4))[0]
+				record_type = raw_bytes.read(4)
+				if record_type != b"OFST":
+					raise NotImplementedError(record_type)
+				yield cls.OFST.parse(raw_bytes, size)
 			elif record_type in {
 					b"CNAM",
 					b"DATA",
@@ -354,3 +568,39 @@ class WRLD(Record):
 				yield getattr(cls, record_type.decode()).parse(raw_bytes)
 			else:
 				raise NotImplementedError(record_type)
+
+
+def _unparse_cells(
+		items: Iterable[Union[RecordType, "Group"]],
+		position: int,
+		cells: Dict[Tuple[int, int], int],
+		chunks: List[bytes],
+		) -> int:
+	# Appends the raw bytes of ``items``, which start at ``position``, to ``chunks``,
+	# records the offsets of the exterior cells among them, and returns their size.
+
+	# this package
+	from esp_parser.group import Group
+	from esp_parser.records._cell import CELL
+
+	start = position
+	for item in items:
+		if isinstance(item, Group):
+			header_index = len(chunks)
+			chunks.append(b'')
+			group_size = 24 + _unparse_cells(item.data, position + 24, cells, chunks)
+			chunks[header_index] = item._pack_header(group_size)
+			position += group_size
+			continue
+
+		if isinstance(item, CELL):
+			for subrecord in item.data:
+				if isinstance(subrecord, CELL.XCLC):
+					cells[(subrecord.x, subrecord.y)] = position
+					break
+
+		raw = item.unparse()
+		chunks.append(raw)
+		position += len(raw)
+
+	return position - start
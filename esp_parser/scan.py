@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+#
+#  scan.py
+"""
+Low-level scanning of ESP files, without decoding records.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import mmap
+import os
+import struct
+import zlib
+from io import BytesIO
+from typing import Iterator, NamedTuple, Optional, Set, Tuple, Union
+
+# 3rd party
+from domdf_python_tools.typing import PathLike
+
+# this package
+from esp_parser.group import GroupTypeEnum
+from esp_parser.types import RecordType, _fingerprint
+
+__all__ = [
+		"Buffer",
+		"GroupHeader",
+		"RecordHeader",
+		"SubrecordHeader",
+		"first_subrecord",
+		"header_at",
+		"iter_headers",
+		"iter_records",
+		"iter_subrecords",
+		"map_plugin",
+		"parse_record",
+		"record_fingerprint",
+		"record_payload",
+		]
+
+#: Type hint for buffers containing the raw bytes of an ESP file.
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+_record_struct = struct.Struct("<4sII4s")
+_group_struct = struct.Struct("<4sI4si")
+_size_struct = struct.Struct("<H")
+_uint32_struct = struct.Struct("<I")
+
+#: Record types which may appear within the top-level groups of other record types.
+_nested_types = {
+		b"CELL": {b"CELL", b"REFR", b"ACHR", b"ACRE", b"PGRE", b"PMIS", b"NAVM", b"LAND"},
+		b"WRLD": {b"WRLD", b"CELL", b"ROAD", b"REFR", b"ACHR", b"ACRE", b"PGRE", b"PMIS", b"NAVM", b"LAND"},
+		b"DIAL": {b"DIAL", b"INFO"},
+		}
+
+#: Group types whose label is the form ID of a :class:`~.CELL` record.
+_cell_group_types = {
+		GroupTypeEnum.CellChildren,
+		GroupTypeEnum.CellPersistentChildren,
+		GroupTypeEnum.CellTemporaryChildren,
+		GroupTypeEnum.CellVisibleDistantChildren,
+		}
+
+
+class GroupHeader(NamedTuple):
+	"""
+	The header of a group (``GRUP``) in an ESP file.
+	"""
+
+	#: The group label. Depending on ``group_type`` may be a record type, a form ID or an integer.
+	label: bytes
+
+	group_type: GroupTypeEnum
+
+	#: The offset of the group's header within the file.
+	offset: int
+
+	#: The size of the group, including the 24-byte header.
+	size: int
+
+	@property
+	def end(self) -> int:
+		"""
+		The offset of the end of the group within the file.
+		"""
+
+		return self.offset + self.size
+
+
+class RecordHeader(NamedTuple):
+	"""
+	The header of a record in an ESP file.
+	"""
+
+	#: The record type, e.g. ``b"REFR"``.
+	type: bytes
+
+	#: The size of the record's data (the compressed size for compressed records).
+	size: int
+
+	#: Record flags
+	flags: int
+
+	#: 4-byte form ID
+	id: bytes
+
+	#: The offset of the record's header within the file.
+	offset: int
+
+	#: The groups containing the record, outermost first.
+	groups: Tuple[GroupHeader, ...] = ()
+
+	@property
+	def compressed(self) -> bool:
+		"""
+		Whether the record's data is compressed.
+		"""
+
+		return bool(self.flags & 0x00040000)
+
+	@property
+	def data_offset(self) -> int:
+		"""
+		The offset of the record's data within the file.
+		"""
+
+		return self.offset + 24
+
+	@property
+	def end(self) -> int:
+		"""
+		The offset of the end of the record within the file.
+		"""
+
+		return self.offset + 24 + self.size
+
+	def find_group(self, *group_types: GroupTypeEnum) -> Optional[GroupHeader]:
+		"""
+		Returns the innermost group containing this record with one of the given types, or :py:obj:`None`.
+
+		:param \\*group_types:
+		"""
+
+		for group in reversed(self.groups):
+			if group.group_type in group_types:
+				return group
+
+		return None
+
+	@property
+	def cell(self) -> Optional[bytes]:
+		"""
+		The form ID of the :class:`~.CELL` this record is a child of, or :py:obj:`None` if it is not a cell child.
+		"""
+
+		group = self.find_group(*_cell_group_types)
+		return None if group is None else group.label
+
+
+class SubrecordHeader(NamedTuple):
+	"""
+	The location of a subrecord within a record's (decompressed) data.
+	"""
+
+	#: The subrecord type, e.g. ``b"EDID"``.
+	type: bytes
+
+	#: The offset of the subrecord's data (after the size field).
+	offset: int
+
+	#: The size of the subrecord's data.
+	size: int
+
+	@property
+	def end(self) -> int:
+		"""
+		The offset of the end of the subrecord's data.
+		"""
+
+		return self.offset + self.size
+
+
+def map_plugin(filename: PathLike) -> Buffer:
+	"""
+	Memory-map an ESP file for scanning.
+
+	:param filename:
+	"""
+
+	with open(filename, "rb") as fp:
+		if not os.fstat(fp.fileno()).st_size:
+			return b''
+		return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _wanted_top_level(label: bytes, types: Set[bytes]) -> bool:
+	return label in types or not types.isdisjoint(_nested_types.get(label, ()))
+
+
+def iter_headers(
+		buffer: Buffer,
+		types: Optional[Set[bytes]] = None,
+		start: int = 0,
+		end: Optional[int] = None,
+		) -> Iterator[Union[GroupHeader, RecordHeader]]:
+	"""
+	Iterate over the headers of the groups and records in an ESP file, in file order, without decoding the records.
+
+	:param buffer: The raw bytes of the ESP file.
+	:param types: If given, top-level groups which cannot contain records of these types are skipped without being read.
+	:param start: The offset to start scanning from.
+	:param end: The offset to stop scanning at. Defaults to the end of the buffer.
+	"""
+
+	if end is None:
+		end = len(buffer)
+
+	unpack_record = _record_struct.unpack_from
+	unpack_group = _group_struct.unpack_from
+	position = start
+	groups: Tuple[GroupHeader, ...] = ()
+	group_ends: Tuple[int, ...] = ()
+
+	while position < end:
+		while group_ends and position >= group_ends[-1]:
+			groups, group_ends = groups[:-1], group_ends[:-1]
+
+		if buffer[position:position + 4] == b"GRUP":
+			_, size, label, group_type = unpack_group(buffer, position)
+			group = GroupHeader(label, GroupTypeEnum(group_type), position, size)
+			if (
+					types is not None and group.group_type == GroupTypeEnum.TopLevel
+					and not _wanted_top_level(group.label, types)
+					):
+				position += size
+				continue
+
+			yield group
+			groups += (group, )
+			group_ends += (position + size, )
+			position += 24
+		else:
+			signature, size, flags, form_id = unpack_record(buffer, position)
+			if types is None or signature in types:
+				yield RecordHeader(signature, size, flags, form_id, position, groups)
+			position += 24 + size
+
+
+def iter_records(
+		buffer: Buffer,
+		types: Optional[Set[bytes]] = None,
+		start: int = 0,
+		end: Optional[int] = None,
+		) -> Iterator[RecordHeader]:
+	"""
+	Iterate over the headers of the records in an ESP file, without decoding them.
+
+	:param buffer: The raw bytes of the ESP file.
+	:param types: If given, only records of these types are returned,
+		and groups which cannot contain them are skipped without being read.
+	:param start: The offset to start scanning from.
+	:param end: The offset to stop scanning at. Defaults to the end of the buffer.
+	"""
+
+	for header in iter_headers(buffer, types, start, end):
+		if isinstance(header, RecordHeader):
+			yield header
+
+
+def header_at(buffer: Buffer, offset: int) -> RecordHeader:
+	"""
+	Read the header of the record at the given offset, e.g. one stored in an index.
+
+	The returned header's ``groups`` is empty.
+
+	:param buffer: The raw bytes of the ESP file.
+	:param offset:
+	"""
+
+	signature, size, flags, form_id = _record_struct.unpack_from(buffer, offset)
+	if signature == b"GRUP":
+		raise ValueError(f"Expected a record at offset {offset}, found a group")
+
+	return RecordHeader(signature, size, flags, form_id, offset)
+
+
+def record_payload(buffer: Buffer, header: RecordHeader) -> bytes:
+	"""
+	Returns the data of a record (its subrecords), decompressing it if required.
+
+	:param buffer: The raw bytes of the ESP file.
+	:param header:
+	"""
+
+	data = bytes(buffer[header.data_offset:header.end])
+	if header.compressed:
+		decompressed_size = _uint32_struct.unpack_from(data)[0]
+		data = zlib.decompress(data[4:])
+		assert len(data) == decompressed_size
+
+	return data
+
+
+def record_fingerprint(buffer: Buffer, header: RecordHeader) -> bytes:
+	"""
+	Returns the fingerprint of a record, as returned by :meth:`Record.fingerprint() <.Record.fingerprint>`,
+	without parsing the record.
+
+	:param buffer: The raw bytes of the ESP file.
+	:param header:
+	"""
+
+	return _fingerprint(header.type, header.id, header.flags, record_payload(buffer, header))
+
+
+def iter_subrecords(payload: Union[bytes, bytearray, memoryview]) -> Iterator[SubrecordHeader]:
+	"""
+	Iterate over the locations of the subrecords in a record's data, skipping over each subrecord by its size.
+
+	``XXXX`` subrecords, which give the size of subrecords larger than 65535 bytes, are handled transparently.
+
+	:param payload: The record's data, as returned by :func:`~.record_payload`.
+	"""
+
+	unpack_from = _size_struct.unpack_from
+	position = 0
+	end = len(payload)
+	next_size: Optional[int] = None
+
+	while position < end:
+		signature = bytes(payload[position:position + 4])
+		size = unpack_from(payload, position + 4)[0]
+		position += 6
+
+		if signature == b"XXXX":
+			next_size = _uint32_struct.unpack_from(payload, position)[0]
+			position += size
+			continue
+		elif next_size is not None:
+			size, next_size = next_size, None
+
+		yield SubrecordHeader(signature, position, size)
+		position += size
+
+
+def first_subrecord(buffer: Buffer, header: RecordHeader) -> Optional[Tuple[bytes, bytes]]:
+	"""
+	Returns the type and data of a record's first subrecord, or :py:obj:`None` if the record has no subrecords.
+
+	Only the start of the record is read, and compressed records are only decompressed as far as required.
+
+	:param buffer: The raw bytes of the ESP file.
+	:param header:
+	"""
+
+	if not header.size:
+		return None
+
+	if not header.compressed:
+		start = header.data_offset
+		size = _size_struct.unpack_from(buffer, start + 4)[0]
+		return bytes(buffer[start:start + 4]), bytes(buffer[start + 6:min(start + 6 + size, header.end)])
+
+	decompressor = zlib.decompressobj()
+	compressed = bytes(buffer[header.data_offset + 4:header.end])
+	prefix = decompressor.decompress(compressed, 6)
+	if len(prefix) < 6:
+		return None
+
+	size = _size_struct.unpack_from(prefix, 4)[0]
+	data = decompressor.decompress(decompressor.unconsumed_tail, size)
+	return prefix[:4], data
+
+
+def parse_record(buffer: Buffer, header: RecordHeader) -> RecordType:
+	"""
+	Parse a single record located by :func:`~.iter_records`.
+
+	:param buffer: The raw bytes of the ESP file.
+	:param header:
+	"""
+
+	# this package
+	from esp_parser import records
+
+	record_class = getattr(records, header.type.decode(), None)
+	if record_class is None:
+		raise NotImplementedError(header.type)
+
+	return record_class.parse(BytesIO(buffer[header.offset:header.end]))
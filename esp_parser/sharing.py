@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+#
+#  sharing.py
+"""
+Copy-on-write structural sharing between parsed plugins.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import copy
+import hashlib
+import struct
+from io import BytesIO
+from typing import Any, Dict, Iterable, Iterator, List, NoReturn, Tuple, Type, TypeVar, Union
+
+# 3rd party
+import attrs
+
+# this package
+from esp_parser import records
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.types import Record, RecordType
+
+__all__ = ["FrozenList", "SharingPool"]
+
+_T = TypeVar("_T")
+_R = TypeVar("_R", Record, Group)
+_S = TypeVar("_S", bound=RecordType)
+
+
+class FrozenList(List[_T]):
+	"""
+	A list which cannot be modified.
+
+	Used for the ``data`` of records and groups shared by a :class:`~.SharingPool`.
+	Compares equal to a :class:`list` with the same items.
+	"""
+
+	def _immutable(self, *args: Any, **kwargs: Any) -> NoReturn:
+		raise TypeError(f"{self.__class__.__name__} is immutable; use SharingPool.edit() to get a mutable copy.")
+
+	__setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable  # type: ignore[assignment]
+	append = extend = insert = pop = remove = clear = sort = reverse = _immutable  # type: ignore[assignment]
+
+	def __copy__(self) -> List[_T]:
+		return list(self)
+
+	def __deepcopy__(self, memo: Dict[int, Any]) -> List[_T]:
+		return [copy.deepcopy(item, memo) for item in self]
+
+	def __repr__(self) -> str:
+		return list.__repr__(self)
+
+
+def _digest(raw: bytes) -> bytes:
+	return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _immutable_subrecord(self: Any, *args: Any, **kwargs: Any) -> NoReturn:
+	raise TypeError(
+			f"{self.__class__.__qualname__} is shared and immutable; "
+			"use SharingPool.edit_subrecord() to get a mutable copy."
+			)
+
+
+def _frozen_eq(self: Any, other: object) -> bool:
+	# Frozen and mutable subrecords of the same class compare equal when their fields do.
+	cls = self._mutable_class
+	if other.__class__ is not self.__class__ and other.__class__ is not cls:
+		return NotImplemented
+	return all(getattr(self, field.name) == getattr(other, field.name) for field in attrs.fields(cls) if field.eq)
+
+
+def _thaw(subrecord: _S) -> _S:
+	# Returns a mutable copy of a frozen subrecord, as an instance of the original class.
+	cls = subrecord._mutable_class  # type: ignore[attr-defined]
+
+	if attrs.has(cls):
+		clone = cls.__new__(cls)
+		for field in attrs.fields(cls):
+			object.__setattr__(clone, field.name, getattr(subrecord, field.name))
+		return clone
+
+	if isinstance(subrecord, list):
+		return cls(subrecord)
+
+	clone = cls.__new__(cls)
+	clone.__dict__.update(copy.deepcopy(vars(subrecord)))
+	return clone
+
+
+def _thaw_deep(subrecord: _S, memo: Dict[int, Any]) -> _S:
+	return copy.deepcopy(_thaw(subrecord), memo)
+
+
+_frozen_classes: Dict[type, type] = {}
+
+_list_mutators = (
+		"__setitem__",
+		"__delitem__",
+		"__iadd__",
+		"__imul__",
+		"append",
+		"extend",
+		"insert",
+		"pop",
+		"remove",
+		"clear",
+		"sort",
+		"reverse",
+		)
+
+
+def _frozen_class(cls: type) -> type:
+	# A subclass of a mutable subrecord class whose instances cannot be modified.
+	# It has the same name and qualname, so unparse() and pickling are unaffected.
+
+	if cls not in _frozen_classes:
+		namespace: Dict[str, Any] = {
+				"__slots__": (),
+				"__module__": cls.__module__,
+				"__qualname__": cls.__qualname__,
+				"__copy__": _thaw,
+				"__deepcopy__": _thaw_deep,
+				"_mutable_class": cls,
+				}
+
+		if issubclass(cls, list):
+			namespace.update(dict.fromkeys(_list_mutators, _immutable_subrecord))
+		else:
+			# Classes with methods which modify them in place list those methods in ``_mutators``.
+			namespace["__setattr__"] = namespace["__delattr__"] = _immutable_subrecord
+			namespace.update(dict.fromkeys(getattr(cls, "_mutators", ()), _immutable_subrecord))
+			if attrs.has(cls):
+				namespace["__eq__"] = _frozen_eq
+
+		_frozen_classes[cls] = type(cls.__name__, (cls, ), namespace)
+
+	return _frozen_classes[cls]
+
+
+# Subrecords of these types are immutable values, and are shared as they are.
+_immutable_types = (bytes, str, int, float, tuple, frozenset)
+
+
+def _freeze(subrecord: RecordType) -> RecordType:
+	# Make a subrecord which is about to be shared immutable, in place.
+	if not isinstance(subrecord, _immutable_types):
+		subrecord.__class__ = _frozen_class(subrecord.__class__)
+	return subrecord
+
+
+class SharingPool:
+	"""
+	Parses ESP files such that identical records, groups and subrecords are represented by the same objects.
+
+	Records and groups parsed from identical bytes (detected by a hash of the raw bytes) are reused,
+	as are identical subrecords within otherwise different records.
+	When parsing many revisions of a plugin, or several plugins which override the same forms,
+	memory therefore grows with the number of distinct records rather than with the total size of the files.
+
+	Objects returned by the pool are shared and must be treated as immutable.
+	The ``data`` of shared records and groups is a :class:`~.FrozenList`, which raises :exc:`TypeError` if modified,
+	as do shared subrecords with attributes or items which could otherwise be modified in place.
+	Use :meth:`~.SharingPool.edit` and :meth:`~.SharingPool.edit_subrecord` to get copies to modify;
+	only the record and the touched subrecords are copied.
+	"""
+
+	def __init__(self) -> None:
+		self._groups: Dict[bytes, Group] = {}
+		self._records: Dict[bytes, Record] = {}
+		self._subrecords: Dict[Tuple[type, bytes], RecordType] = {}
+
+	def __len__(self) -> int:
+		"""
+		The number of distinct records in the pool.
+		"""
+
+		return len(self._records)
+
+	@property
+	def num_subrecords(self) -> int:
+		"""
+		The number of distinct subrecords in the pool.
+		"""
+
+		return len(self._subrecords)
+
+	def clear(self) -> None:
+		"""
+		Forget all shared objects.
+
+		Objects already returned by the pool are unaffected.
+		"""
+
+		self._groups.clear()
+		self._records.clear()
+		self._subrecords.clear()
+
+	def parse_esp(self, raw_bytes: BytesIO) -> Iterator[Union[RecordType, Group]]:
+		"""
+		Recursively parse an ESP file, sharing objects with previously parsed files.
+
+		:param raw_bytes:
+		"""
+
+		while True:
+			record_type = raw_bytes.read(4)
+			if not record_type:
+				break
+
+			header = raw_bytes.read(20)
+			size = struct.unpack_from("<I", header)[0]
+
+			if record_type == b"GRUP":
+				yield self._parse_group(header, raw_bytes.read(size - 24))
+			else:
+				yield self._parse_record(record_type, header, raw_bytes.read(size))
+
+	def _parse_group(self, header: bytes, body: bytes) -> Group:
+		key = _digest(header + body)
+		if key in self._groups:
+			return self._groups[key]
+
+		label, group_type, stamp, unknown = struct.unpack("<4sIH6s", header[4:])
+		group = Group(
+				label,
+				GroupTypeEnum(group_type),
+				stamp,
+				unknown,
+				data=FrozenList(self.parse_esp(BytesIO(body))),
+				)
+		self._groups[key] = group
+		return group
+
+	def _parse_record(self, record_type: bytes, header: bytes, body: bytes) -> Record:
+		key = _digest(record_type + header + body)
+		if key in self._records:
+			return self._records[key]
+
+		record_class: Type[Record] = getattr(records, record_type.decode(), None)  # type: ignore[assignment]
+		if record_class is None:
+			raise NotImplementedError(record_type)
+
+		record = record_class.parse(BytesIO(record_type + header + body))
+		record.data = FrozenList(self._share_subrecords(record.data))
+		self._records[key] = record
+		return record
+
+	def _share_subrecords(self, subrecords: Iterable[RecordType]) -> Iterator[RecordType]:
+		for subrecord in subrecords:
+			key = (subrecord.__class__, _digest(subrecord.unparse()))
+			if key not in self._subrecords:
+				self._subrecords[key] = _freeze(subrecord)
+			yield self._subrecords[key]
+
+	@staticmethod
+	def edit(obj: _R) -> _R:
+		"""
+		Returns a copy of the record or group whose ``data`` list can be modified.
+
+		The subrecords (or the records in a group) are not copied.
+
+		:param obj:
+		"""
+
+		return attrs.evolve(obj, data=list(obj.data))  # type: ignore[misc]
+
+	@staticmethod
+	def edit_subrecord(record: Record, index: int) -> RecordType:
+		"""
+		Replace the subrecord at ``index`` with a copy which can be modified, and return it.
+
+		Subrecords which are immutable values (such as :class:`~.CStringRecord` and :class:`~.Uint32Record`)
+		are returned unchanged, and should be replaced rather than modified.
+
+		:param record: A record returned by :meth:`~.SharingPool.edit`.
+		:param index:
+		"""
+
+		subrecord = record.data[index]
+		if hasattr(subrecord, "_mutable_class"):
+			subrecord = _thaw(subrecord)
+			record.data[index] = subrecord
+		return subrecord
@@ -29,7 +29,7 @@ Subrecord types used by multiple records.
 # stdlib
 import struct
 from io import BytesIO
-from typing import List, NamedTuple, Tuple, Type
+from typing import ClassVar, List, NamedTuple, Tuple, Type
 
 # 3rd party
 import attrs
@@ -81,6 +81,26 @@ class EDID(CStringRecord):
 	"""
 
 
+# ``run_on`` is read as big-endian, for compatibility with existing data.
+_ctda_struct = struct.Struct("<B3s4sI4s4s4s4s")
+
+# The offsets of the parameters of condition functions which are form IDs, by function index.
+# Other parameters are integers (e.g. actor values, axes and stages), or unused.
+# See https://tes5edit.github.io/fopdoc/Fallout3/Records/Subrecords/CTDA.html
+_ctda_form_id_params = {
+		**dict.fromkeys(
+				(
+						1, 27, 32, 42, 43, 44, 45, 47, 53, 56, 58, 59, 66, 67, 68, 69, 71, 72, 73, 74, 76, 79, 84, 99,
+						122, 129, 130, 132, 136, 149, 161, 162, 163, 172, 180, 182, 193, 195, 197, 199, 214, 223, 228,
+						246, 278, 310, 370, 372, 382, 399, 409, 410, 420, 421, 427, 446, 449, 450, 451, 464, 478, 515,
+						518, 519, 520, 521, 525, 526, 527, 528, 546, 555, 573, 574, 575, 607, 610, 612, 614,
+						),
+				(12, ),
+				),
+		**dict.fromkeys((60, 230, 280, 411), (12, 16)),
+		}
+
+
 @attrs.define
 class CTDA(RecordType):
 	"""
@@ -113,6 +133,31 @@ class CTDA(RecordType):
 
 	# Also refers to :class:`~.PLYR` which doesn't exist.
 
+	@staticmethod
+	def get_form_id_offsets(data: bytes) -> Tuple[int, ...]:
+		"""
+		Returns the offsets of form IDs within the subrecord's data.
+
+		The comparison value is the form ID of a :class:`~.GLOB` record if :attr:`~.CTDA.type` has the
+		"use global" flag, the parameters are form IDs for functions which take forms
+		(e.g. ``GetIsID`` but not ``GetActorValue``), and the reference is only used
+		when the condition is run on a reference.
+
+		:param data: The subrecord's data, without the type and size fields.
+		"""
+
+		offsets = []
+		if data[0] & 0x04:
+			offsets.append(4)
+
+		function = struct.unpack_from("<H", data, 8)[0]
+		offsets.extend(_ctda_form_id_params.get(function, ()))
+
+		if len(data) >= 28 and struct.unpack_from("<I", data, 20)[0] == 2:
+			offsets.append(24)
+
+		return tuple(offsets)
+
 	@classmethod
 	def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 		"""
@@ -122,33 +167,25 @@ class CTDA(RecordType):
 		"""
 
 		assert raw_bytes.read(2) == b"\x1c\x00"  # size field
-		return cls(
-				type=struct.unpack(">B", raw_bytes.read(1))[0],
-				unused=raw_bytes.read(3),
-				comparison_value=raw_bytes.read(4),
-				function=struct.unpack("<I", raw_bytes.read(4))[0],
-				param1=raw_bytes.read(4),
-				param2=raw_bytes.read(4),
-				run_on=struct.unpack(">I", raw_bytes.read(4))[0],
-				reference=raw_bytes.read(4),
-				)
+		unpacked = _ctda_struct.unpack(raw_bytes.read(28))
+		run_on = int.from_bytes(unpacked[6], "big")
+		return cls(*unpacked[:6], run_on, unpacked[7])
 
 	def unparse(self) -> bytes:
 		"""
 		Turn this subrecord back into raw bytes for an ESP file.
 		"""
 
-		return b"".join([
-				b"CTDA\x1c\x00",
-				struct.pack(">B", self.type),
+		return b"CTDA\x1c\x00" + _ctda_struct.pack(
+				self.type,
 				self.unused,
 				self.comparison_value,
-				struct.pack("<I", self.function),
+				self.function,
 				self.param1,
 				self.param2,
-				struct.pack(">I", self.run_on),
+				self.run_on.to_bytes(4, "big"),
 				self.reference,
-				])
+				)
 
 
 class Model(Collection):
@@ -193,7 +230,8 @@ class Model(Collection):
 		"""
 
 	class MODB(FormIDRecord):  # noqa: D106  # TODO
-		pass
+		# Not actually a form ID.
+		form_id_offsets = ()
 
 	class MODT(List[int], RecordType):
 		"""
@@ -279,6 +317,23 @@ class Model(Collection):
 		List of alternate textures.
 		"""
 
+		@staticmethod
+		def get_form_id_offsets(data: bytes) -> List[int]:
+			"""
+			Returns the offsets of the :class:`~.TXST` form IDs within the subrecord's data.
+
+			:param data: The subrecord's data, without the type and size fields.
+			"""
+
+			offsets = []
+			position = 4  # count
+			for _ in range(struct.unpack_from("<I", data)[0]):
+				position += 4 + struct.unpack_from("<I", data, position)[0]  # name length and name
+				offsets.append(position)
+				position += 8  # texture and index
+
+			return offsets
+
 		def __repr__(self) -> str:
 			return f"{self.__class__.__qualname__}({super().__repr__()})"
 
@@ -739,6 +794,10 @@ class AIDT(RecordType):
 		return b"AIDT\x14\x00" + packed
 
 
+_cnto_struct = struct.Struct("<4si")
+_coed_struct = struct.Struct("<4s4sf")
+
+
 class Item(Collection):
 	"""
 	Subrecords for items.
@@ -762,6 +821,9 @@ class Item(Collection):
 
 		item_count: int
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets = (0, )
+
 		@classmethod
 		def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 			"""
@@ -771,14 +833,14 @@ class Item(Collection):
 			"""
 
 			assert raw_bytes.read(2) == b"\x08\x00"  # size field
-			return cls(*struct.unpack("<4si", raw_bytes.read(8)))
+			return cls(*_cnto_struct.unpack(raw_bytes.read(8)))
 
 		def unparse(self) -> bytes:
 			"""
 			Turn this subrecord back into raw bytes for an ESP file.
 			"""
 
-			return b"CNTO\x08\x00" + struct.pack("<4si", *self)
+			return b"CNTO\x08\x00" + _cnto_struct.pack(*self)
 
 		def __repr__(self) -> str:
 			return namedtuple_qualname_repr(self)
@@ -804,6 +866,9 @@ class Item(Collection):
 
 		condition: float
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets = (0, )
+
 		@classmethod
 		def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 			"""
@@ -813,14 +878,14 @@ class Item(Collection):
 			"""
 
 			assert raw_bytes.read(2) == b"\x0c\x00"  # size field
-			return cls(*struct.unpack("<4s4sf", raw_bytes.read(12)))
+			return cls(*_coed_struct.unpack(raw_bytes.read(12)))
 
 		def unparse(self) -> bytes:
 			"""
 			Turn this subrecord back into raw bytes for an ESP file.
 			"""
 
-			return b"COED\x0c\x00" + struct.pack("<4s4sf", *self)
+			return b"COED\x0c\x00" + _coed_struct.pack(*self)
 
 		def __repr__(self) -> str:
 			return namedtuple_qualname_repr(self)
@@ -883,6 +948,9 @@ class XnamCombatReactionEnum(IntEnum):
 	Friend = 3
 
 
+_xnam_struct = struct.Struct("<4siI")
+
+
 @attrs.define
 class XNAM(RecordType):
 	"""
@@ -896,6 +964,9 @@ class XNAM(RecordType):
 
 	group_combat_reaction: XnamCombatReactionEnum
 
+	#: The offsets of form IDs within the subrecord's data.
+	form_id_offsets: ClassVar[Tuple[int, ...]] = (0, )
+
 	@classmethod
 	def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 		"""
@@ -905,14 +976,14 @@ class XNAM(RecordType):
 		"""
 
 		assert raw_bytes.read(2) == b"\x0c\x00"  # size field
-		return cls(*struct.unpack("<4siI", raw_bytes.read(12)))
+		return cls(*_xnam_struct.unpack(raw_bytes.read(12)))
 
 	def unparse(self) -> bytes:
 		"""
 		Turn this subrecord back into raw bytes for an ESP file.
 		"""
 
-		return b"XNAM\x0c\x00" + struct.pack("<4siI", self.faction, self.modifier, self.group_combat_reaction)
+		return b"XNAM\x0c\x00" + _xnam_struct.pack(self.faction, self.modifier, self.group_combat_reaction)
 
 
 class DialType(IntEnum):
@@ -1007,6 +1078,9 @@ class Destruction(Collection):
 
 		debris_count: int
 
+		#: The offsets of form IDs within the subrecord's data.
+		form_id_offsets: ClassVar[Tuple[int, ...]] = (8, 12)
+
 		@classmethod
 		def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 			"""
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+#
+#  transfer.py
+"""
+Cheap transfer of parsed records between processes.
+"""
+#
+#  Copyright © 2024 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from array import array
+from io import BytesIO
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union, overload
+
+# 3rd party
+from typing_extensions import Self
+
+# this package
+from esp_parser import parse_esp
+from esp_parser.group import Group
+from esp_parser.types import RecordType
+
+__all__ = ["RecordBatch"]
+
+
+class RecordBatch:
+	"""
+	A sequence of records and groups stored as their concatenated raw bytes.
+
+	A batch pickles as a single :class:`bytes` object plus an array of offsets,
+	so sending it to another process costs little more than the size of the records in the ESP file.
+	Records are parsed lazily, the first time each one is accessed, and then cached.
+
+	.. code-block:: python
+
+		batch = RecordBatch.from_records(records)
+		pool.map(worker, [batch])  # or queue.put(batch), etc.
+
+	:param raw: The concatenated raw bytes of the records.
+	:param offsets: The offset of each record within ``raw``, followed by ``len(raw)``.
+	"""
+
+	def __init__(self, raw: bytes, offsets: "array[int]"):
+		self.raw: bytes = raw
+		self.offsets: "array[int]" = offsets
+		self._cache: Dict[int, Union[RecordType, Group]] = {}
+
+	@classmethod
+	def from_records(cls: Type[Self], records: Iterable[Union[RecordType, Group]]) -> Self:
+		"""
+		Create a batch from parsed records and groups.
+
+		:param records:
+		"""
+
+		chunks: List[bytes] = []
+		offsets = array('Q', [0])
+		for record in records:
+			chunk = record.unparse()
+			chunks.append(chunk)
+			offsets.append(offsets[-1] + len(chunk))
+
+		return cls(b"".join(chunks), offsets)
+
+	@classmethod
+	def from_bytes(cls: Type[Self], raw: bytes, offsets: Iterable[int]) -> Self:
+		"""
+		Create a batch from the raw bytes of records, without parsing them.
+
+		:param raw: The concatenated raw bytes of the records, e.g. a slice of an ESP file.
+		:param offsets: The offset of each record within ``raw``.
+		"""
+
+		return cls(raw, array('Q', [*offsets, len(raw)]))
+
+	def __reduce__(self) -> Tuple[Type["RecordBatch"], Tuple[bytes, "array[int]"]]:
+		return self.__class__, (self.raw, self.offsets)
+
+	def __len__(self) -> int:
+		return len(self.offsets) - 1
+
+	@overload
+	def __getitem__(self, index: int) -> Union[RecordType, Group]: ...
+
+	@overload
+	def __getitem__(self, index: slice) -> List[Union[RecordType, Group]]: ...
+
+	def __getitem__(
+			self,
+			index: Union[int, slice],
+			) -> Union[RecordType, Group, List[Union[RecordType, Group]]]:
+		if isinstance(index, slice):
+			return [self[idx] for idx in range(*index.indices(len(self)))]
+
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError("record index out of range")
+
+		record: Optional[Union[RecordType, Group]] = self._cache.get(index)
+		if record is None:
+			raw = self.raw[self.offsets[index]:self.offsets[index + 1]]
+			record = self._cache[index] = next(parse_esp(BytesIO(raw)))
+
+		return record
+
+	def __iter__(self) -> Iterator[Union[RecordType, Group]]:
+		for idx in range(len(self)):
+			yield self[idx]
+
+	def raw_record(self, index: int) -> bytes:
+		"""
+		Returns the raw bytes of the record at ``index``, without parsing it.
+
+		:param index:
+		"""
+
+		return self.raw[self.offsets[index]:self.offsets[index + 1]]
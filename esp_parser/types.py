@@ -27,12 +27,30 @@ Shared base types.
 #
 
 # stdlib
+import copy
 import enum
+import hashlib
+import importlib
 import struct
 import zlib
 from abc import abstractmethod
 from io import BytesIO
-from typing import TYPE_CHECKING, Iterator, List, Protocol, Set, Tuple, Type, Union
+from typing import (
+		TYPE_CHECKING,
+		Any,
+		Callable,
+		ClassVar,
+		Dict,
+		Iterator,
+		List,
+		Optional,
+		Protocol,
+		Set,
+		Tuple,
+		Type,
+		TypeVar,
+		Union
+		)
 
 # 3rd party
 import attrs
@@ -64,6 +82,70 @@ __all__ = [
 
 _cov_instantiated_objects: Set[str] = set()
 
+_RT = TypeVar("_RT", bound="RecordType")
+
+# A record's type, flags, form ID, revision, form version and unknown field, as pickled.
+_pickle_header_struct = struct.Struct("<4sI4sIH2s")
+
+# Record flag for compressed data, which does not affect a record's fingerprint.
+_COMPRESSED = 0x00040000
+
+
+def _fingerprint(record_type: bytes, form_id: bytes, flags: int, payload: bytes) -> bytes:
+	# The digest returned by Record.fingerprint(), from the record's header fields and decompressed data.
+
+	digest = hashlib.blake2b(record_type, digest_size=16)
+	digest.update(form_id)
+	digest.update(struct.pack("<I", flags & ~_COMPRESSED))
+	digest.update(payload)
+	return digest.digest()
+
+
+def _unpickle_record(header: bytes, payload: bytes) -> "Record":
+	# Rebuild a record from its packed header fields and uncompressed subrecord data.
+	# The subrecords are parsed from the data when first accessed.
+
+	# this package
+	from esp_parser import records
+
+	record_type, *fields = _pickle_header_struct.unpack(header)
+	record_class: Type[Record] = getattr(records, record_type.decode())
+	record = record_class.__new__(record_class)
+	record.flags, record.id, record.revision, record.version, record.unknown = fields
+	record._payload = payload
+	record._parsed_data = None
+	return record
+
+
+def _unpickle_subrecord(module: str, qualname: str, raw: bytes) -> "RecordType":
+	# Rebuild a subrecord from its unparsed bytes; nested classes are looked up by their qualname.
+
+	obj: Any = importlib.import_module(module)
+	for name in qualname.split('.'):
+		obj = getattr(obj, name)
+
+	return obj.parse(BytesIO(raw[4:]))
+
+
+def _copy_subrecord(subrecord: _RT, memo: Optional[Dict[int, Any]]) -> _RT:
+	# Copy a subrecord directly, rather than by the round trip through unparse() and parse() made for pickling.
+	# Makes a deep copy if ``memo`` is given.
+
+	cls = subrecord.__class__
+
+	if attrs.has(cls):
+		clone = cls.__new__(cls)
+		for field in attrs.fields(cls):
+			value = getattr(subrecord, field.name)
+			object.__setattr__(clone, field.name, value if memo is None else copy.deepcopy(value, memo))
+		return clone
+
+	if isinstance(subrecord, list):
+		return cls(subrecord if memo is None else (copy.deepcopy(item, memo) for item in subrecord))
+
+	# bytes, str and numbers are immutable.
+	return subrecord
+
 
 class RecordType(Protocol):
 	"""
@@ -73,6 +155,17 @@ class RecordType(Protocol):
 	def __repr__(self) -> str:
 		return f"{self.__class__.__qualname__}({super().__repr__()})"
 
+	def __reduce__(self) -> Tuple[Callable[..., "RecordType"], Tuple[Any, ...]]:
+		# Subrecords are pickled as their unparsed bytes and class, which is much smaller than their attributes.
+		cls = self.__class__
+		return _unpickle_subrecord, (cls.__module__, cls.__qualname__, self.unparse())
+
+	def __copy__(self) -> Self:
+		return _copy_subrecord(self, None)
+
+	def __deepcopy__(self, memo: Dict[int, Any]) -> Self:
+		return _copy_subrecord(self, memo)
+
 	@abstractmethod
 	def unparse(self) -> bytes:
 		"""
@@ -164,6 +257,12 @@ class Record(RecordType):
 	#: Subrecords of this record.
 	data: List[RecordType] = attrs.field(factory=list)
 
+	# The uncompressed data of a parsed or unpickled record, until its subrecords are first accessed.
+	_payload: Optional[bytes] = attrs.field(default=None, init=False, repr=False, eq=False)
+
+	# The subrecords of a parsed record, until they are first accessed.
+	_parsed_data: Optional[List[RecordType]] = attrs.field(default=None, init=False, repr=False, eq=False)
+
 	@staticmethod
 	def parse_subrecords(raw_bytes: BytesIO) -> Iterator[RecordType]:
 		"""
@@ -205,17 +304,39 @@ class Record(RecordType):
 			assert len(decompressed_data) == decompressed_size
 			raw_data = BytesIO(decompressed_data)
 
-		data = list(cls.parse_subrecords(raw_data))
-
-		return cls(
+		record = cls(
 				flags=flags,
 				id=form_id,
 				revision=revision,
 				version=version,
 				unknown=unknown,
-				data=data,
 				)
 
+		# Until the subrecords are accessed they cannot have been modified,
+		# so the fingerprint can be computed from the raw bytes.
+		record._payload = raw_data.getvalue()
+		record._parsed_data = list(cls.parse_subrecords(raw_data))
+		_record_data.__delete__(record)
+		return record
+
+	def fingerprint(self) -> bytes:
+		"""
+		Returns a 16-byte BLAKE2 digest of the record's type, form ID, flags and subrecords.
+
+		Records with the same content have the same fingerprint, whether or not they are compressed.
+		The revision and form version are not included.
+
+		For a parsed record whose subrecords have not been accessed through :attr:`~.Record.data`,
+		the fingerprint is computed from the raw bytes. Otherwise it is computed from the subrecords'
+		:meth:`~.RecordType.unparse` each time, so reflects any changes made to them.
+		For records in ESP files, :func:`~.record_fingerprint` returns the same digest without parsing them.
+		"""
+
+		payload = self._unparsed_payload()
+		if payload is None:
+			payload = b"".join(subrecord.unparse() for subrecord in self.data)
+		return _fingerprint(self.__class__.__name__.encode(), self.id, self.flags, payload)
+
 	def unparse(self) -> bytes:
 		"""
 		Turn this record back into raw bytes for an ESP file.
@@ -242,6 +363,59 @@ class Record(RecordType):
 		record_type = self.__class__.__name__.encode()
 		return record_type + packed + body
 
+	if not TYPE_CHECKING:
+
+		def __getattr__(self, name: str) -> Any:
+			# Only called when the attribute is unset: hand over the subrecords of a parsed record,
+			# or parse those of an unpickled record, on first access.
+			if name == "data" and self._parsed_data is not None:
+				self.data, self._parsed_data, self._payload = self._parsed_data, None, None
+				return self.data
+			elif name == "data" and self._payload is not None:
+				self.data = list(self.parse_subrecords(BytesIO(self._payload)))
+				self._payload = None
+				return self.data
+
+			raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {name!r}")
+
+	def _unparsed_payload(self) -> Optional[bytes]:
+		# The uncompressed data of a record whose subrecords have not been accessed (or replaced).
+		if self._payload is not None:
+			try:
+				_record_data.__get__(self)
+			except AttributeError:
+				return self._payload
+
+		return None
+
+	def _pickle_header(self) -> bytes:
+		record_type = self.__class__.__name__.encode()
+		return _pickle_header_struct.pack(record_type, self.flags, self.id, self.revision, self.version, self.unknown)
+
+	def __reduce__(self) -> Tuple[Callable[..., RecordType], Tuple[Any, ...]]:
+		# Records are pickled as their header fields and uncompressed data, which is parsed lazily when unpickled.
+		payload = self._unparsed_payload()
+		if payload is None:
+			payload = b"".join(subrecord.unparse() for subrecord in self.data)
+
+		return _unpickle_record, (self._pickle_header(), payload)
+
+	def __copy__(self) -> Self:
+		# A shallow copy shares the subrecords, so they are handed over from a parsed record.
+		payload = self._unparsed_payload()
+		if payload is not None and self._parsed_data is None:
+			return _unpickle_record(self._pickle_header(), payload)  # type: ignore[return-value]
+		return attrs.evolve(self)
+
+	def __deepcopy__(self, memo: Dict[int, Any]) -> Self:
+		if self._unparsed_payload() is not None:
+			return self.__copy__()
+		return attrs.evolve(self, data=copy.deepcopy(self.data, memo))
+
+
+# The slot holding Record.data, which is unset for unpickled records until first accessed.
+_record_data = Record.data
+
 
 class BytesRecordType(RecordType, bytes):
 	"""
@@ -262,6 +436,9 @@ class FormIDRecord(BytesRecordType):
 	Base class for 4-byte long form ID subrecord types.
 	"""
 
+	#: The offsets of form IDs within the subrecord's data.
+	form_id_offsets: ClassVar[Tuple[int, ...]] = (0, )
+
 	@classmethod
 	def parse(cls: Type[Self], raw_bytes: BytesIO) -> Self:
 		"""
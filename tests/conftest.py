@@ -1,5 +1,76 @@
+# stdlib
+from typing import Callable, Iterable, Mapping, Sequence, Union
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.types import Record
+from esp_parser.utils import TES4_0_94, create_tes4
+
 pytest_plugins = ("coincidence", )
 
+_Contents = Mapping[bytes, Sequence[Union[Record, Group]]]
+
+
+def _count_records(items: Iterable[Union[Record, Group]]) -> int:
+	return sum(_count_records(item.data) if isinstance(item, Group) else 1 for item in items)
+
+
+def build_plugin(
+		contents: _Contents,
+		masters: Sequence[str] = (),
+		next_object_id: bytes = b'\x00\x08\x00\x00',
+		) -> bytes:
+	"""
+	Returns the raw bytes of a plugin.
+
+	:param contents: Mapping of record types to the records (and groups) in the top-level group for that type.
+	:param masters: The plugin's masters.
+	:param next_object_id:
+	"""
+
+	num_records = sum(_count_records(records) for records in contents.values())
+	tes4 = create_tes4(TES4_0_94, num_records, next_object_id, masters=masters)
+	groups = (Group(label, GroupTypeEnum.TopLevel, 0, data=list(records)) for label, records in contents.items())
+	return tes4.unparse() + b"".join(group.unparse() for group in groups)
+
+
+# Form IDs of records in ``FalloutNV.esm``.
+
+
+@pytest.fixture()
+def stimpak() -> bytes:
+	return b'iQ\x01\x00'
+
+
+@pytest.fixture()
+def radaway() -> bytes:
+	return b'jQ\x01\x00'
+
+
+@pytest.fixture()
+def caps() -> bytes:
+	return b'\x0f\x00\x00\x00'
+
+
+@pytest.fixture()
+def make_plugin() -> Callable[..., bytes]:
+	return build_plugin
+
+
+@pytest.fixture()
+def write_plugin(tmp_pathplus: PathPlus) -> Callable[..., PathPlus]:
+
+	def write_plugin(filename: str, contents: _Contents, masters: Sequence[str] = (), **kwargs) -> PathPlus:
+		path = tmp_pathplus / filename
+		path.write_bytes(build_plugin(contents, masters, **kwargs))
+		return path
+
+	return write_plugin
+
 
 def pytest_sessionfinish(session, exitstatus) -> None:  # noqa: MAN001
 
@@ -0,0 +1,101 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.assets import AssetManifest, AssetReference, iter_assets
+from esp_parser.records import SOUN, TXST
+from esp_parser.subrecords import EDID
+
+ARMOUR = b'\xb1\x0e\x00\x01'
+TEXTURE_SET = b'\x01\x00\x00\x01'
+SOUND = b'\x02\x00\x00\x01'
+
+
+def make_plugin(write_plugin: Callable[..., PathPlus]) -> PathPlus:
+	texture_sets = [
+			TXST(
+					flags=0,
+					id=TEXTURE_SET,
+					data=[
+							EDID(b"TestTextureSet"),
+							TXST.TX00(b"Armor/RaiderArmor03/OutfitM.dds"),
+							TXST.TX01(b"armor\\raiderarmor03\\outfitm_n.dds"),
+							],
+					),
+			]
+	sounds = [
+			SOUN(flags=0, id=SOUND, data=[EDID(b"TestSound"), SOUN.FNAM(b"FX\\Armor\\Rattle\\")]),
+			]
+	return write_plugin(
+			"Textures.esp",
+			{b"SOUN": sounds, b"TXST": texture_sets},
+			["BadassBadlandsArmour.esp"],
+			)
+
+
+def test_iter_assets(write_plugin: Callable[..., PathPlus]):
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	assert list(iter_assets(raw)) == [
+			AssetReference("meshes\\armor\\raiderarmor03\\outfitm.nif", ARMOUR, b"ARMO", b"MODL"),
+			AssetReference("meshes\\armor\\raiderarmor03\\go.nif", ARMOUR, b"ARMO", b"MOD2"),
+			AssetReference(
+					"textures\\interface\\icons\\pipboyimages\\apparel\\apperal_raider_armor_3.dds",
+					ARMOUR,
+					b"ARMO",
+					b"ICON",
+					),
+			AssetReference(
+					"textures\\interface\\icons\\pipboyimages_small\\apparel_small\\glow_apperal_raider_armor3.dds",
+					ARMOUR,
+					b"ARMO",
+					b"MICO",
+					),
+			AssetReference("meshes\\armor\\raiderarmor03\\outfitf.nif", ARMOUR, b"ARMO", b"MOD3"),
+			]
+
+	plugin = make_plugin(write_plugin)
+	assert list(iter_assets(plugin.read_bytes())) == [
+			AssetReference("sound\\fx\\armor\\rattle\\", SOUND, b"SOUN", b"FNAM"),
+			AssetReference("textures\\armor\\raiderarmor03\\outfitm.dds", TEXTURE_SET, b"TXST", b"TX00"),
+			AssetReference("textures\\armor\\raiderarmor03\\outfitm_n.dds", TEXTURE_SET, b"TXST", b"TX01"),
+			]
+
+
+def test_manifest(tmp_pathplus: PathPlus, write_plugin: Callable[..., PathPlus]):
+	master = tmp_pathplus / "BadassBadlandsArmour.esp"
+	master.write_bytes((PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes())
+	plugin = make_plugin(write_plugin)
+	(tmp_pathplus / "Fallout3.esm").write_bytes(b'')
+
+	manifest = AssetManifest.from_load_order([tmp_pathplus / "Fallout3.esm", master, plugin])
+	assert len(manifest.assets) == 8
+	assert manifest.assets["meshes\\armor\\raiderarmor03\\go.nif"] == ("BadassBadlandsArmour.esp", ARMOUR)
+	assert manifest.assets["sound\\fx\\armor\\rattle\\"] == ("Textures.esp", b'\x02\x00\x00\x02')
+	assert manifest.paths("Sound") == ["sound\\fx\\armor\\rattle\\"]
+	assert manifest.paths("textures") == [
+			"textures\\armor\\raiderarmor03\\outfitm.dds",
+			"textures\\armor\\raiderarmor03\\outfitm_n.dds",
+			"textures\\interface\\icons\\pipboyimages\\apparel\\apperal_raider_armor_3.dds",
+			"textures\\interface\\icons\\pipboyimages_small\\apparel_small\\glow_apperal_raider_armor3.dds",
+			]
+
+	# Paths already in the manifest are not returned again.
+	assert manifest.add_plugin(plugin.read_bytes(), "Textures.esp") == []
+
+	data_dir = tmp_pathplus / "Data"
+	(data_dir / "Meshes" / "Armor" / "RaiderArmor03").mkdir(parents=True)
+	(data_dir / "Meshes" / "Armor" / "RaiderArmor03" / "OutfitM.nif").write_bytes(b'')
+	(data_dir / "Sound" / "FX" / "Armor" / "Rattle").mkdir(parents=True)
+	(data_dir / "Sound" / "FX" / "Armor" / "Rattle" / "Rattle01.wav").write_bytes(b'')
+
+	archived = ["textures/armor/raiderarmor03/outfitm.dds", "Textures\\Armor\\RaiderArmor03\\OutfitM_n.dds"]
+	assert manifest.missing(data_dir, archived) == [
+			"meshes\\armor\\raiderarmor03\\go.nif",
+			"meshes\\armor\\raiderarmor03\\outfitf.nif",
+			"textures\\interface\\icons\\pipboyimages\\apparel\\apperal_raider_armor_3.dds",
+			"textures\\interface\\icons\\pipboyimages_small\\apparel_small\\glow_apperal_raider_armor3.dds",
+			]
+	assert "sound\\fx\\armor\\rattle\\" in manifest.missing(tmp_pathplus / "Nonexistent")
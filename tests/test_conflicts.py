@@ -0,0 +1,144 @@
+# stdlib
+import json
+from io import StringIO
+from typing import Callable, Dict, List
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.conflicts import Conflict, iter_conflicts, write_conflict_report
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.records import ALCH, BOOK, CELL, REFR
+from esp_parser.subrecords import EDID, Destruction
+
+CONFLICTING = b'\x01\x00\x00\x00'
+IDENTICAL = b'\x02\x00\x00\x00'
+SINGLE = b'\x03\x00\x00\x00'
+
+
+def make_book(form_id: bytes, editor_id: bytes, name: str) -> BOOK:
+	return BOOK(flags=0, id=form_id, data=[EDID(editor_id), BOOK.FULL(name)])
+
+
+def make_load_order(write_plugin: Callable[..., PathPlus]) -> List[PathPlus]:
+	return [
+			write_plugin(
+					"Master.esm",
+					{
+							b"BOOK": [
+									make_book(CONFLICTING, b"Conflicting", "Book"),
+									make_book(IDENTICAL, b"Identical", "Book"),
+									make_book(SINGLE, b"Single", "Book"),
+									],
+							},
+					),
+			write_plugin(
+					"First.esp",
+					{
+							b"BOOK": [
+									make_book(CONFLICTING, b"Conflicting", "First Book"),
+									make_book(IDENTICAL, b"Identical", "Better Book"),
+									make_book(SINGLE, b"Single", "Only Book"),
+									],
+							},
+					["Master.esm"],
+					),
+			write_plugin(
+					"Second.esp",
+					{
+							b"BOOK": [
+									make_book(CONFLICTING, b"Conflicting", "Second Book"),
+									make_book(IDENTICAL, b"Identical", "Better Book"),
+									],
+							},
+					["Master.esm"],
+					),
+			]
+
+
+def test_iter_conflicts(tmp_pathplus: PathPlus, write_plugin: Callable[..., PathPlus]):
+	plugins = make_load_order(write_plugin)
+
+	assert list(iter_conflicts(plugins, processes=2, save=False)) == [
+			Conflict(
+					CONFLICTING,
+					b"BOOK",
+					("Master.esm", "First.esp", "Second.esp"),
+					{b"FULL": [("Master.esm", ), ("First.esp", ), ("Second.esp", )]},
+					),
+			]
+	assert not (tmp_pathplus / "Master.esm.records.json").exists()
+
+
+def test_write_conflict_report(tmp_pathplus: PathPlus, write_plugin: Callable[..., PathPlus]):
+	plugins = make_load_order(write_plugin)
+
+	report = StringIO()
+	assert write_conflict_report(plugins, report, processes=1, chunk_size=1) == 1
+	assert [json.loads(line) for line in report.getvalue().splitlines()] == [{
+			"form_id": "01000000",
+			"type": "BOOK",
+			"plugins": ["Master.esm", "First.esp", "Second.esp"],
+			"winner": "Second.esp",
+			"differences": {"FULL": [["Master.esm"], ["First.esp"], ["Second.esp"]]},
+			}]
+	assert (tmp_pathplus / "Master.esm.records.json").exists()
+
+
+def make_potion_and_reference(master: int, other: int) -> Dict[bytes, list]:
+	# A potion and a reference overriding records from Master.esm, which refer to records from Other.esm.
+	# ``master`` and ``other`` are the indexes of those plugins among the overriding plugin's masters.
+	potion = ALCH(
+			flags=0,
+			id=bytes([1, 0, 0, master]),
+			data=[
+					EDID(b"Potion"),
+					ALCH.ENIT(5, 0, b'\x00\x00\x00', bytes([0x10, 0, 0, other]), 0.5, bytes([0x11, 0, 0, master])),
+					Destruction.DEST(100, 1, 0, b'\x00\x00'),
+					Destruction.DSTD(50, 0, 0, 0, 0, bytes([0x12, 0, 0, other]), bytes([0x13, 0, 0, master]), 3),
+					Destruction.DSTF(),
+					],
+			)
+
+	cell_id = bytes([2, 0, 0, master])
+	reference = REFR(
+			flags=0,
+			id=bytes([3, 0, 0, master]),
+			data=[
+					REFR.NAME(bytes([0x14, 0, 0, master])),
+					REFR.XLOC(1, b'\x00\x00\x00', bytes([0x15, 0, 0, other]), 0, b'\x00' * 11),
+					],
+			)
+	children = Group(
+			cell_id,
+			GroupTypeEnum.CellChildren,
+			0,
+			data=[Group(cell_id, GroupTypeEnum.CellPersistentChildren, 0, data=[reference])],
+			)
+	cell = CELL(flags=0, id=cell_id, data=[EDID(b"Cell")])
+	sub_block = Group(b'\x00\x00\x00\x00', GroupTypeEnum.InteriorCellSubBlock, 0, data=[cell, children])
+	block = Group(b'\x00\x00\x00\x00', GroupTypeEnum.InteriorCellBlock, 0, data=[sub_block])
+
+	return {b"ALCH": [potion], b"CELL": [block]}
+
+
+def test_iter_conflicts_master_order(write_plugin: Callable[..., PathPlus]):
+	# Records which differ only in how their form IDs are stored, as the plugins list their masters
+	# in a different order, are not conflicts.
+	plugins = [
+			write_plugin("Master.esm", {b"ALCH": make_potion_and_reference(0, 0)[b"ALCH"]}),
+			write_plugin("Other.esm", {}),
+			write_plugin("First.esp", make_potion_and_reference(0, 1), ["Master.esm", "Other.esm"]),
+			write_plugin("Second.esp", make_potion_and_reference(1, 0), ["Other.esm", "Master.esm"]),
+			]
+
+	assert list(iter_conflicts(plugins, processes=1, save=False)) == []
+
+	# But they are when the form IDs really differ.
+	write_plugin("Second.esp", make_potion_and_reference(1, 1), ["Other.esm", "Master.esm"])
+	conflicts = iter_conflicts(plugins, processes=1, save=False)
+	assert [(conflict.type, list(conflict.differences)) for conflict in conflicts] == [
+			(b"ALCH", [b"ENIT", b"DSTD"]),
+			(b"REFR", [b"XLOC"]),
+			]
@@ -0,0 +1,92 @@
+# stdlib
+import struct
+from io import BytesIO
+from typing import Callable
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser import parse_esp
+from esp_parser.diff import PluginDiff, RecordDiff, SubrecordChange, diff_plugins
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.records import ARMO, BOOK, IMAD
+from esp_parser.subrecords import EDID, Model
+
+ARMOUR = b'\xb1\x0e\x00\x01'
+REFERENCE = b'\xb2\x0e\x00\x01'
+BOOK_ID = b'\xb3\x0e\x00\x01'
+IMAGE_SPACE = b'\x00\x08\x00\x00'
+
+
+def test_diff_plugins(tmp_pathplus: PathPlus):
+	old = tmp_pathplus / "Old.esp"
+	old.write_bytes((PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes())
+
+	assert diff_plugins(old, old) == PluginDiff([], [], [])
+	assert not diff_plugins(old, old)
+
+	tes4, armour_group, cell_group = parse_esp(BytesIO(old.read_bytes()))
+	armour = armour_group.data[0]
+	data = armour.data[14]
+	armour.data[14] = ARMO.DATA(500, data.max_condition, data.weight)
+	armour.data.remove(Model.MOD3(b"Armor\\RaiderArmor03\\outfitF.NIF"))
+	armour.flags |= 0x00040000  # compressed
+
+	# Remove the reference from the cell's children.
+	cell_group.data[0].data[0].data[1].data[0].data = []
+
+	book = BOOK(flags=0, id=BOOK_ID, data=[EDID(b"TestBook"), BOOK.FULL("Test Book")])
+
+	new = tmp_pathplus / "New.esp"
+	new.write_bytes(b"".join([
+			tes4.unparse(),
+			armour_group.unparse(),
+			cell_group.unparse(),
+			Group(b"BOOK", GroupTypeEnum.TopLevel, 0, data=[book]).unparse(),
+			]))
+
+	diff = diff_plugins(old, new)
+	assert diff.added == [BOOK_ID]
+	assert diff.removed == [REFERENCE]
+	assert diff.changed == [
+			RecordDiff(
+					ARMOUR,
+					b"ARMO",
+					None,
+					[
+							SubrecordChange(
+									b"MOD3",
+									Model.MOD3(b"Armor\\RaiderArmor03\\outfitF.NIF"),
+									None,
+									),
+							SubrecordChange(
+									b"DATA",
+									data,
+									armour.data[13],
+									{"value": (390, 500)},
+									),
+							],
+					),
+			]
+
+	# Compression alone is not a change.
+	armour.data.insert(8, Model.MOD3(b"Armor\\RaiderArmor03\\outfitF.NIF"))
+	armour.data[14] = data
+	new.write_bytes(b"".join([tes4.unparse(), armour_group.unparse(), cell_group.unparse()]))
+	assert diff_plugins(old, new) == PluginDiff([], [REFERENCE], [])
+
+
+def test_diff_plugins_signatures(write_plugin: Callable[..., PathPlus]):
+	# Subrecords whose signature starts with a non-printable byte, such as ``\x00IAD``.
+	paths = []
+	for name, speed in [("Old.esp", 1.0), ("New.esp", 2.0)]:
+		image_space = IMAD(
+				flags=0,
+				id=IMAGE_SPACE,
+				data=[EDID(b"TestImageSpace"), IMAD.x00IAD(struct.pack("<ff", 0.0, speed))],
+				)
+		paths.append(write_plugin(name, {b"IMAD": [image_space]}))
+
+	diff = diff_plugins(*paths)
+	assert [change.type for change in diff.changed[0].changes] == [b"\x00IAD"]
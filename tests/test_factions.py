@@ -0,0 +1,112 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.factions import FactionRelations, Relation
+from esp_parser.records import FACT
+from esp_parser.subrecords import EDID, XNAM, XnamCombatReactionEnum
+
+NCR = b'\x01\x00\x00\x00'
+LEGION = b'\x02\x00\x00\x00'
+RANGERS = b'\x03\x00\x00\x00'
+FOLLOWERS = b'\x04\x00\x00\x00'
+FIENDS = b'\x05\x00\x00\x00'
+
+Enemy = XnamCombatReactionEnum.Enemy
+Ally = XnamCombatReactionEnum.Ally
+Friend = XnamCombatReactionEnum.Friend
+Neutral = XnamCombatReactionEnum.Neutral
+
+
+def make_matrix() -> FactionRelations:
+	return FactionRelations({
+			NCR: {LEGION: Relation(-100, Enemy), RANGERS: Relation(100, Ally)},
+			RANGERS: {FOLLOWERS: Relation(50, Friend), FIENDS: Relation(-100, Enemy)},
+			LEGION: {NCR: Relation(-100, Enemy)},
+			})
+
+
+def test_lookups():
+	matrix = make_matrix()
+
+	assert matrix.reaction(NCR, LEGION) == Enemy
+	assert matrix.relation(NCR, RANGERS) == Relation(100, Ally)
+	assert matrix.reaction(RANGERS, NCR) == Neutral
+	assert matrix.relation(FIENDS, NCR) == Relation()
+
+	assert matrix.hostile_to(NCR) == {LEGION}
+	assert matrix.hostile_to(FIENDS) == {RANGERS}
+	assert matrix.with_reaction(FOLLOWERS, Ally, Friend) == {RANGERS}
+	assert matrix.hostile_to(FOLLOWERS) == set()
+
+
+def test_closures():
+	matrix = make_matrix()
+
+	assert matrix.allies(NCR) == {RANGERS, FOLLOWERS}
+	assert matrix.allies(LEGION) == set()
+	assert matrix.enemies(NCR) == {LEGION, FIENDS}
+	assert matrix.enemies(FOLLOWERS) == set()
+
+
+def test_updates():
+	matrix = make_matrix()
+	matrix.update(FACT(flags=0, id=LEGION, data=[EDID(b"Legion"), XNAM(FIENDS, 10, Friend)]))
+
+	assert matrix.hostile_to(NCR) == set()
+	assert matrix.reaction(LEGION, FIENDS) == Friend
+
+	matrix.remove(NCR)
+	assert matrix.hostile_to(FIENDS) == {RANGERS}
+	assert matrix.allies(NCR) == set()
+	assert matrix == FactionRelations({
+			RANGERS: {FOLLOWERS: Relation(50, Friend), FIENDS: Relation(-100, Enemy)},
+			LEGION: {FIENDS: Relation(10, Friend)},
+			})
+
+
+def test_from_load_order(write_plugin: Callable[..., PathPlus]):
+	master = write_plugin(
+			"Master.esm",
+			{
+					b"FACT": [
+							FACT(flags=0, id=NCR, data=[XNAM(LEGION, -100, Enemy)]),
+							FACT(flags=0, id=LEGION, data=[XNAM(NCR, -100, Enemy)]),
+							],
+					},
+			)
+
+	new_faction = b'\x06\x00\x00\x01'
+	plugin = write_plugin(
+			"Plugin.esp",
+			{
+					b"FACT": [
+							FACT(flags=0, id=NCR, data=[XNAM(LEGION, 0, Neutral), XNAM(new_faction, 100, Ally)]),
+							FACT(flags=0, id=new_faction, data=[XNAM(LEGION, -50, Enemy)]),
+							],
+					},
+			["Master.esm"],
+			)
+
+	matrix = FactionRelations.from_load_order([master, plugin])
+	assert matrix.reaction(NCR, LEGION) == Neutral
+	assert matrix.reaction(NCR, new_faction) == Ally
+	assert matrix.hostile_to(LEGION) == {new_faction}
+	assert matrix.enemies(NCR) == {LEGION}
+
+
+def test_unknown_reaction(make_plugin: Callable[..., bytes]):
+	faction = FACT(flags=0, id=NCR, data=[EDID(b"NCR"), XNAM(LEGION, -100, Enemy), XNAM(FIENDS, 0, 7)])
+
+	matrix = FactionRelations()
+	matrix.add_plugin(make_plugin({b"FACT": [faction]}))
+	assert matrix.reaction(NCR, LEGION) == Enemy
+	assert matrix.relation(NCR, FIENDS) == Relation(0, 7)
+
+	matrix = FactionRelations()
+	matrix.update(faction)
+	assert matrix.relation(NCR, FIENDS) == Relation(0, 7)
+	assert matrix.enemies(NCR) == {LEGION}
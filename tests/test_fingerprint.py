@@ -0,0 +1,83 @@
+# stdlib
+from io import BytesIO
+
+# 3rd party
+import attrs
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser import parse_esp
+from esp_parser.records import ARMO
+from esp_parser.scan import iter_records, record_fingerprint
+
+
+def test_record_fingerprint():
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	_, armour_group, cell_group = parse_esp(BytesIO(raw))
+	armour = armour_group.data[0]
+
+	fingerprints = {header.id: record_fingerprint(raw, header) for header in iter_records(raw)}
+	assert armour.fingerprint() == fingerprints[armour.id]
+	assert cell_group.data[0].data[0].data[0].fingerprint() == fingerprints[b'(:\x00\x00']
+	assert len(armour.fingerprint()) == 16
+
+	# Computed from the subrecords once modified.
+	copy = attrs.evolve(armour, data=list(armour.data))
+	assert copy.fingerprint() == armour.fingerprint()
+
+	copy.data[2] = ARMO.FULL("Renamed Armour")
+	assert copy.fingerprint() != armour.fingerprint()
+
+	copy.data[2] = armour.data[2]
+	assert copy.fingerprint() == armour.fingerprint()
+
+	# Including changes made to subrecords in place.
+	data = armour.data[14]
+	data.value += 1
+	assert armour.fingerprint() != fingerprints[armour.id]
+	data.value -= 1
+	assert armour.fingerprint() == fingerprints[armour.id]
+
+	# Compression and revision do not matter.
+	copy.flags |= 0x00040000
+	copy.revision = 12
+	compressed = next(parse_esp(BytesIO(copy.unparse())))
+	assert compressed.fingerprint() == armour.fingerprint()
+
+	copy.flags |= 0x20
+	assert copy.fingerprint() != armour.fingerprint()
+
+
+def test_record_fingerprint_raw(monkeypatch):
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	armour = list(parse_esp(BytesIO(raw)))[1].data[0]
+	fingerprints = {header.id: record_fingerprint(raw, header) for header in iter_records(raw)}
+
+	def no_unparse(self: object) -> None:
+		raise AssertionError("Unmodified records should be fingerprinted from their raw bytes.")
+
+	monkeypatch.setattr(ARMO.DATA, "unparse", no_unparse)
+	assert armour.fingerprint() == fingerprints[armour.id]
+
+	# Once the subrecords are accessed they may be modified, so are unparsed.
+	assert armour.data[14].value == 390
+	with pytest.raises(AssertionError, match="raw bytes"):
+		armour.fingerprint()
+
+	monkeypatch.undo()
+	assert armour.fingerprint() == fingerprints[armour.id]
+
+
+def test_group_fingerprint():
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	_, armour_group, cell_group = parse_esp(BytesIO(raw))
+
+	assert armour_group.fingerprint() != cell_group.fingerprint()
+	assert attrs.evolve(cell_group, stamp=1234).fingerprint() == cell_group.fingerprint()
+
+	# Changes to nested records change the fingerprints of the groups containing them.
+	cell_block = cell_group.data[0]
+	before = cell_block.fingerprint()
+	cell_block.data[0].data[1].data[0].data = []
+	assert cell_block.fingerprint() != before
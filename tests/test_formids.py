@@ -0,0 +1,160 @@
+# stdlib
+from typing import Callable, List
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.formids import (
+		form_id_offsets,
+		iter_form_ids,
+		iter_load_order,
+		master_table,
+		read_masters,
+		remap_form_id
+		)
+from esp_parser.records import CONT
+from esp_parser.subrecords import CTDA, EDID, Item, Model
+from esp_parser.utils import NULL
+
+
+def test_form_id_offsets():
+	assert list(form_id_offsets(b"CONT", b"CNTO", 8)) == [0]
+	assert list(form_id_offsets(b"REFR", b"NAME", 4)) == [0]
+	assert list(form_id_offsets(b"FACT", b"XNAM", 12)) == [0]
+	assert list(form_id_offsets(b"NAVI", b"NVMI", 0)) == []
+	assert list(form_id_offsets(b"IMAD", b"XNAM", 16)) == []
+	assert list(form_id_offsets(b"CONT", b"EDID", 8)) == []
+	assert list(form_id_offsets(b"CONT", b"MODB", 4)) == []
+	assert list(form_id_offsets(b"LVLI", b"LVLO", 12)) == [4]
+	assert list(form_id_offsets(b"LVLN", b"LVLO", 12)) == [4]
+	assert list(form_id_offsets(b"CELL", b"XCLR", 8)) == [0, 4]
+
+
+@pytest.mark.parametrize(
+		"record_type, signature, size, expected",
+		[
+				pytest.param(b"ALCH", b"ENIT", 20, [8, 16], id="ALCH.ENIT"),
+				pytest.param(b"AMMO", b"DAT2", 20, [4, 12], id="AMMO.DAT2"),
+				pytest.param(b"CREA", b"SNAM", 8, [0], id="CREA.SNAM"),
+				pytest.param(b"EXPL", b"DATA", 52, [12, 16, 28, 32], id="EXPL.DATA"),
+				pytest.param(b"INFO", b"TRDT", 24, [16], id="INFO.TRDT"),
+				pytest.param(b"MGEF", b"DATA", 72, [8, 24, 32, 36, 40, 44, 48, 52], id="MGEF.DATA"),
+				pytest.param(b"NAVI", b"NVMI", 32, [4, 8], id="NAVI.NVMI"),
+				pytest.param(b"NAVM", b"DATA", 20, [0], id="NAVM.DATA"),
+				pytest.param(b"PACK", b"PLDT", 12, [4], id="PACK.PLDT"),
+				pytest.param(b"PACK", b"PTDT", 16, [4], id="PACK.PTDT"),
+				pytest.param(b"PACK", b"PKDD", 24, [4], id="PACK.PKDD"),
+				pytest.param(b"PROJ", b"DATA", 84, [16, 20, 36, 40, 56, 60, 64], id="PROJ.DATA"),
+				pytest.param(b"QUST", b"QSTA", 8, [0], id="QUST.QSTA"),
+				pytest.param(b"RCPE", b"DATA", 16, [8, 12], id="RCPE.DATA"),
+				pytest.param(b"REFR", b"XTEL", 32, [0], id="REFR.XTEL"),
+				pytest.param(b"REFR", b"TNAM", 2, [], id="REFR.TNAM_marker"),
+				pytest.param(b"REFR", b"TNAM", 4, [0], id="REFR.TNAM_patrol"),
+				pytest.param(b"REFR", b"XLOC", 20, [4], id="REFR.XLOC"),
+				pytest.param(b"REFR", b"XNDP", 8, [0], id="REFR.XNDP"),
+				pytest.param(b"WEAP", b"CRDT", 16, [12], id="WEAP.CRDT"),
+				pytest.param(b"WEAP", b"VATS", 20, [0], id="WEAP.VATS"),
+				pytest.param(b"WEAP", b"DSTD", 20, [8, 12], id="DSTD"),
+				]
+		)
+def test_form_id_offsets_structs(record_type: bytes, signature: bytes, size: int, expected: List[int]):
+	assert list(form_id_offsets(record_type, signature, size)) == expected
+
+
+@pytest.mark.parametrize(
+		"type_, function, param1, param2, run_on, expected",
+		[
+				pytest.param(0, 72, b"\x14\x00\x00\x00", NULL, 0, [12], id="GetIsID"),
+				pytest.param(0, 14, b"\x05\x00\x00\x00", NULL, 0, [], id="GetActorValue"),
+				pytest.param(4, 58, b"\x02\x00\x00\x01", NULL, 0, [4, 12], id="global"),
+				pytest.param(0, 60, b"\x01\x00\x00\x01", b"\x14\x00\x00\x00", 0, [12, 16], id="GetFactionRankDifference"),
+				# ``run_on`` as read by CTDA.parse(), for a condition run on a reference.
+				pytest.param(0, 46, NULL, NULL, 0x02000000, [24], id="reference"),
+				]
+		)
+def test_form_id_offsets_ctda(
+		type_: int,
+		function: int,
+		param1: bytes,
+		param2: bytes,
+		run_on: int,
+		expected: List[int],
+		):
+	ctda = CTDA(type_, b"\x00\x00\x00", b"\x01\x00\x00\x01", function, param1, param2, run_on, b"\x07\x00\x00\x00")
+	data = ctda.unparse()[6:]
+	assert list(form_id_offsets(b"QUST", b"CTDA", len(data), data)) == expected
+	assert list(form_id_offsets(b"QUST", b"CTDA", 24, data[:24])) == [offset for offset in expected if offset < 24]
+
+
+def test_form_id_offsets_variable():
+	assert list(form_id_offsets(b"NOTE", b"TNAM", 4, b"\x01\x02\x03\x00")) == [0]
+	assert list(form_id_offsets(b"NOTE", b"TNAM", 12, b"Hello World\x00")) == []
+	assert list(form_id_offsets(b"NOTE", b"TNAM", 4)) == []
+
+	mods = Model.MODS([
+			Model.AlternateTexture(b"Body", b"\x01\x02\x03\x00", 0),
+			Model.AlternateTexture(b"Head01", b"\x04\x05\x06\x00", 1),
+			])
+	data = mods.unparse()[6:]
+	assert list(form_id_offsets(b"ARMO", b"MODS", len(data), data)) == [12, 30]
+	assert list(form_id_offsets(b"ARMO", b"MO2S", len(data), data)) == [12, 30]
+	assert [form_id for _, _, form_id in iter_form_ids(b"ARMO", mods.unparse())] == [
+			b"\x01\x02\x03\x00",
+			b"\x04\x05\x06\x00",
+			]
+
+
+def test_iter_form_ids():
+	cont = CONT(
+			flags=0,
+			id=b'\xc8\xc5\x05\x01',
+			data=[
+					EDID(b'TestContainer'),
+					Model.MODL(b'Clutter\\Chest\\SteamerTrunk01.NIF'),
+					Item.CNTO(item=b'\x1c;\x10\x00', item_count=1),
+					Item.COED(owner=b'\x00\x00\x00\x00', glob_var_req_rank=b'\x00\x00\x00\x00', condition=1.0),
+					Item.CNTO(item=b'iQ\x01\x00', item_count=3),
+					CTDA(0, b"\x00\x00\x00", b"\x00\x00\x80?", 72, b"\x14\x00\x00\x00", b"\x00" * 4, 0, b"\x07\x00\x00\x00"),
+					CTDA(0, b"\x00\x00\x00", b"\x00\x00\x80?", 14, b"\x05\x00\x00\x00", b"\x00" * 4, 0, NULL),
+					]
+			)
+	payload = b"".join(subrecord.unparse() for subrecord in cont.data)
+
+	form_ids = list(iter_form_ids(b"CONT", payload))
+	assert [(signature, form_id) for signature, _, form_id in form_ids] == [
+			(b"CNTO", b'\x1c;\x10\x00'),
+			(b"CNTO", b'iQ\x01\x00'),
+			(b"CTDA", b"\x14\x00\x00\x00"),
+			]
+	assert all(payload[offset:offset + 4] == form_id for _, offset, form_id in form_ids)
+
+
+def test_remap_form_id():
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	assert read_masters(raw) == ["Fallout3.esm"]
+	assert read_masters(b'') == []
+
+	load_order = ["FALLOUT3.ESM", "Other.esp", "BadassBadlandsArmour.esp"]
+	table = master_table(["Fallout3.esm"], "BadassBadlandsArmour.esp", load_order)
+	assert remap_form_id(b'\xb1\x0e\x00\x01', table) == b'\xb1\x0e\x00\x02'
+	assert remap_form_id(b'iQ\x01\x00', table) == b'iQ\x01\x00'
+	assert remap_form_id(NULL, table) == NULL
+
+	with pytest.raises(ValueError, match="'Fallout3.esm' \\(a master of 'BadassBadlandsArmour.esp'\\) is not in"):
+		master_table(["Fallout3.esm"], "BadassBadlandsArmour.esp", ["BadassBadlandsArmour.esp"])
+
+
+def test_iter_load_order(write_plugin: Callable[..., PathPlus]):
+	master = write_plugin("Master.esm", {})
+	plugin = write_plugin("Plugin.esp", {}, ["Master.esm"])
+	names = ["Master.esm", "Plugin.esp"]
+
+	assert [(name, bytes(buffer), table) for name, buffer, table in iter_load_order([master, plugin])] == [
+			("Master.esm", master.read_bytes(), master_table([], "Master.esm", names)),
+			("Plugin.esp", plugin.read_bytes(), master_table(["Master.esm"], "Plugin.esp", names)),
+			]
+
+	with pytest.raises(ValueError, match="'Master.esm' \\(a master of 'Plugin.esp'\\) is not in the load order"):
+		list(iter_load_order([plugin]))
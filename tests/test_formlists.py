@@ -0,0 +1,93 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.formlists import FormLists
+from esp_parser.records import FLST
+from esp_parser.subrecords import EDID
+
+WEAPONS = b'\x01\x00\x00\x01'
+PISTOLS = b'\x02\x00\x00\x01'
+RIFLES = b'\x03\x00\x00\x01'
+PISTOL_10MM = b'\x10\x00\x00\x01'
+PISTOL_32 = b'\x11\x00\x00\x01'
+HUNTING_RIFLE = b'\x12\x00\x00\x01'
+
+
+def make_form_lists() -> FormLists:
+	return FormLists({
+			WEAPONS: (PISTOLS, RIFLES),
+			PISTOLS: (PISTOL_10MM, PISTOL_32),
+			RIFLES: (HUNTING_RIFLE, PISTOL_32),
+			})
+
+
+def test_expand():
+	form_lists = make_form_lists()
+
+	assert form_lists.expand(WEAPONS) == {PISTOL_10MM, PISTOL_32, HUNTING_RIFLE}
+	assert form_lists.contains(WEAPONS, HUNTING_RIFLE)
+	assert not form_lists.contains(PISTOLS, HUNTING_RIFLE)
+	assert not form_lists.contains(WEAPONS, PISTOLS)
+
+	assert form_lists.union(PISTOLS, RIFLES) == {PISTOL_10MM, PISTOL_32, HUNTING_RIFLE}
+	assert form_lists.intersection(PISTOLS, RIFLES) == {PISTOL_32}
+	assert form_lists.intersection() == frozenset()
+	assert form_lists.difference(WEAPONS, RIFLES) == {PISTOL_10MM}
+
+	with pytest.raises(KeyError):
+		form_lists.expand(PISTOL_10MM)
+
+
+def test_invalidation():
+	form_lists = make_form_lists()
+	assert form_lists.expand(WEAPONS) == {PISTOL_10MM, PISTOL_32, HUNTING_RIFLE}
+	pistols = form_lists.expand(PISTOLS)
+
+	form_lists.update(FLST(flags=0, id=RIFLES, data=[EDID(b"Rifles"), FLST.LNAM(HUNTING_RIFLE)]))
+	assert form_lists.expand(PISTOLS) is pistols  # Unaffected, so still cached
+	assert form_lists.difference(WEAPONS, PISTOLS) == {HUNTING_RIFLE}
+
+	form_lists.remove(RIFLES)
+	assert form_lists.expand(WEAPONS) == {PISTOL_10MM, PISTOL_32, RIFLES}
+
+	form_lists.update_list(RIFLES, [WEAPONS])
+	with pytest.raises(ValueError, match="Form list cycle: 01000001 -> 03000001 -> 01000001"):
+		form_lists.expand(WEAPONS)
+
+	form_lists.update_list(RIFLES, [])
+	assert form_lists.expand(WEAPONS) == {PISTOL_10MM, PISTOL_32}
+
+
+def test_from_load_order(tmp_pathplus: PathPlus, write_plugin: Callable[..., PathPlus]):
+	flst = FLST(flags=0, id=b'\x01\x00\x00\x01', data=[FLST.LNAM(b'\x02\x00\x00\x00'), FLST.LNAM(b'\x03\x00\x00\x01')])
+	plugin = write_plugin("Plugin.esp", {b"FLST": [flst]}, ["Master.esm"])
+	master = write_plugin("Master.esm", {})
+	(tmp_pathplus / "Other.esp").write_bytes(b'')
+
+	form_lists = FormLists.from_load_order([master, tmp_pathplus / "Other.esp", plugin])
+	assert form_lists.lists == {b'\x01\x00\x00\x02': (b'\x02\x00\x00\x00', b'\x03\x00\x00\x02')}
+
+
+def test_from_load_order_overrides(write_plugin: Callable[..., PathPlus]):
+	# A compressed override from a plugin which lists its masters in a different order to the load order.
+	master = write_plugin("Master.esm", {b"FLST": [FLST(flags=0, id=WEAPONS, data=[FLST.LNAM(PISTOL_10MM)])]})
+	other = write_plugin("Other.esm", {})
+	override = FLST(
+			flags=0x00040000,
+			id=b'\x01\x00\x00\x01',
+			data=[FLST.LNAM(b'\x10\x00\x00\x01'), FLST.LNAM(b'\x12\x00\x00\x00'), FLST.LNAM(b'\x13\x00\x00\x02')],
+			)
+	plugin = write_plugin("Plugin.esp", {b"FLST": [override]}, ["Other.esm", "Master.esm"])
+
+	form_lists = FormLists.from_load_order([master, other, plugin])
+	assert form_lists.lists == {
+			b'\x01\x00\x00\x00': (b'\x10\x00\x00\x00', b'\x12\x00\x00\x01', b'\x13\x00\x00\x02'),
+			}
+
+	# Without the override
+	assert FormLists.from_load_order([master, other]).lists == {b'\x01\x00\x00\x00': (b'\x10\x00\x00\x00', )}
@@ -0,0 +1,138 @@
+# stdlib
+import struct
+from io import BytesIO
+from typing import Callable, List
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+import esp_parser
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.indexes import ExteriorCellIndex, load_exterior_cell
+from esp_parser.records import CELL, REFR, WRLD
+from esp_parser.subrecords import EDID, PositionRotation
+
+WORLD = b'\x01\x00\x00\x01'
+
+
+def make_cell(form_id: bytes, x: int, y: int) -> List[object]:
+	refr = REFR(flags=0, id=form_id[:3] + b'\x02', data=[REFR.NAME(b'\x0f\x00\x00\x00'), PositionRotation.DATA()])
+	children = Group(
+			form_id,
+			GroupTypeEnum.CellChildren,
+			0,
+			data=[Group(form_id, GroupTypeEnum.CellTemporaryChildren, 0, data=[refr])],
+			)
+	return [CELL(flags=0, id=form_id, data=[EDID(f"Cell{x}{y}".encode()), CELL.XCLC(x, y)]), children]
+
+
+@pytest.fixture()
+def raw_plugin(make_plugin: Callable[..., bytes]) -> bytes:
+	world = WRLD(
+			flags=0,
+			id=WORLD,
+			data=[
+					EDID(b"TestWorld"),
+					WRLD.NAM0(-4096.0, -8192.0),
+					WRLD.NAM9(8191.0, 4095.0),
+					WRLD.OFST(),
+					],
+			)
+	sub_block = Group(
+			b"\x00\x00\x00\x00",
+			GroupTypeEnum.ExteriorCellSubBlock,
+			0,
+			data=[*make_cell(b'\x10\x00\x00\x01', 0, 0), *make_cell(b'\x11\x00\x00\x01', 1, -1)],
+			)
+	block = Group(b"\x00\x00\x00\x00", GroupTypeEnum.ExteriorCellBlock, 0, data=[sub_block])
+	world_children = Group(WORLD, GroupTypeEnum.WorldChildren, 0, data=[block])
+
+	return make_plugin({b"WRLD": [world, world_children]})
+
+
+def test_ofst_written(raw_plugin: bytes):
+	raw = raw_plugin
+	records = list(esp_parser.parse_esp(BytesIO(raw)))
+	world = records[1].data[0]
+	assert isinstance(world, WRLD)
+
+	assert world.get_cell_bounds() == (-1, -2, 1, 0)
+	offsets = world.data[-1]
+	assert isinstance(offsets, WRLD.OFST)
+	assert len(offsets) == 9
+
+	world_offset = raw.index(b"GRUP") + 24
+	assert raw[world_offset + world.get_cell_offset(0, 0):][:4] == b"CELL"
+	assert raw[world_offset + world.get_cell_offset(1, -1):][24:28] == b"EDID"
+	assert world.get_cell_offset(-1, -1) is None
+	assert world.get_cell_offset(5, 5) is None
+
+	# Round trip
+	assert b"".join(record.unparse() for record in records) == raw
+
+
+def test_ofst_single_pass(monkeypatch, raw_plugin: bytes):
+	records = list(esp_parser.parse_esp(BytesIO(raw_plugin)))
+	world, world_children = records[1].data
+	expected = records[1].unparse()
+	assert world.with_offsets(world_children) == world
+	assert list(WRLD.update_offsets(records[1].data)) == [world, world_children]
+
+	calls = []
+	unparse = CELL.unparse
+
+	def counting_unparse(self: CELL) -> bytes:
+		calls.append(self.id)
+		return unparse(self)
+
+	monkeypatch.setattr(CELL, "unparse", counting_unparse)
+
+	# The cells are located and written from a single unparse.
+	assert records[1].unparse() == expected
+	assert calls == [b'\x10\x00\x00\x01', b'\x11\x00\x00\x01']
+
+
+def test_ofst_large():
+	offsets = WRLD.OFST(range(20000))
+	raw = offsets.unparse()
+	assert raw[:4] == b"XXXX"
+	assert list(WRLD.parse_subrecords(BytesIO(raw))) == [offsets]
+
+
+def test_load_exterior_cell(tmp_pathplus: PathPlus, raw_plugin: bytes):
+	plugin = tmp_pathplus / "World.esp"
+	plugin.write_bytes(raw_plugin)
+
+	loaded = load_exterior_cell(plugin, WORLD, 1, -1)
+	assert loaded is not None
+	assert isinstance(loaded.cell, CELL)
+	assert loaded.cell.id == b'\x11\x00\x00\x01'
+	assert loaded.children is not None
+	assert loaded.children.data[0].data[0].id == b'\x11\x00\x00\x02'
+
+	# The OFST was accurate, so the sidecar index wasn't needed.
+	assert not ExteriorCellIndex.sidecar_path(plugin).exists()
+
+	assert load_exterior_cell(plugin, WORLD, -1, -1) is None
+	assert load_exterior_cell(plugin, b'\x02\x00\x00\x01', 0, 0) is None
+
+
+def test_load_exterior_cell_stale_ofst(tmp_pathplus: PathPlus, raw_plugin: bytes):
+	raw = bytearray(raw_plugin)
+	table_start = raw.index(b"OFST") + 6
+	raw[table_start:table_start + 36] = struct.pack("<9I", *([1] * 9))
+
+	plugin = tmp_pathplus / "World.esp"
+	plugin.write_bytes(raw)
+
+	loaded = load_exterior_cell(plugin, WORLD, 0, 0)
+	assert loaded is not None
+	assert loaded.cell.id == b'\x10\x00\x00\x01'
+	assert ExteriorCellIndex.sidecar_path(plugin).is_file()
+
+	index = ExteriorCellIndex.load(plugin)
+	assert index is not None
+	assert set(index.worlds[WORLD]) == {(0, 0), (1, -1)}
+	assert ExteriorCellIndex.from_json(index.to_json()) == index
@@ -0,0 +1,85 @@
+# stdlib
+from io import BytesIO
+from typing import Callable
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.indexes import Condition, ConditionIndex
+from esp_parser.records import DIAL, INFO, QUST
+from esp_parser.subrecords import CTDA, EDID
+from esp_parser.utils import NULL
+
+GET_IS_ID = 72
+GET_STAGE = 58
+NPC = b'\x14\x00\x00\x00'
+QUEST = b'\x01\x00\x00\x01'
+TOPIC = b'\x02\x00\x00\x01'
+RESPONSE = b'\x03\x00\x00\x01'
+REFERENCE = b'\x07\x00\x00\x00'
+
+
+def make_ctda(function: int, param1: bytes, reference: bytes = NULL, run_on: int = 0) -> CTDA:
+	return CTDA(0, b"\x00\x00\x00", b"\x00\x00\x80?", function, param1, NULL, run_on, reference)
+
+
+@pytest.fixture()
+def raw_plugin(make_plugin: Callable[..., bytes]) -> bytes:
+	quest = QUST(flags=0, id=QUEST, data=[EDID(b"TestQuest"), make_ctda(GET_IS_ID, NPC)])
+	topic = DIAL(flags=0, id=TOPIC, data=[EDID(b"TestTopic")])
+	# ``run_on`` as read by CTDA.parse(), for a condition run on a reference.
+	info = INFO(
+			flags=0,
+			id=RESPONSE,
+			data=[make_ctda(GET_IS_ID, NPC, REFERENCE, run_on=0x02000000), make_ctda(GET_STAGE, QUEST)],
+			)
+
+	return make_plugin({
+			b"QUST": [quest],
+			b"DIAL": [topic, Group(TOPIC, GroupTypeEnum.TopicChildren, 0, data=[info])],
+			})
+
+
+def test_ctda_roundtrip():
+	ctda = make_ctda(GET_IS_ID, NPC, REFERENCE, run_on=2)
+	raw = ctda.unparse()
+	assert raw[26:30] == b"\x00\x00\x00\x02"  # run_on
+	assert CTDA.parse(BytesIO(raw[4:])) == ctda
+
+
+def test_condition_index(raw_plugin: bytes):
+	index = ConditionIndex.build(raw_plugin)
+
+	assert len(index) == 3
+	assert index[1] == Condition(
+			RESPONSE,
+			b"INFO",
+			0,
+			b"\x00\x00\x80?",
+			GET_IS_ID,
+			NPC,
+			NULL,
+			2,
+			REFERENCE,
+			)
+
+	assert index.select(function=GET_IS_ID) == [0, 1]
+	assert index.select(function=GET_IS_ID, form_id=NPC) == [0, 1]
+	assert index.select(function=GET_IS_ID, form_id=NPC, owner=RESPONSE) == [1]
+	assert index.select(form_id=REFERENCE) == [1]
+	assert index.select(form_id=QUEST) == [2]
+	assert index.select(owner=QUEST) == [0]
+	assert index.select(function=1) == []
+	assert index.select() == [0, 1, 2]
+
+	roundtripped = ConditionIndex.from_json(index.to_json())
+	assert roundtripped == index
+	assert roundtripped.select(function=GET_STAGE) == [2]
+
+
+def test_condition_index_example():
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	assert len(ConditionIndex.build(raw)) == 0
@@ -0,0 +1,98 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.indexes import DialogueIndex, DialogueResponse, DialogueTopic
+from esp_parser.records import DIAL, INFO
+from esp_parser.subrecords import EDID
+from esp_parser.utils import NULL
+
+TOPIC = b'\x01\x00\x00\x01'
+QUEST = b'\x02\x00\x00\x01'
+OTHER_QUEST = b'\x03\x00\x00\x01'
+INFO_A = b'\x10\x00\x00\x01'
+INFO_B = b'\x11\x00\x00\x01'
+INFO_C = b'\x12\x00\x00\x01'
+
+
+def make_info(form_id: bytes, previous: bytes, quest: bytes = QUEST) -> INFO:
+	return INFO(flags=0, id=form_id, data=[INFO.QSTI(quest), INFO.PNAM(previous)])
+
+
+@pytest.fixture()
+def raw_plugin(make_plugin: Callable[..., bytes]) -> bytes:
+	topic = DIAL(flags=0, id=TOPIC, data=[EDID(b"TestTopic"), DIAL.QSTI(QUEST)])
+
+	# In file order C, A, B, but linked A -> B -> C
+	infos = [make_info(INFO_C, INFO_B, OTHER_QUEST), make_info(INFO_A, NULL), make_info(INFO_B, INFO_A)]
+
+	return make_plugin({b"DIAL": [topic, Group(TOPIC, GroupTypeEnum.TopicChildren, 0, data=infos)]})
+
+
+def test_dialogue_index(raw_plugin: bytes):
+	index = DialogueIndex.build(raw_plugin)
+
+	assert index.topics == {TOPIC: DialogueTopic(quests=(QUEST, ))}
+	assert index.infos[INFO_C] == DialogueResponse(TOPIC, INFO_B, OTHER_QUEST)
+	assert index.responses(TOPIC) == [INFO_A, INFO_B, INFO_C]
+	assert index.responses(QUEST) == []
+
+	assert index.topics_for_quest(QUEST) == {TOPIC}
+	assert index.topics_for_quest(OTHER_QUEST) == {TOPIC}
+	assert index.topics_for_quest(NULL) == set()
+
+	roundtripped = DialogueIndex.from_json(index.to_json())
+	assert roundtripped == index
+	assert roundtripped.responses(TOPIC) == [INFO_A, INFO_B, INFO_C]
+
+
+def test_dialogue_index_updates(raw_plugin: bytes):
+	index = DialogueIndex.build(raw_plugin)
+	assert index.responses(TOPIC) == [INFO_A, INFO_B, INFO_C]
+
+	# Insert a new response between A and B
+	new_info = b'\x13\x00\x00\x01'
+	index.update(make_info(new_info, INFO_A), topic=TOPIC)
+	index.update(make_info(INFO_B, new_info))
+	assert index.responses(TOPIC) == [INFO_A, new_info, INFO_B, INFO_C]
+
+	# C no longer belongs to the other quest
+	index.update(make_info(INFO_C, INFO_B))
+	assert index.topics_for_quest(OTHER_QUEST) == set()
+	assert index.topics_for_quest(QUEST) == {TOPIC}
+
+	index.remove_info(new_info)
+	assert index.responses(TOPIC) == [INFO_A, INFO_B, INFO_C]  # B starts a new chain
+
+	index.update(DIAL(flags=0, id=TOPIC, data=[EDID(b"TestTopic")]))
+	assert index.topics[TOPIC] == DialogueTopic()
+	assert index.topics_for_quest(QUEST) == {TOPIC}  # Through its responses
+
+	for form_id in [INFO_A, INFO_B, INFO_C]:
+		index.remove_info(form_id)
+	assert index.topics_for_quest(QUEST) == set()
+	assert index.responses(TOPIC) == []
+
+	with pytest.raises(ValueError, match="The topic of INFO record .* must be given."):
+		index.update(make_info(INFO_A, NULL))
+
+
+def test_dialogue_index_cycle():
+	index = DialogueIndex(
+			infos={
+					INFO_A: DialogueResponse(TOPIC, INFO_B),
+					INFO_B: DialogueResponse(TOPIC, INFO_A),
+					INFO_C: DialogueResponse(TOPIC, NULL),
+					},
+			)
+	assert index.responses(TOPIC) == [INFO_C, INFO_A, INFO_B]
+
+
+def test_dialogue_index_example():
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	assert DialogueIndex.build(raw) == DialogueIndex()
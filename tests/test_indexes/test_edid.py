@@ -0,0 +1,59 @@
+# stdlib
+import os
+from typing import Callable
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.indexes import EditorIDEntry, EditorIDIndex
+from esp_parser.records import BOOK, CELL
+from esp_parser.scan import map_plugin
+from esp_parser.subrecords import EDID
+
+
+def test_edid_index():
+	buffer = map_plugin(PathPlus("tests/examples") / "BadassBadlandsArmour.esp")
+	index = EditorIDIndex.build(buffer)
+
+	assert len(index) == 2
+	assert "ArmorBadassRaider03" in index
+	assert index["ArmorBadassRaider03"] == EditorIDEntry(b'\xb1\x0e\x00\x01', b"ARMO", 113)
+	assert index.get("armorbadassraider03") is None
+	assert index.get("armorbadassraider03", case_sensitive=False) == index["ArmorBadassRaider03"]
+
+	assert [key for key, _ in index.startswith("Arm")] == ["ArmorBadassRaider03"]
+	assert [key for key, _ in index.startswith("arm")] == []
+	assert [key for key, _ in index.startswith("arm", case_sensitive=False)] == ["ArmorBadassRaider03"]
+	assert [key for key, _ in index.startswith('')] == ["ArmorBadassRaider03", "MegatonWomensRestroom"]
+
+	cell = index.parse_record(buffer, "MegatonWomensRestroom")
+	assert isinstance(cell, CELL)
+	assert cell.id == b'(:\x00\x00'
+
+
+def test_edid_index_sidecar(tmp_pathplus: PathPlus):
+	plugin = tmp_pathplus / "BadassBadlandsArmour.esp"
+	plugin.write_bytes((PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes())
+
+	assert EditorIDIndex.load(plugin) is None
+
+	index = EditorIDIndex.for_plugin(plugin)
+	assert EditorIDIndex.sidecar_path(plugin) == tmp_pathplus / "BadassBadlandsArmour.esp.edid.json"
+	assert EditorIDIndex.sidecar_path(plugin).is_file()
+	assert EditorIDIndex.load(plugin) == index
+
+	# Changing the plugin invalidates the sidecar file.
+	stat = plugin.stat()
+	os.utime(plugin, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+	assert EditorIDIndex.load(plugin) is None
+	assert EditorIDIndex.for_plugin(plugin) == index
+	assert EditorIDIndex.load(plugin) == index
+
+
+def test_edid_index_cp1252(make_plugin: Callable[..., bytes]):
+	book = BOOK(flags=0, id=b'\x01\x00\x00\x01', data=[EDID(b"Caf\xe9Menu")])
+	index = EditorIDIndex.build(make_plugin({b"BOOK": [book]}))
+
+	assert [key for key, _ in index.startswith('')] == ["CaféMenu"]
+	assert index["CaféMenu"].id == book.id
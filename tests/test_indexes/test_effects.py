@@ -0,0 +1,68 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.indexes import EffectIndex, EffectUsage
+from esp_parser.records import ALCH, SPEL
+from esp_parser.subrecords import EDID, Effect
+
+RESTORE_HEALTH = b'\x10\x00\x00\x00'
+RESTORE_AP = b'\x11\x00\x00\x00'
+STIMPAK = b'\x01\x00\x00\x01'
+SPELL = b'\x02\x00\x00\x01'
+
+
+@pytest.fixture()
+def raw_plugin(make_plugin: Callable[..., bytes]) -> bytes:
+	stimpak = ALCH(
+			flags=0,
+			id=STIMPAK,
+			data=[
+					EDID(b"TestStimpak"),
+					Effect.EFID(RESTORE_HEALTH),
+					Effect.EFIT(magnitude=30, area=0, duration=1, type=0, actor_value=-1),
+					Effect.EFID(RESTORE_AP),
+					Effect.EFIT(magnitude=5, area=0, duration=10, type=0, actor_value=-1),
+					],
+			)
+	spell = SPEL(
+			flags=0,
+			id=SPELL,
+			data=[
+					EDID(b"TestSpell"),
+					Effect.EFID(RESTORE_HEALTH),
+					Effect.EFIT(magnitude=2, area=10, duration=60, type=2, actor_value=-1),
+					],
+			)
+
+	return make_plugin({b"ALCH": [stimpak], b"SPEL": [spell]})
+
+
+def test_effect_index(raw_plugin: bytes):
+	index = EffectIndex.build(raw_plugin)
+
+	assert index.users(RESTORE_HEALTH) == [
+			EffectUsage(STIMPAK, b"ALCH", magnitude=30, duration=1),
+			EffectUsage(SPELL, b"SPEL", magnitude=2, area=10, duration=60, range=2),
+			]
+	assert index.users(RESTORE_HEALTH, owner_type=b"SPEL") == [
+			EffectUsage(SPELL, b"SPEL", magnitude=2, area=10, duration=60, range=2),
+			]
+	assert index.users(RESTORE_AP) == [EffectUsage(STIMPAK, b"ALCH", magnitude=5, duration=10)]
+	assert index.users(STIMPAK) == []
+
+	roundtripped = EffectIndex.from_json(index.to_json())
+	assert roundtripped == index
+
+
+def test_effect_index_persisted(tmp_pathplus: PathPlus, raw_plugin: bytes):
+	plugin = tmp_pathplus / "Effects.esp"
+	plugin.write_bytes(raw_plugin)
+
+	index = EffectIndex.for_plugin(plugin)
+	assert EffectIndex.load(plugin) == index
+	assert len(index.usages) == 2
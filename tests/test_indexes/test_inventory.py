@@ -0,0 +1,87 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.indexes import Holding, InventoryIndex
+from esp_parser.records import CONT, LVLI
+from esp_parser.subrecords import EDID, Item
+from esp_parser.utils import NULL
+
+
+@pytest.fixture()
+def raw_plugin(make_plugin: Callable[..., bytes], stimpak: bytes, caps: bytes) -> bytes:
+	containers = [
+			CONT(
+					flags=0,
+					id=b'\x01\x00\x00\x01',
+					data=[
+							EDID(b'TestContainer'),
+							Item.CNTO(item=stimpak, item_count=3),
+							Item.COED(owner=NULL, glob_var_req_rank=NULL, condition=0.5),
+							Item.CNTO(item=caps, item_count=100),
+							CONT.DATA(flags=0, weight=0.0),
+							]
+					),
+			CONT(
+					flags=0,
+					id=b'\x02\x00\x00\x01',
+					data=[EDID(b'TestContainer2'), Item.CNTO(item=stimpak, item_count=2)],
+					),
+			]
+	leveled = LVLI(
+			flags=0,
+			id=b'\x03\x00\x00\x01',
+			data=[
+					EDID(b'TestLeveledList'),
+					LVLI.LVLD(0),
+					LVLI.LVLO(level=5, unused=b"\x00\x00", reference=stimpak, count=1, unused_=b"\x00\x00"),
+					]
+			)
+
+	return make_plugin({b"CONT": containers, b"LVLI": [leveled]})
+
+
+def test_inventory_index(raw_plugin: bytes, stimpak: bytes, caps: bytes):
+	index = InventoryIndex.build(raw_plugin)
+
+	assert index.holders(stimpak) == [
+			Holding(b'\x01\x00\x00\x01', b"CONT", 3, condition=0.5),
+			Holding(b'\x02\x00\x00\x01', b"CONT", 2),
+			Holding(b'\x03\x00\x00\x01', b"LVLI", 1, level=5),
+			]
+	assert index.holders(stimpak, include_leveled=False) == [
+			Holding(b'\x01\x00\x00\x01', b"CONT", 3, condition=0.5),
+			Holding(b'\x02\x00\x00\x01', b"CONT", 2),
+			]
+	assert index.holders(caps) == [Holding(b'\x01\x00\x00\x01', b"CONT", 100)]
+	assert index.holders(NULL) == []
+
+	assert index.total_quantity(stimpak) == 5
+	assert index.total_quantity(caps) == 100
+	assert index.total_quantity(NULL) == 0
+
+	roundtripped = InventoryIndex.from_json(index.to_json())
+	assert roundtripped == index
+	assert roundtripped.total_quantity(stimpak) == 5
+
+
+def test_inventory_index_compressed(make_plugin: Callable[..., bytes], stimpak: bytes):
+	container = CONT(
+			flags=0x00040000,
+			id=b'\x01\x00\x00\x01',
+			data=[EDID(b'TestContainer'), Item.CNTO(item=stimpak, item_count=3), CONT.DATA(flags=0, weight=0.0)],
+			)
+	raw = make_plugin({b"CONT": [container]})
+	assert b"CNTO" not in raw
+
+	index = InventoryIndex.build(raw)
+	assert index.holders(stimpak) == [Holding(b'\x01\x00\x00\x01', b"CONT", 3)]
+
+
+def test_inventory_index_example():
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	assert InventoryIndex.build(raw).holdings == {}
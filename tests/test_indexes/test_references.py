@@ -0,0 +1,59 @@
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.indexes import Reference, ReferenceIndex
+from esp_parser.records import REFR, TES4
+from esp_parser.scan import map_plugin
+from esp_parser.subrecords import PositionRotation
+from esp_parser.utils import TES4_0_94, create_tes4
+
+ARMO_ID = b'\xb1\x0e\x00\x01'
+REFR_ID = b'\xb2\x0e\x00\x01'
+
+
+def test_reference_index():
+	buffer = map_plugin(PathPlus("tests/examples") / "BadassBadlandsArmour.esp")
+	index = ReferenceIndex.build(buffer)
+
+	assert index.referenced_by(ARMO_ID) == {Reference(REFR_ID, b"REFR", b"NAME")}
+	assert index.referenced_by(b'\x07R\x07\x00') == {Reference(ARMO_ID, b"ARMO", b"REPL")}
+	assert index.referenced_by(b'\x00\x00\x00\x00') == set()
+	assert index.references(REFR_ID) == [(ARMO_ID, b"NAME")]
+	assert index.references(ARMO_ID) == [
+			(b'\x07R\x07\x00', b"REPL"),
+			(b'\xd7Q\x06\x00', b"BIPL"),
+			(b'M\x95\x01\x00', b"YNAM"),
+			(b'N\x95\x01\x00', b"ZNAM"),
+			]
+
+	assert ReferenceIndex.from_json(index.to_json()) == index
+
+
+def test_reference_index_update():
+	buffer = map_plugin(PathPlus("tests/examples") / "BadassBadlandsArmour.esp")
+	index = ReferenceIndex.build(buffer)
+
+	refr = REFR(
+			flags=0,
+			id=REFR_ID,
+			data=[REFR.NAME(b'\x01\x02\x03\x00'), PositionRotation.DATA()],
+			)
+	index.update(refr)
+	assert index.referenced_by(ARMO_ID) == set()
+	assert index.referenced_by(b'\x01\x02\x03\x00') == {Reference(REFR_ID, b"REFR", b"NAME")}
+
+	index.remove(REFR_ID)
+	assert index.referenced_by(b'\x01\x02\x03\x00') == set()
+	assert index.references(REFR_ID) == []
+	assert index == ReferenceIndex.from_json(index.to_json())
+
+
+def test_reference_index_header():
+	# The records listed in the file header's ONAM are overridden by the plugin, not referenced by it.
+	tes4 = create_tes4(TES4_0_94, 0, b'\x00\x08\x00\x00', masters=["FalloutNV.esm"])
+	tes4.data.append(TES4.ONAM([REFR_ID]))
+
+	index = ReferenceIndex.build(tes4.unparse())
+	assert index.referenced_by(REFR_ID) == set()
+	assert index.outgoing == {}
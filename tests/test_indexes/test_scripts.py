@@ -0,0 +1,101 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.indexes import ScriptEntry, ScriptIndex, ScriptVariable
+from esp_parser.records import ACTI, SCPT
+from esp_parser.subrecords import EDID, Script
+
+SCRIPT_ID = b'\x01\x00\x00\x01'
+OTHER_SCRIPT_ID = b'\x02\x00\x00\x01'
+ACTIVATOR_ID = b'\x03\x00\x00\x01'
+PLAYER = b'\x14\x00\x00\x00'
+CAPS = b'\x0f\x00\x00\x00'
+
+SOURCE = "scn TestScript\r\nshort DoOnce\r\n\r\nBegin OnActivate\r\n\tPlayer.AddItem Caps001 10\r\nEnd"
+
+VARIABLES = (ScriptVariable(1, "DoOnce", 1), )
+
+
+def make_index() -> ScriptIndex:
+	return ScriptIndex({
+			SCRIPT_ID: [ScriptEntry(SCRIPT_ID, b"SCPT", 0, SOURCE, VARIABLES, (PLAYER, CAPS))],
+			OTHER_SCRIPT_ID: [ScriptEntry(OTHER_SCRIPT_ID, b"SCPT", 0, "Player.RemoveItem Caps001 5", (), (CAPS, ))],
+			},
+			{ACTIVATOR_ID: SCRIPT_ID},
+			)
+
+
+def test_lookups():
+	index = make_index()
+
+	assert [script.owner for script in index.users(CAPS)] == [SCRIPT_ID, OTHER_SCRIPT_ID]
+	assert [script.owner for script in index.users(PLAYER)] == [SCRIPT_ID]
+	assert index.users(b'\xff\x00\x00\x01') == []
+	assert index.variables(SCRIPT_ID) == VARIABLES
+	assert index.variables(ACTIVATOR_ID) == ()
+	assert index.callers(SCRIPT_ID) == [ACTIVATOR_ID]
+	assert index.callers(OTHER_SCRIPT_ID) == []
+
+	assert [script.owner for script in index.search("caps001 player")] == [SCRIPT_ID, OTHER_SCRIPT_ID]
+	assert [script.owner for script in index.search("ADDITEM")] == [SCRIPT_ID]
+	assert index.search("RemoveItem DoOnce") == []
+	assert index.search("") == []
+
+	roundtripped = ScriptIndex.from_json(index.to_json())
+	assert roundtripped == index
+	assert roundtripped.callers(SCRIPT_ID) == [ACTIVATOR_ID]
+
+
+def test_updates():
+	index = make_index()
+
+	index.update_record(OTHER_SCRIPT_ID, [ScriptEntry(OTHER_SCRIPT_ID, b"SCPT", 0, "Player.Kill", (), (PLAYER, ))])
+	assert [script.owner for script in index.users(CAPS)] == [SCRIPT_ID]
+	assert [script.owner for script in index.search("kill")] == [OTHER_SCRIPT_ID]
+
+	index.update_record(ACTIVATOR_ID, [], OTHER_SCRIPT_ID)
+	assert index.callers(SCRIPT_ID) == []
+	assert index.callers(OTHER_SCRIPT_ID) == [ACTIVATOR_ID]
+
+	index.remove(SCRIPT_ID)
+	index.remove(ACTIVATOR_ID)
+	assert index.users(CAPS) == []
+	assert index.search("additem") == []
+	assert index.callers(OTHER_SCRIPT_ID) == []
+	assert list(index.scripts) == [OTHER_SCRIPT_ID]
+
+
+def test_build(write_plugin: Callable[..., PathPlus]):
+	scripts = [
+			SCPT(
+					flags=0,
+					id=SCRIPT_ID,
+					data=[
+							EDID(b"TestScript"),
+							Script.SCHR(ref_count=2, variable_count=1, type=0),
+							Script.SCDA(b"\x1d\x00\x00\x00"),
+							Script.SCTX(SOURCE.encode()),
+							Script.SLSD(1),
+							Script.SCVR(b"DoOnce"),
+							Script.SCRO(PLAYER),
+							Script.SCRO(CAPS),
+							],
+					),
+			]
+	activators = [
+			ACTI(flags=0, id=ACTIVATOR_ID, data=[EDID(b"TestActivator"), ACTI.SCRI(SCRIPT_ID)]),
+			]
+	plugin = write_plugin("Scripts.esp", {b"ACTI": activators, b"SCPT": scripts})
+
+	index = ScriptIndex.for_plugin(plugin)
+	assert ScriptIndex.load(plugin) == index
+	assert index.get(SCRIPT_ID) == [
+			ScriptEntry(SCRIPT_ID, b"SCPT", 0, SOURCE, VARIABLES, (PLAYER, CAPS)),
+			]
+	assert index.attachments == {ACTIVATOR_ID: SCRIPT_ID}
+	assert [script.owner for script in index.users(CAPS)] == [SCRIPT_ID]
+	assert [script.owner for script in index.search("onactivate")] == [SCRIPT_ID]
@@ -0,0 +1,88 @@
+# stdlib
+import os
+from typing import Callable
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.indexes import SpatialEntry, SpatialIndex
+from esp_parser.records import CELL, REFR, WRLD
+from esp_parser.subrecords import EDID, PositionRotation
+
+WORLD = b'\x01\x00\x00\x01'
+CELL_ID = b'\x02\x00\x00\x01'
+
+
+def make_refr(form_id: bytes, x: float, y: float) -> REFR:
+	return REFR(flags=0, id=form_id, data=[REFR.NAME(b'\x0f\x00\x00\x00'), PositionRotation.DATA(x, y, 10.0)])
+
+
+@pytest.fixture()
+def raw_plugin(make_plugin: Callable[..., bytes]) -> bytes:
+	refs = [
+			make_refr(b'\x10\x00\x00\x01', 100.0, 100.0),
+			make_refr(b'\x11\x00\x00\x01', 500.0, 200.0),
+			make_refr(b'\x12\x00\x00\x01', 5000.0, -300.0),
+			]
+	cell_children = Group(
+			CELL_ID,
+			GroupTypeEnum.CellChildren,
+			0,
+			data=[Group(CELL_ID, GroupTypeEnum.CellTemporaryChildren, 0, data=refs)],
+			)
+	cell = CELL(flags=0, id=CELL_ID, data=[CELL.XCLC(0, 0)])
+	sub_block = Group(b"\x00\x00\x00\x00", GroupTypeEnum.ExteriorCellSubBlock, 0, data=[cell, cell_children])
+	block = Group(b"\x00\x00\x00\x00", GroupTypeEnum.ExteriorCellBlock, 0, data=[sub_block])
+	world_children = Group(WORLD, GroupTypeEnum.WorldChildren, 0, data=[block])
+	world = WRLD(flags=0, id=WORLD, data=[EDID(b"TestWorld")])
+
+	return make_plugin({b"WRLD": [world, world_children]})
+
+
+def test_spatial_index(raw_plugin: bytes):
+	index = SpatialIndex.build(raw_plugin)
+
+	assert list(index.spaces) == [WORLD]
+	assert len(index.spaces[WORLD]) == 3
+
+	ids = {entry.id for entry in index.within_box(WORLD, 0, 0, 1000, 1000)}
+	assert ids == {b'\x10\x00\x00\x01', b'\x11\x00\x00\x01'}
+
+	ids = {entry.id for entry in index.within_box(WORLD, -10000, -10000, 10000, 10000)}
+	assert ids == {b'\x10\x00\x00\x01', b'\x11\x00\x00\x01', b'\x12\x00\x00\x01'}
+
+	assert [entry.id for entry in index.within_radius(WORLD, 0, 0, 200)] == [b'\x10\x00\x00\x01']
+	assert [entry.id for entry in index.within_radius(WORLD, 4900, -200, 200)] == [b'\x12\x00\x00\x01']
+	assert list(index.within_radius(WORLD, 100, 100, 5, z=100)) == []
+	assert list(index.within_radius(CELL_ID, 100, 100, 5)) == []
+
+	roundtripped = SpatialIndex.from_json(index.to_json())
+	assert roundtripped == index
+	assert [entry.id for entry in roundtripped.within_radius(WORLD, 0, 0, 200)] == [b'\x10\x00\x00\x01']
+
+
+def test_spatial_index_example(tmp_pathplus: PathPlus):
+	plugin = tmp_pathplus / "BadassBadlandsArmour.esp"
+	plugin.write_bytes((PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes())
+
+	index = SpatialIndex.for_plugin(plugin)
+	assert SpatialIndex.sidecar_path(plugin).is_file()
+
+	# Interior cells are their own space.
+	assert list(index.within_radius(b'(:\x00\x00', 140, 330, 5)) == [
+			SpatialEntry(
+					id=b'\xb2\x0e\x00\x01',
+					type=b"REFR",
+					x=140.3585968017578,
+					y=331.6488952636719,
+					z=65.97859954833984,
+					offset=882,
+					),
+			]
+
+	assert SpatialIndex.load(plugin) == index
+	os.utime(plugin, ns=(0, 0))
+	assert SpatialIndex.load(plugin) is None
@@ -0,0 +1,87 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.indexes import TextEntry, TextIndex
+from esp_parser.records import BOOK, MESG, NOTE
+from esp_parser.subrecords import EDID
+
+ARMOUR = b'\xb1\x0e\x00\x01'
+RESTROOM = b'(:\x00\x00'
+BOOK_ID = b'\x01\x00\x00\x01'
+NOTE_ID = b'\x02\x00\x00\x01'
+TOPIC_NOTE_ID = b'\x03\x00\x00\x01'
+
+
+def make_index() -> TextIndex:
+	return TextIndex({
+			BOOK_ID: (b"BOOK", [(b"FULL", "Wasteland Survival Guide"), (b"DESC", "A guide to surviving the wasteland.")]),
+			NOTE_ID: (b"NOTE", [(b"TNAM", "The guide is hidden in the vault.")]),
+			})
+
+
+def test_search():
+	index = make_index()
+
+	assert index.search("wasteland") == [
+			TextEntry(BOOK_ID, b"BOOK", b"FULL", "Wasteland Survival Guide"),
+			TextEntry(BOOK_ID, b"BOOK", b"DESC", "A guide to surviving the wasteland."),
+			]
+	assert [entry.id for entry in index.search("GUIDE")] == [BOOK_ID, BOOK_ID, NOTE_ID]
+	assert index.search("guide vault") == [TextEntry(NOTE_ID, b"NOTE", b"TNAM", "The guide is hidden in the vault.")]
+	assert index.search("megaton") == []
+	assert index.search("") == []
+
+	assert [entry.signature for entry in index.search_phrase("survival guide")] == [b"FULL"]
+	assert index.search_phrase("guide survival") == []
+	assert [entry.id for entry in index.search_phrase("the guide")] == [NOTE_ID]
+
+	assert [entry.signature for entry in index.search_prefix("surviv")] == [b"FULL", b"DESC"]
+	assert [entry.id for entry in index.search_prefix("VAU")] == [NOTE_ID]
+	assert index.search_prefix("xyz") == []
+
+	roundtripped = TextIndex.from_json(index.to_json())
+	assert roundtripped == index
+	assert roundtripped.search_phrase("survival guide") == index.search_phrase("survival guide")
+
+
+def test_updates():
+	index = make_index()
+	assert index.search_prefix("vau")
+
+	index.update_texts(NOTE_ID, b"NOTE", [(b"TNAM", "Nothing to see here.")])
+	assert index.search_prefix("vau") == []
+	assert [entry.id for entry in index.search("guide")] == [BOOK_ID, BOOK_ID]
+
+	index.remove(BOOK_ID)
+	assert index.search("guide") == []
+	assert list(index.records) == [NOTE_ID]
+
+
+def test_build(write_plugin: Callable[..., PathPlus]):
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	index = TextIndex.build(raw)
+	assert index.search("armour") == [TextEntry(ARMOUR, b"ARMO", b"FULL", "Badass Badlands Armour")]
+	assert index.search_phrase("women's restroom") == [TextEntry(RESTROOM, b"CELL", b"FULL", "Women's Restroom")]
+
+	records = [
+			BOOK(flags=0, id=BOOK_ID, data=[EDID(b"TestBook"), BOOK.FULL("Test Book"), BOOK.DESC("Some text.")]),
+			]
+	notes = [
+			NOTE(flags=0, id=NOTE_ID, data=[EDID(b"TestNote"), NOTE.TNAM(b"Note text")]),
+			NOTE(flags=0, id=TOPIC_NOTE_ID, data=[EDID(b"TestTopicNote"), NOTE.TNAM(b"\x04\x00\x00\x01")]),
+			]
+	messages = [MESG(flags=0, id=b'\x04\x00\x00\x01', data=[EDID(b"TestMessage"), MESG.ITXT("Some button")])]
+	plugin = write_plugin("Text.esp", {b"BOOK": records, b"MESG": messages, b"NOTE": notes})
+
+	index = TextIndex.for_plugin(plugin)
+	assert TextIndex.load(plugin) == index
+	assert [(entry.id, entry.signature) for entry in index.search("text")] == [
+			(BOOK_ID, b"DESC"),
+			(NOTE_ID, b"TNAM"),
+			]
+	assert TOPIC_NOTE_ID not in index.records
+	assert [entry.type for entry in index.search("button")] == [b"MESG"]
@@ -0,0 +1,112 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.leveled import (
+		CALCULATE_ALL_LEVELS,
+		CALCULATE_EACH_ITEM,
+		USE_ALL,
+		LeveledEntry,
+		LeveledList,
+		LeveledLists
+		)
+from esp_parser.records import LVLI
+from esp_parser.subrecords import EDID
+
+OUTER = b'\x01\x00\x00\x01'
+INNER = b'\x02\x00\x00\x01'
+
+
+def entry(level: int, reference: bytes, count: int = 1) -> LVLI.LVLO:
+	return LVLI.LVLO(level=level, unused=b"\x00\x00", reference=reference, count=count, unused_=b"\x00\x00")
+
+
+def test_leveled_list_from_record(stimpak: bytes):
+	record = LVLI(
+			flags=0,
+			id=INNER,
+			data=[EDID(b"TestList"), LVLI.LVLD(25), LVLI.LVLF(USE_ALL), entry(1, stimpak, 2)],
+			)
+	assert LeveledList.from_record(record) == LeveledList(25, USE_ALL, entries=(LeveledEntry(1, stimpak, 2), ))
+
+
+def test_distribution(stimpak: bytes, radaway: bytes, caps: bytes):
+	lists = LeveledLists()
+	lists.add(INNER, LeveledList(entries=(LeveledEntry(1, stimpak), LeveledEntry(1, radaway))))
+	lists.add(
+			OUTER,
+			LeveledList(
+					chance_none=50,
+					entries=(LeveledEntry(1, caps, 10), LeveledEntry(5, INNER, 2), LeveledEntry(5, caps, 20)),
+					),
+			)
+
+	# Only the entries with the highest eligible level are used
+	assert lists.distribution(OUTER, 1) == {caps: {10: 0.5}}
+	assert lists.distribution(OUTER, 10) == {stimpak: {2: 0.125}, radaway: {2: 0.125}, caps: {20: 0.25}}
+	assert lists.drop_chances(OUTER, 10) == {stimpak: 0.125, radaway: 0.125, caps: 0.25}
+	assert lists.expected_counts(OUTER, 10) == {stimpak: 0.25, radaway: 0.25, caps: 5.0}
+
+	assert lists.can_give(OUTER, stimpak, 5)
+	assert not lists.can_give(OUTER, stimpak, 4)
+
+	distributions = lists.distributions(OUTER)
+	assert list(distributions) == list(range(1, 51))
+	assert distributions[4] == {caps: {10: 0.5}}
+	assert distributions[50] == distributions[5]
+
+	# Every entry is given, and the inner list is chosen from for each of its count.
+	flags = CALCULATE_ALL_LEVELS | CALCULATE_EACH_ITEM | USE_ALL
+	lists.add(OUTER, LeveledList(flags=flags, entries=lists.lists[OUTER].entries))
+	assert lists.distribution(OUTER, 5) == {caps: {30: 1.0}, stimpak: {1: 0.5, 2: 0.25}, radaway: {1: 0.5, 2: 0.25}}
+	assert lists.drop_chances(OUTER, 5) == {caps: 1.0, stimpak: 0.75, radaway: 0.75}
+	assert lists.expected_counts(OUTER, 5) == {caps: 30.0, stimpak: 1.0, radaway: 1.0}
+
+	lists.add(OUTER, LeveledList(chance_none=100, chance_none_global=b'\x03\x00\x00\x01', entries=(LeveledEntry(1, caps), )))
+	assert lists.drop_chances(OUTER, 1) == {caps: 0.0}
+	assert not lists.can_give(OUTER, caps, 1)
+	lists.global_values[b'\x03\x00\x00\x01'] = 0
+	lists.add(INNER, lists.lists[INNER])  # Clears the cache
+	assert lists.distribution(OUTER, 1) == {caps: {1: 1.0}}
+
+
+def test_cycle(stimpak: bytes):
+	lists = LeveledLists({
+			OUTER: LeveledList(entries=(LeveledEntry(1, INNER), )),
+			INNER: LeveledList(entries=(LeveledEntry(1, stimpak), LeveledEntry(2, OUTER))),
+			})
+
+	assert lists.distribution(OUTER, 1) == {stimpak: {1: 1.0}}
+	with pytest.raises(ValueError, match="Leveled list cycle: 01000001 -> 02000001 -> 01000001"):
+		lists.distribution(OUTER, 2)
+
+
+def test_from_load_order(write_plugin: Callable[..., PathPlus]):
+	master = write_plugin(
+			"Master.esm",
+			{
+					b"LVLI": [
+							LVLI(flags=0, id=b'\x01\x00\x00\x00', data=[entry(1, b'\x05\x00\x00\x00')]),
+							LVLI(flags=0, id=b'\x02\x00\x00\x00', data=[entry(1, b'\x01\x00\x00\x00', 3)]),
+							],
+					},
+			)
+	plugin = write_plugin(
+			"Plugin.esp",
+			{b"LVLI": [LVLI(flags=0, id=b'\x01\x00\x00\x00', data=[entry(1, b'\x06\x00\x00\x01')])]},
+			["Master.esm"],
+			)
+
+	lists = LeveledLists.from_load_order([master, plugin])
+	assert lists.lists[b'\x01\x00\x00\x00'] == LeveledList(entries=(LeveledEntry(1, b'\x06\x00\x00\x01'), ))
+	assert lists.distribution(b'\x02\x00\x00\x00', 1) == {b'\x06\x00\x00\x01': {3: 1.0}}
+
+	lists = LeveledLists.from_load_order([plugin, master])
+	assert lists.distribution(b'\x02\x00\x00\x01', 1) == {b'\x05\x00\x00\x01': {3: 1.0}}
+
+	with pytest.raises(ValueError, match="'Master.esm' \\(a master of 'Plugin.esp'\\) is not in the load order"):
+		LeveledLists.from_load_order([plugin])
@@ -0,0 +1,75 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.indexes import RecordIndex
+from esp_parser.load_order import LoadOrder, Winner
+from esp_parser.records import BOOK
+from esp_parser.subrecords import EDID
+
+MASTER_BOOK = b'\x01\x00\x00\x00'
+PATCH_BOOK = b'\x02\x00\x00\x01'
+
+
+def make_book(form_id: bytes, name: str) -> BOOK:
+	return BOOK(flags=0, id=form_id, data=[EDID(name.replace(" ", "").encode()), BOOK.FULL(name)])
+
+
+def test_load_order(write_plugin: Callable[..., PathPlus]):
+	master = write_plugin("Master.esm", {b"BOOK": [make_book(MASTER_BOOK, "Master Book")]})
+	patch = write_plugin(
+			"Patch.esp",
+			{b"BOOK": [make_book(MASTER_BOOK, "Patched Book"), make_book(PATCH_BOOK, "New Book")]},
+			["Master.esm"],
+			)
+	other = write_plugin("Other.esp", {b"BOOK": [make_book(MASTER_BOOK, "Other Book")]}, ["Master.esm"])
+
+	with LoadOrder([master, patch, other]) as load_order:
+		assert len(load_order) == 2
+		assert set(load_order) == {MASTER_BOOK, b'\x02\x00\x00\x01'}
+		assert load_order.overrides(MASTER_BOOK) == [0, 1, 2]
+		assert load_order[MASTER_BOOK] == Winner(2, b"BOOK", 111, 0)
+		assert load_order[PATCH_BOOK].plugin == 1
+		assert load_order.parse_record(MASTER_BOOK).data[1] == BOOK.FULL("Other Book")
+		assert load_order.parse_record(MASTER_BOOK, plugin=0).data[1] == BOOK.FULL("Master Book")
+		assert b"Patched Book" in load_order.payload(MASTER_BOOK, plugin=1)
+
+		# The record headers are cached next to each plugin.
+		assert RecordIndex.load(patch) == RecordIndex(
+				["Master.esm"],
+				{
+						MASTER_BOOK: load_order._records[1][MASTER_BOOK],
+						PATCH_BOOK: load_order._records[1][PATCH_BOOK],
+						},
+				)
+
+		assert load_order.refresh() == []
+
+		write_plugin("Other.esp", {b"BOOK": []}, ["Master.esm"])
+		assert load_order.refresh() == [2]
+		assert load_order.overrides(MASTER_BOOK) == [0, 1]
+		assert load_order.parse_record(MASTER_BOOK).data[1] == BOOK.FULL("Patched Book")
+
+		write_plugin("Patch.esp", {b"BOOK": [make_book(MASTER_BOOK, "Patched Book")]}, ["Master.esm"])
+		load_order.update_plugin(1)
+		assert PATCH_BOOK not in load_order
+		assert load_order[MASTER_BOOK].plugin == 1
+
+
+def test_load_order_remapped_override(write_plugin: Callable[..., PathPlus]):
+	# A compressed override from a plugin which lists its masters in a different order to the load order.
+	master = write_plugin("Master.esm", {b"BOOK": [make_book(MASTER_BOOK, "Master Book")]})
+	other = write_plugin("Other.esm", {b"BOOK": [make_book(b'\x05\x00\x00\x00', "Other Book")]})
+	override = make_book(b'\x01\x00\x00\x01', "Patched Book")
+	override.flags = 0x00040000
+	patch = write_plugin("Patch.esp", {b"BOOK": [override]}, ["Other.esm", "Master.esm"])
+
+	with LoadOrder([master, other, patch]) as load_order:
+		assert set(load_order) == {MASTER_BOOK, b'\x05\x00\x00\x01'}
+		assert load_order.overrides(MASTER_BOOK) == [0, 2]
+		assert load_order.overrides(b'\x05\x00\x00\x01') == [1]
+		assert load_order.parse_record(MASTER_BOOK).data[1] == BOOK.FULL("Patched Book")
+		assert b"Patched Book" in load_order.payload(MASTER_BOOK)
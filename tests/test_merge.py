@@ -0,0 +1,171 @@
+# stdlib
+from io import BytesIO
+from typing import Callable, List, Union
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser import parse_esp
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.merge import merge_plugins
+from esp_parser.records import ALCH, BOOK, CELL, FLST, QUST, WRLD
+from esp_parser.subrecords import CTDA, EDID, Destruction
+from esp_parser.utils import NULL
+from esp_parser.utils import TES4_0_94, create_tes4
+
+MASTER_BOOK = b'\x01\x00\x00\x00'
+NEW_BOOK = b'\x00\x08\x00\x01'
+NEW_LIST = b'\x01\x08\x00\x01'
+WORLD = b'\x01\x00\x00\x01'
+
+
+def make_book(form_id: bytes, name: str) -> BOOK:
+	return BOOK(flags=0, id=form_id, data=[EDID(name.replace(" ", "").encode()), BOOK.FULL(name)])
+
+
+def make_world_children(cells: List[CELL]) -> Group:
+	sub_block = Group(b"\x00\x00\x00\x00", GroupTypeEnum.ExteriorCellSubBlock, 0, data=cells)
+	block = Group(b"\x00\x00\x00\x00", GroupTypeEnum.ExteriorCellBlock, 0, data=[sub_block])
+	return Group(WORLD, GroupTypeEnum.WorldChildren, 0, data=[block])
+
+
+def test_merge_plugins(tmp_pathplus: PathPlus, write_plugin: Callable[..., PathPlus]):
+	first = write_plugin(
+			"First.esp",
+			{b"BOOK": [make_book(MASTER_BOOK, "First"), make_book(NEW_BOOK, "New")]},
+			["Master.esm"],
+			)
+	second = write_plugin(
+			"Second.esp",
+			{
+					b"BOOK": [make_book(NEW_BOOK, "Second")],
+					b"FLST": [FLST(flags=0, id=NEW_LIST, data=[FLST.LNAM(NEW_BOOK), FLST.LNAM(MASTER_BOOK)])],
+					},
+			["Master.esm"],
+			)
+	third = write_plugin("Third.esp", {b"BOOK": [make_book(NEW_BOOK, "Third")]}, ["Master.esm", "First.esp"])
+
+	merged = tmp_pathplus / "Merged.esp"
+	assert merge_plugins([first, second, third], merged) == {"Second.esp": {NEW_BOOK: b'\x02\x08\x00\x01'}}
+
+	tes4, books, form_lists = parse_esp(BytesIO(merged.read_bytes()))
+	assert tes4.data[0] == tes4.HEDR(TES4_0_94, 6, b'\x03\x08\x00\x00')
+	assert [s for s in tes4.data if s.__class__.__name__ == "MAST"] == [b"Master.esm"]
+
+	assert [(book.id, book.data[1]) for book in books.data] == [
+			(MASTER_BOOK, BOOK.FULL("First")),
+			(NEW_BOOK, BOOK.FULL("Third")),
+			(b'\x02\x08\x00\x01', BOOK.FULL("Second")),
+			]
+	assert form_lists.data == [FLST(flags=0, id=NEW_LIST, data=[FLST.LNAM(b'\x02\x08\x00\x01'), FLST.LNAM(MASTER_BOOK)])]
+
+	# Merging a single plugin copies its records unchanged.
+	single = tmp_pathplus / "Single.esp"
+	merge_plugins([second], single)
+	assert single.read_bytes()[single.read_bytes().index(b"GRUP"):] == second.read_bytes()[second.read_bytes().index(b"GRUP"):]
+
+	with pytest.raises(ValueError, match="'First.esp' \\(a master of 'Third.esp'\\) must come before it"):
+		merge_plugins([third, first], merged)
+
+
+def test_merge_plugins_struct_form_ids(tmp_pathplus: PathPlus, write_plugin: Callable[..., PathPlus]):
+	# Form IDs within struct subrecords are rewritten for the merged plugin's masters,
+	# and the fields around them are left alone.
+	first = write_plugin("First.esp", {b"BOOK": [make_book(MASTER_BOOK, "First")]}, ["Master.esm"])
+
+	alch = ALCH(
+			flags=0,
+			id=b'\x00\x08\x00\x02',
+			data=[
+					EDID(b"Potion"),
+					ALCH.ENIT(5, 0, b'\x00\x00\x00', b'\x0a\x00\x00\x01', 0.5, b'\x0b\x00\x00\x00'),
+					Destruction.DEST(100, 1, 0, b'\x00\x00'),
+					Destruction.DSTD(50, 0, 0, 0, 0, b'\x0c\x00\x00\x00', b'\x0d\x00\x00\x01', 3),
+					Destruction.DSTF(),
+					],
+			)
+	second = write_plugin("Second.esp", {b"ALCH": [alch]}, ["Other.esm", "Master.esm"])
+
+	merged = tmp_pathplus / "Merged.esp"
+	merge_plugins([first, second], merged)
+
+	tes4, potions, _ = parse_esp(BytesIO(merged.read_bytes()))
+	assert [s for s in tes4.data if s.__class__.__name__ == "MAST"] == [b"Master.esm", b"Other.esm"]
+	assert potions.data[0].data[1:4] == [
+			ALCH.ENIT(5, 0, b'\x00\x00\x00', b'\x0a\x00\x00\x00', 0.5, b'\x0b\x00\x00\x01'),
+			Destruction.DEST(100, 1, 0, b'\x00\x00'),
+			Destruction.DSTD(50, 0, 0, 0, 0, b'\x0c\x00\x00\x01', b'\x0d\x00\x00\x00', 3),
+			]
+
+
+def test_merge_plugins_conditions(tmp_pathplus: PathPlus, write_plugin: Callable[..., PathPlus]):
+	# Condition parameters are only remapped for functions which take forms.
+	first = write_plugin("First.esp", {b"BOOK": [make_book(MASTER_BOOK, "First")]}, ["FalloutNV.esm"])
+	conditions = [
+			CTDA(0, b'\x00\x00\x00', b'\x00\x00\x80?', 14, b'\x05\x00\x00\x00', NULL, 0, NULL),  # GetActorValue
+			CTDA(0, b'\x00\x00\x00', b'\x00\x00\x80?', 72, b'\x05\x00\x00\x00', NULL, 0, NULL),  # GetIsID
+			]
+	quest = QUST(flags=0, id=b'\x00\x08\x00\x00', data=[EDID(b"Quest"), *conditions])
+	second = write_plugin("Second.esp", {b"QUST": [quest]})
+
+	merged = tmp_pathplus / "Merged.esp"
+	merge_plugins([first, second], merged)
+
+	quests = {group.label: group for group in list(parse_esp(BytesIO(merged.read_bytes())))[1:]}[b"QUST"]
+	assert [condition.param1 for condition in quests.data[0].data[1:]] == [b'\x05\x00\x00\x00', b'\x05\x00\x00\x01']
+
+
+def test_merge_plugins_header(tmp_pathplus: PathPlus):
+	tes4 = create_tes4(TES4_0_94, 0, b'\x00\x08\x00\x00', author="Jane", description="A plugin\nwith a description")
+	plugin = tmp_pathplus / "Plugin.esp"
+	plugin.write_bytes(tes4.unparse())
+
+	merged = tmp_pathplus / "Merged.esp"
+	merge_plugins([plugin], merged)
+
+	merged_tes4, = parse_esp(BytesIO(merged.read_bytes()))
+	assert merged_tes4.data[1:3] == [tes4.CNAM("Jane"), tes4.SNAM("A plugin\nwith a description")]
+
+
+
+@pytest.mark.parametrize("flags", [pytest.param(0, id="uncompressed"), pytest.param(0x00040000, id="compressed")])
+def test_merge_plugins_worlds(tmp_pathplus: PathPlus, write_plugin: Callable[..., PathPlus], flags: int):
+	world = WRLD(
+			flags=flags,
+			id=WORLD,
+			data=[EDID(b"TestWorld"), WRLD.NAM0(-4096.0, -8192.0), WRLD.NAM9(8191.0, 4095.0), WRLD.OFST()],
+			)
+	cells = [
+			CELL(flags=0, id=b'\x10\x00\x00\x01', data=[EDID(b"Cell00"), CELL.XCLC(0, 0)]),
+			CELL(flags=0, id=b'\x11\x00\x00\x01', data=[EDID(b"Cell1m1"), CELL.XCLC(1, -1)]),
+			]
+	first = write_plugin("First.esp", {b"WRLD": [world, make_world_children(cells)]}, ["Master.esm"])
+
+	# A cell added to the worldspace by another plugin moves the cells after it.
+	new_cell = CELL(flags=0, id=b'\x00\x08\x00\x02', data=[EDID(b"NewCell"), CELL.XCLC(-1, -2)])
+	second = write_plugin(
+			"Second.esp",
+			{b"WRLD": [make_world_children([new_cell, cells[0]])]},
+			["Master.esm", "First.esp"],
+			)
+
+	merged = tmp_pathplus / "Merged.esp"
+	merge_plugins([first, second], merged)
+	raw = merged.read_bytes()
+
+	_, worlds = parse_esp(BytesIO(raw))
+	merged_world = worlds.data[0]
+	assert isinstance(merged_world, WRLD)
+
+	world_offset = raw.index(b"GRUP") + 24
+	expected = [(0, 0, b'\x10\x00\x00\x01'), (1, -1, b'\x11\x00\x00\x01'), (-1, -2, b'\x00\x08\x00\x01')]
+	for x, y, form_id in expected:
+		cell_offset = merged_world.get_cell_offset(x, y)
+		assert cell_offset is not None
+		assert raw[world_offset + cell_offset:][:4] == b"CELL"
+		assert raw[world_offset + cell_offset:][12:16] == form_id
+
+	assert merged_world.get_cell_offset(0, -2) is None
+	assert b"".join(record.unparse() for record in parse_esp(BytesIO(raw))) == raw
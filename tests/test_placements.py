@@ -0,0 +1,69 @@
+# stdlib
+from io import BytesIO
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+import esp_parser
+from esp_parser.group import Group
+from esp_parser.placements import Placement, placements
+from esp_parser.records import REFR
+from esp_parser.scan import iter_records, record_payload
+from esp_parser.subrecords import PositionRotation
+
+
+def test_placements():
+	raw = bytearray((PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes())
+	table = placements(raw)
+
+	assert len(table) == 1
+	assert table[0] == Placement(
+			type=b"REFR",
+			id=b'\xb2\x0e\x00\x01',
+			base=b'\xb1\x0e\x00\x01',
+			cell=b'(:\x00\x00',
+			xp=140.3585968017578,
+			yp=331.6488952636719,
+			zp=65.97859954833984,
+			xr=4.729842185974121,
+			yr=0.2617993950843811,
+			zr=3.368485450744629,
+			scale=1.0,
+			)
+
+	assert table.select(cell=b'(:\x00\x00') == [0]
+	assert table.select(cell=b'\x00\x00\x00\x00') == []
+	assert table.select(base=b'\xb1\x0e\x00\x01', type=b"REFR") == [0]
+
+
+def test_placements_write():
+	original = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	raw = bytearray(original)
+	table = placements(raw)
+
+	assert table.write(raw) == 0
+	assert raw == original
+
+	table.translate(x=10.0, z=-5.0, rows=table.select(cell=b'(:\x00\x00'))
+	assert table.write(raw) == 1
+	assert table.write(raw) == 0
+	assert len(raw) == len(original)
+
+	refr_header = next(iter_records(raw, {b"REFR"}))
+	assert record_payload(raw, refr_header)[:10] == record_payload(original, refr_header)[:10]
+
+	records = list(esp_parser.parse_esp(BytesIO(bytes(raw))))
+	cell_group = records[2]
+	assert isinstance(cell_group, Group)
+	refr = cell_group.data[0].data[0].data[1].data[0].data[0]
+	assert isinstance(refr, REFR)
+	position = refr.data[1]
+	assert isinstance(position, PositionRotation.DATA)
+	assert position.xp == pytest.approx(150.3585968017578)
+	assert position.zp == pytest.approx(60.97859954833984)
+
+	table.rescale(2.0)
+	with pytest.raises(ValueError, match="Cannot add an XSCL subrecord to REFR record"):
+		table.write(raw)
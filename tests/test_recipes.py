@@ -0,0 +1,123 @@
+# stdlib
+from typing import Callable
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from esp_parser.recipes import Recipe, RecipeGraph
+from esp_parser.records import RCPE
+from esp_parser.subrecords import EDID
+
+BROC_FLOWER = b'\x10\x00\x00\x00'
+XANDER_ROOT = b'\x11\x00\x00\x00'
+HEALING_POWDER = b'\x12\x00\x00\x00'
+EMPTY_SYRINGE = b'\x13\x00\x00\x00'
+STIMPAK = b'\x14\x00\x00\x00'
+SUPER_STIMPAK = b'\x15\x00\x00\x00'
+
+POWDER_RECIPE = b'\x01\x00\x00\x01'
+STIMPAK_RECIPE = b'\x02\x00\x00\x01'
+SUPER_RECIPE = b'\x03\x00\x00\x01'
+
+
+def make_graph() -> RecipeGraph:
+	return RecipeGraph({
+			POWDER_RECIPE: Recipe(((BROC_FLOWER, 1), (XANDER_ROOT, 1)), ((HEALING_POWDER, 2), )),
+			STIMPAK_RECIPE: Recipe(((HEALING_POWDER, 1), (EMPTY_SYRINGE, 1)), ((STIMPAK, 1), )),
+			SUPER_RECIPE: Recipe(((STIMPAK, 2), (XANDER_ROOT, 1)), ((SUPER_STIMPAK, 1), )),
+			})
+
+
+def test_raw_materials():
+	graph = make_graph()
+
+	assert graph.raw_materials(BROC_FLOWER) == {BROC_FLOWER: 1.0}
+	assert graph.raw_materials(HEALING_POWDER) == {BROC_FLOWER: 0.5, XANDER_ROOT: 0.5}
+	assert graph.raw_materials(SUPER_STIMPAK) == {BROC_FLOWER: 1.0, XANDER_ROOT: 2.0, EMPTY_SYRINGE: 2.0}
+
+	assert graph.recipes_using(XANDER_ROOT) == {POWDER_RECIPE, SUPER_RECIPE}
+	assert graph.recipes_for(STIMPAK) == {STIMPAK_RECIPE}
+
+
+def test_incremental_updates():
+	graph = make_graph()
+	assert graph.raw_materials(SUPER_STIMPAK)[XANDER_ROOT] == 2.0
+	broc_flower = graph.raw_materials(BROC_FLOWER)
+
+	# A cheaper way to make healing powder
+	cheap_powder = b'\x04\x00\x00\x01'
+	graph.update_recipe(cheap_powder, Recipe(((BROC_FLOWER, 1), ), ((HEALING_POWDER, 2), )))
+	assert graph.raw_materials(HEALING_POWDER) == {BROC_FLOWER: 0.5}
+	assert graph.raw_materials(SUPER_STIMPAK) == {BROC_FLOWER: 1.0, XANDER_ROOT: 1.0, EMPTY_SYRINGE: 2.0}
+	assert graph.raw_materials(BROC_FLOWER) == broc_flower
+
+	graph.remove(cheap_powder)
+	assert graph.raw_materials(SUPER_STIMPAK)[XANDER_ROOT] == 2.0
+
+	# Breaking a super stimpak down into xander root skips the recipes which need xander root.
+	graph.update_recipe(b'\x05\x00\x00\x01', Recipe(((SUPER_STIMPAK, 1), ), ((XANDER_ROOT, 10), )))
+	assert graph.raw_materials(XANDER_ROOT) == {SUPER_STIMPAK: 0.1}
+	assert graph.raw_materials(SUPER_STIMPAK) == {BROC_FLOWER: 1.0, XANDER_ROOT: 2.0, EMPTY_SYRINGE: 2.0}
+
+	graph.update_recipe(b'\x06\x00\x00\x01', Recipe(((BROC_FLOWER, 1), ), ((BROC_FLOWER, 2), )))
+	with pytest.raises(ValueError, match="Recipe cycle: 10000000 -> 10000000"):
+		graph.raw_materials(BROC_FLOWER)
+
+
+def test_alternative_recipes_cycle():
+	a, b, c = b'A\x00\x00\x00', b'B\x00\x00\x00', b'C\x00\x00\x00'
+	graph = RecipeGraph({
+			b'\x01\x00\x00\x01': Recipe(((b, 2), (c, 1)), ((a, 1), )),
+			b'\x02\x00\x00\x01': Recipe(((a, 10), ), ((b, 5), )),
+			})
+
+	assert graph.raw_materials(a) == {b: 2.0, c: 1.0}
+	assert graph.raw_materials(b) == {a: 2.0}
+	assert graph.raw_materials(a) == {b: 2.0, c: 1.0}
+	assert graph._costs == {c: {c: 1.0}}
+
+
+def test_craftable():
+	graph = make_graph()
+
+	assert graph.craftable({BROC_FLOWER: 1, XANDER_ROOT: 1}) == {POWDER_RECIPE}
+	assert graph.craftable({HEALING_POWDER: 5, EMPTY_SYRINGE: 1, STIMPAK: 1, XANDER_ROOT: 1}) == {STIMPAK_RECIPE}
+	assert graph.craftable({STIMPAK: 2, XANDER_ROOT: 1, BROC_FLOWER: 1}) == {POWDER_RECIPE, SUPER_RECIPE}
+	assert graph.craftable({}) == set()
+
+
+def test_from_load_order(write_plugin: Callable[..., PathPlus]):
+	record = RCPE(
+			flags=0,
+			id=POWDER_RECIPE,
+			data=[
+					EDID(b"HealingPowderRecipe"),
+					RCPE.DATA(skill=0, level=0, category=b'\x06\x00\x00\x01', sub_category=b'\x00\x00\x00\x00'),
+					RCPE.RCIL(BROC_FLOWER),
+					RCPE.RCQY(1),
+					RCPE.RCIL(XANDER_ROOT),
+					RCPE.RCQY(1),
+					RCPE.RCOD(HEALING_POWDER),
+					RCPE.RCQY(2),
+					],
+			)
+	assert Recipe.from_record(record) == Recipe(
+			((BROC_FLOWER, 1), (XANDER_ROOT, 1)),
+			((HEALING_POWDER, 2), ),
+			b'\x06\x00\x00\x01',
+			)
+
+	master = write_plugin("Master.esm", {b"RCPE": []})
+	plugin = write_plugin("Plugin.esp", {b"RCPE": [record]}, ["Master.esm"])
+
+	graph = RecipeGraph.from_load_order([master, plugin])
+	assert graph.recipes == {
+			b'\x01\x00\x00\x01': Recipe(
+					((BROC_FLOWER, 1), (XANDER_ROOT, 1)),
+					((HEALING_POWDER, 2), ),
+					b'\x06\x00\x00\x01',
+					),
+			}
+	assert graph.raw_materials(HEALING_POWDER) == {BROC_FLOWER: 0.5, XANDER_ROOT: 0.5}
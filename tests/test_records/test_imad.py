@@ -0,0 +1,64 @@
+# stdlib
+import struct
+from io import BytesIO
+
+# 3rd party
+from coincidence.regressions import AdvancedDataRegressionFixture
+
+# this package
+from esp_parser.records import IMAD
+from esp_parser.subrecords import EDID
+
+
+def test_imad_record(advanced_data_regression: AdvancedDataRegressionFixture):
+	imad = IMAD(
+			flags=0,
+			id=b'\x9b\x1c\x0e\x00',
+			revision=0,
+			version=15,
+			unknown=b'\x02\x00',
+			data=[
+					EDID(b'TestImageSpaceModifier'),
+					IMAD.BNAM(struct.pack("<4f", 0.0, 0.0, 1.0, 4.0)),
+					IMAD.TNAM(struct.pack("<10f", 0.0, 1.0, 1.0, 1.0, 1.0, 2.0, 0.0, 0.5, 1.0, 0.0)),
+					IMAD.x00IAD(struct.pack("<6f", 0.0, 1.0, 0.5, 2.0, 1.0, 1.0)),
+					IMAD.AIAD(b''),
+					]
+			)
+
+	buffer = imad.unparse()
+	advanced_data_regression.check(buffer)
+	assert imad.parse(BytesIO(buffer)) == imad
+	assert IMAD.parse(BytesIO(buffer)).unparse() == buffer
+
+
+def test_imad_keyframes():
+	bnam = IMAD.BNAM(struct.pack("<4f", 0.0, 0.0, 1.0, 4.0))
+	assert bnam.times.tolist() == [0.0, 1.0]
+	assert bnam.values.tolist() == [0.0, 4.0]
+	assert bnam.sample([-1.0, 0.0, 0.25, 1.0, 2.0]) == [0.0, 0.0, 1.0, 4.0, 4.0]
+
+	tnam = IMAD.TNAM(struct.pack("<10f", 0.0, 1.0, 1.0, 1.0, 1.0, 2.0, 0.0, 0.5, 1.0, 0.0))
+	assert tnam.times.tolist() == [0.0, 2.0]
+	assert [channel.tolist() for channel in tnam.channels] == [[1.0, 0.0], [1.0, 0.5], [1.0, 1.0], [1.0, 0.0]]
+	assert tnam.sample([1.0]) == [(0.5, 0.75, 1.0, 0.5)]
+
+
+def test_imad_sample():
+	imad = IMAD(
+			flags=0,
+			id=b'\x9b\x1c\x0e\x00',
+			data=[
+					EDID(b'TestImageSpaceModifier'),
+					IMAD.BNAM(struct.pack("<4f", 0.0, 0.0, 1.0, 4.0)),
+					IMAD.NAM3(struct.pack("<5f", 0.0, 0.0, 0.0, 0.0, 1.0)),
+					IMAD.x00IAD(struct.pack("<6f", 0.0, 1.0, 0.5, 2.0, 1.0, 1.0)),
+					IMAD.AIAD(b''),
+					]
+			)
+
+	assert imad.sample([0.5, 0.75]) == {
+			"BNAM": [2.0, 3.0],
+			"NAM3": [(0.0, 0.0, 0.0, 1.0), (0.0, 0.0, 0.0, 1.0)],
+			"x00IAD": [2.0, 1.5],
+			}
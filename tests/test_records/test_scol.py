@@ -0,0 +1,87 @@
+# stdlib
+import math
+from io import BytesIO
+
+# 3rd party
+import pytest
+from coincidence.regressions import AdvancedDataRegressionFixture
+
+# this package
+from esp_parser.group import Group, GroupTypeEnum
+from esp_parser.records import SCOL
+from esp_parser.subrecords import EDID, OBND
+
+
+def make_scol() -> SCOL:
+	return SCOL(
+			flags=0,
+			id=b'\x12\x34\x05\x01',
+			revision=0,
+			version=15,
+			unknown=b'\x00\x00',
+			data=[
+					EDID(b'TestStaticCollection'),
+					OBND(X1=-128, Y1=-64, Z1=0, X2=128, Y2=64, Z2=32),
+					SCOL.ONAM(b'\x01\x02\x03\x00'),
+					SCOL.DATA([
+							SCOL.DataItem(1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0),
+							SCOL.DataItem(2.0, 2.0, 2.0, 0.0, 0.0, 0.5, 2.0),
+							]),
+					]
+			)
+
+
+def test_scol_record(advanced_data_regression: AdvancedDataRegressionFixture):
+	scol = make_scol()
+
+	buffer = scol.unparse()
+	advanced_data_regression.check(buffer)
+	assert scol.parse(BytesIO(buffer)) == scol
+
+
+def test_scol_data():
+	placements = make_scol().data[3]
+	assert isinstance(placements, SCOL.DATA)
+
+	assert len(placements) == 2
+	assert placements[1] == SCOL.DataItem(2.0, 2.0, 2.0, 0.0, 0.0, 0.5, 2.0)
+	assert placements[-2] == SCOL.DataItem(1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+	assert placements[1:] == [SCOL.DataItem(2.0, 2.0, 2.0, 0.0, 0.0, 0.5, 2.0)]
+
+	with pytest.raises(IndexError, match="placement index out of range"):
+		placements[2]
+
+	with pytest.raises(ValueError, match="Expected 7 values for a placement, got 3"):
+		placements.append((1.0, 2.0, 3.0))
+
+
+def test_scol_data_transforms():
+	placements = make_scol().data[3]
+	assert isinstance(placements, SCOL.DATA)
+
+	placements.translate(x=1.0, z=2.0)
+	assert list(placements) == [
+			SCOL.DataItem(2.0, 0.0, 2.0, 0.0, 0.0, 0.0, 1.0),
+			SCOL.DataItem(3.0, 2.0, 4.0, 0.0, 0.0, 0.5, 2.0),
+			]
+
+	placements.scale(2.0)
+	assert list(placements) == [
+			SCOL.DataItem(4.0, 0.0, 4.0, 0.0, 0.0, 0.0, 2.0),
+			SCOL.DataItem(6.0, 4.0, 8.0, 0.0, 0.0, 0.5, 4.0),
+			]
+
+	placements.rotate(math.pi / 2)
+	assert [round(value, 5) for value in placements[1]] == [4.0, -6.0, 8.0, 0.0, 0.0, 2.07080, 4.0]
+
+
+def test_scol_iter_data():
+	scol = make_scol()
+	group = Group(b"SCOL", GroupTypeEnum.TopLevel, 0, data=[scol])
+
+	for placements in SCOL.iter_data([group]):
+		placements.translate(z=10.0)
+
+	placements = scol.data[3]
+	assert isinstance(placements, SCOL.DATA)
+	assert [placement.zp for placement in placements] == [10.0, 12.0]
@@ -0,0 +1,156 @@
+# stdlib
+import copy
+import pickle
+from io import BytesIO
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+import esp_parser
+from esp_parser.group import Group
+from esp_parser.records import ARMO, SCOL
+from esp_parser.sharing import FrozenList, SharingPool
+from esp_parser.subrecords import EDID, Model
+
+
+def test_sharing_pool():
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+
+	pool = SharingPool()
+	first = list(pool.parse_esp(BytesIO(raw)))
+	num_records = len(pool)
+	second = list(pool.parse_esp(BytesIO(raw)))
+
+	assert first == list(esp_parser.parse_esp(BytesIO(raw)))
+	assert b"".join(record.unparse() for record in first) == raw
+	assert all(a is b for a, b in zip(first, second))
+	assert len(pool) == num_records
+
+
+def test_sharing_pool_changed_record():
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+
+	pool = SharingPool()
+	original = list(pool.parse_esp(BytesIO(raw)))
+	armo_group = original[1]
+	assert isinstance(armo_group, Group)
+	armo = armo_group.data[0]
+	assert isinstance(armo, ARMO)
+
+	with pytest.raises(TypeError, match="FrozenList is immutable"):
+		armo.data.append(EDID(b"Foo"))
+
+	edited_armo = pool.edit(armo)
+	edited_armo.data[0] = EDID(b"EditedArmour")
+	edited_group = pool.edit(armo_group)
+	edited_group.data[0] = edited_armo
+	revision = original[:1] + [edited_group] + original[2:]
+
+	num_records = len(pool)
+	reparsed = list(pool.parse_esp(BytesIO(b"".join(record.unparse() for record in revision))))
+
+	assert reparsed == revision
+	assert len(pool) == num_records + 1
+	assert reparsed[0] is original[0]
+	assert reparsed[2] is original[2]
+
+	reparsed_group = reparsed[1]
+	assert isinstance(reparsed_group, Group)
+	reparsed_armo = reparsed_group.data[0]
+	assert isinstance(reparsed_armo, ARMO)
+	assert reparsed_armo is not armo
+	assert reparsed_armo.data[1:] == armo.data[1:]
+	assert all(a is b for a, b in zip(reparsed_armo.data[1:], armo.data[1:]))
+
+
+def test_edit_subrecord():
+	pool = SharingPool()
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	armo_group = list(pool.parse_esp(BytesIO(raw)))[1]
+	assert isinstance(armo_group, Group)
+	armo = armo_group.data[0]
+	assert isinstance(armo, ARMO)
+
+	edited = pool.edit(armo)
+	assert isinstance(edited.data, list) and not isinstance(edited.data, FrozenList)
+	subrecord = pool.edit_subrecord(edited, 1)
+	assert subrecord == armo.data[1]
+	assert edited.data[1] is subrecord
+
+
+def test_shared_subrecords_immutable():
+	pool = SharingPool()
+	raw = (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+	armo = list(pool.parse_esp(BytesIO(raw)))[1].data[0]
+	assert isinstance(armo, ARMO)
+
+	data = armo.data[14]
+	assert isinstance(data, ARMO.DATA)
+	assert data == ARMO.DATA(390, 400, 15.0)
+	assert ARMO.DATA(390, 400, 15.0) == data
+	assert data != ARMO.DATA(391, 400, 15.0)
+	assert data.unparse() == ARMO.DATA(390, 400, 15.0).unparse()
+	assert repr(data) == "ARMO.DATA(value=390, max_condition=400, weight=15.0)"
+
+	with pytest.raises(TypeError, match="ARMO.DATA is shared and immutable"):
+		data.value = 500
+
+	shared_textures = list(pool._share_subrecords([Model.MODT([1, 2, 3])]))[0]
+	with pytest.raises(TypeError, match="Model.MODT is shared and immutable"):
+		shared_textures.append(4)
+	assert shared_textures == [1, 2, 3]
+
+	# Copies are mutable instances of the original class.
+	for mutable in (copy.copy(data), pickle.loads(pickle.dumps(data))):
+		assert type(mutable) is ARMO.DATA
+		mutable.value = 500
+		assert data.value == 390
+
+	edited = pool.edit(armo)
+	subrecord = pool.edit_subrecord(edited, 14)
+	assert type(subrecord) is ARMO.DATA
+	assert subrecord == data
+	assert subrecord is edited.data[14]
+	assert subrecord is not data
+	subrecord.value = 500
+	assert edited.data[14] == ARMO.DATA(500, 400, 15.0)
+	assert armo.data[14] == ARMO.DATA(390, 400, 15.0)
+
+
+def test_shared_placements_immutable():
+	placements = [(1.0, 2.0, 3.0, 0.0, 0.0, 0.5, 1.0)]
+	raw = b"".join(
+			SCOL(flags=0, id=form_id, data=[EDID(editor_id), SCOL.DATA(placements)]).unparse()
+			for form_id, editor_id in [(b'\x01\x00\x00\x01', b"First"), (b'\x02\x00\x00\x01', b"Second")]
+			)
+
+	pool = SharingPool()
+	first, second = pool.parse_esp(BytesIO(raw))
+	assert first.data[1] is second.data[1]
+
+	data = first.data[1]
+	for method, args in [
+			("translate", (10.0, )),
+			("rotate", (1.0, )),
+			("scale", (2.0, )),
+			("append", (placements[0], )),
+			("__setitem__", (0, placements[0])),
+			]:
+		with pytest.raises(TypeError, match="SCOL.DATA is shared and immutable"):
+			getattr(data, method)(*args)
+
+	with pytest.raises(TypeError, match="SCOL.DATA is shared and immutable"):
+		data.placements = None
+
+	edited = pool.edit(second)
+	mutable = pool.edit_subrecord(edited, 1)
+	assert type(mutable) is SCOL.DATA
+	assert mutable == data
+	mutable.translate(x=10)
+	assert mutable[0].xp == 11.0
+	assert first.data[1][0].xp == 1.0
+	assert second.data[1][0].xp == 1.0
+	assert copy.deepcopy(data) == data
+	assert pickle.loads(pickle.dumps(data)) == data
@@ -0,0 +1,158 @@
+# stdlib
+import copy
+import pickle
+import zlib
+from io import BytesIO
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+import esp_parser
+from esp_parser.records import ARMO, CONT
+from esp_parser.sharing import SharingPool
+from esp_parser.subrecords import CTDA, EDID, OBND, Item, Model
+from esp_parser.transfer import RecordBatch
+
+
+def read_example() -> bytes:
+	return (PathPlus("tests/examples") / "BadassBadlandsArmour.esp").read_bytes()
+
+
+@pytest.mark.parametrize("protocol", [2, pickle.DEFAULT_PROTOCOL, pickle.HIGHEST_PROTOCOL])
+def test_pickle_records(protocol: int):
+	raw = read_example()
+	records = list(esp_parser.parse_esp(BytesIO(raw)))
+
+	for record in records:
+		pickled = pickle.dumps(record, protocol=protocol)
+		if protocol >= 3:
+			# Protocol 2 has no opcode for bytes.
+			assert len(pickled) < len(record.unparse()) + 150
+		assert pickle.loads(pickled) == record
+
+
+@pytest.mark.parametrize("protocol", [2, pickle.DEFAULT_PROTOCOL, pickle.HIGHEST_PROTOCOL])
+def test_pickle_subrecords(protocol: int):
+	subrecords = [
+			EDID(b'TestContainer'),
+			OBND(X1=-25, Y1=-41, Z1=0, X2=23, Y2=41, Z2=32),
+			CONT.FULL(b'A Container'),
+			Model.MODL(b'Clutter\\Chest\\SteamerTrunk01.NIF'),
+			Item.CNTO(item=b'\x1c;\x10\x00', item_count=1),
+			CONT.DATA(flags=0, weight=0.0),
+			CTDA(0, b"\x00\x00\x00", b"\x00\x00\x80?", 72, b"\x14\x00\x00\x00", b"\x00" * 4, 0, b"\x00" * 4),
+			]
+
+	for subrecord in subrecords:
+		unpickled = pickle.loads(pickle.dumps(subrecord, protocol=protocol))
+		assert unpickled == subrecord
+		assert type(unpickled) is type(subrecord)
+
+
+def test_pickle_records_lazy(monkeypatch):
+	raw = read_example()
+	tes4, armour_group, cell_group = esp_parser.parse_esp(BytesIO(raw))
+	armour = armour_group.data[0]
+	armour.flags |= 0x00040000  # compressed
+
+	def no_zlib(*args: object) -> None:
+		raise AssertionError("Compressed data should not be recompressed when pickling.")
+
+	monkeypatch.setattr(zlib, "compress", no_zlib)
+	unpickled = pickle.loads(pickle.dumps(armour))
+
+	# The subrecords are parsed on first access.
+	assert unpickled._payload is not None
+	assert unpickled.fingerprint() == armour.fingerprint()
+	assert unpickled._payload is not None
+	assert unpickled.data[0] == EDID(b"ArmorBadassRaider03")
+	assert unpickled._payload is None
+	assert unpickled == armour
+
+	# Pickled again without parsing.
+	assert pickle.loads(pickle.dumps(pickle.loads(pickle.dumps(armour)))) == armour
+
+	# Replacing the subrecords discards the unpickled data.
+	unpickled = pickle.loads(pickle.dumps(armour))
+	unpickled.data = armour.data[:1]
+	assert unpickled.fingerprint() != armour.fingerprint()
+	assert pickle.loads(pickle.dumps(unpickled)).data == armour.data[:1]
+
+	with pytest.raises(AttributeError, match="'ARMO' object has no attribute 'foo'"):
+		unpickled.foo  # noqa: B018
+
+
+def test_copy(monkeypatch):
+	raw = read_example()
+	records = list(esp_parser.parse_esp(BytesIO(raw)))
+	unpickled = pickle.loads(pickle.dumps(records[1].data[0]))
+	pooled = list(SharingPool().parse_esp(BytesIO(raw)))[1].data[0]
+	shared = pooled.data[14]
+
+	def no_unparse(self: object) -> None:
+		raise AssertionError("Copies should not be made via unparse().")
+
+	for cls in (ARMO, ARMO.DATA, EDID):
+		monkeypatch.setattr(cls, "unparse", no_unparse)
+
+	for record in records:
+		shallow = copy.copy(record)
+		assert shallow == record
+		assert shallow is not record
+		assert shallow.data is record.data
+
+		deep = copy.deepcopy(record)
+		assert deep == record
+		assert deep.data is not record.data
+
+	armour = records[1].data[0]
+	deep = copy.deepcopy(armour)
+	assert deep.data[14] == armour.data[14]
+	assert deep.data[14] is not armour.data[14]
+	deep.data[14].value = 500
+	assert armour.data[14].value == 390
+
+	assert copy.copy(unpickled)._payload is not None
+	assert copy.deepcopy(unpickled) == armour
+
+	# Shared records and subrecords are copied as mutable ones.
+	pooled_copy = copy.deepcopy(pooled)
+	assert pooled_copy == pooled
+	assert type(pooled_copy.data) is list
+	assert type(pooled_copy.data[14]) is ARMO.DATA
+	for mutable in (copy.copy(shared), copy.deepcopy(shared)):
+		assert type(mutable) is ARMO.DATA
+		mutable.value = 500
+
+
+def test_record_batch():
+	raw = read_example()
+	records = list(esp_parser.parse_esp(BytesIO(raw)))
+
+	batch = RecordBatch.from_records(records)
+	assert batch.raw == raw
+	assert len(batch) == 3
+
+	pickled = pickle.dumps(batch)
+	assert len(pickled) < len(raw) + 200
+
+	unpickled = pickle.loads(pickled)
+	assert unpickled._cache == {}
+	assert unpickled[-1] == records[-1]
+	assert list(unpickled._cache) == [2]
+	assert list(unpickled) == records
+	assert unpickled[1:] == records[1:]
+	assert unpickled.raw_record(0) == records[0].unparse()
+
+	with pytest.raises(IndexError, match="record index out of range"):
+		unpickled[3]
+
+
+def test_record_batch_from_bytes():
+	raw = read_example()
+	records = list(esp_parser.parse_esp(BytesIO(raw)))
+
+	batch = RecordBatch.from_bytes(raw, [0, 89, 567])
+	assert list(batch) == records